@@ -0,0 +1,78 @@
+"""
+Benchmarks FastFlagList against a synthetic Studio Fast Flag dump.
+
+Usage: PYTHONPATH=src python benchmarks/fast_flags_benchmark.py [number of flags]
+"""
+import random
+import sys
+import time
+
+from grapejuice_common.models.fast_flags import FastFlagList
+
+PREFIXES = ("FFlag", "DFFlag", "SFFlag", "FInt", "DFInt", "FString", "DFString", "FLog", "DFLog")
+WORDS = (
+    "Studio", "Render", "Network", "Physics", "Lua", "Http", "Enable", "Disable", "Fix", "Use", "New", "Camera",
+    "Terrain", "Sound", "Avatar", "Chat", "Script", "Debug", "Memory", "Cache", "Texture", "Shader", "Mesh", "Async"
+)
+
+
+def generate_dump(n: int):
+    rng = random.Random(1234)
+    dump = dict()
+
+    while len(dump) < n:
+        prefix = rng.choice(PREFIXES)
+        name = prefix + "".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))) + str(rng.randint(0, 999))
+
+        if prefix.endswith("Flag"):
+            dump[name] = rng.choice(("True", "False"))
+
+        elif "Int" in prefix or "Log" in prefix:
+            dump[name] = str(rng.randint(0, 100000))
+
+        else:
+            dump[name] = "".join(rng.choice(WORDS) for _ in range(3))
+
+    return dump
+
+
+def timed(label: str, fn):
+    t0 = time.perf_counter()
+    result = fn()
+    print(f"{label:<40} {(time.perf_counter() - t0) * 1000:10.2f} ms")
+
+    return result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 25000
+
+    dump = generate_dump(n)
+    saved = dict((k, "True") for k in random.Random(42).sample(list(dump.keys()), 500))
+    print(f"Generated {len(dump)} flags, {len(saved)} saved overrides")
+
+    flags = timed("load dump", lambda: FastFlagList(source_dictionary=dump))
+    saved_flags = FastFlagList(source_dictionary=saved)
+    timed("overlay saved flags", lambda: flags.overlay_flags(saved_flags))
+    def first_page():
+        # The paginator sorts the collection before taking a page
+        flags.sort()
+        return flags[0:50]
+
+    timed("first page after overlay", first_page)
+    timed("iterate all flags", lambda: sum(1 for _ in flags))
+
+    def edit_flags():
+        for flag in flags[:100]:
+            flag.value = "False"
+
+        return first_page()
+
+    timed("edit 100 flags, then page", edit_flags)
+    timed("changed flags as dictionary", lambda: flags.get_changed_flags().as_dictionary)
+    timed("export as dictionary", lambda: flags.as_dictionary)
+    timed("reset all flags", flags.reset_all_flags)
+
+
+if __name__ == '__main__':
+    main()
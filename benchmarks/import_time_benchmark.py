@@ -0,0 +1,88 @@
+"""
+Measures how long it takes to import the Grapejuice entry points using python -X importtime, and fails when an entry
+point imports modules that should only be loaded on demand.
+
+Usage: PYTHONPATH=src python benchmarks/import_time_benchmark.py [budget in ms]
+"""
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ENTRY_POINTS = (
+    "grapejuice_common.features.settings",
+    "grapejuice.cli.main",
+    "grapejuiced.main"
+)
+
+# Importing these means the settings were loaded or the hardware was profiled at import time
+DEFERRED_MODULES = (
+    "grapejuice_common.hardware_info.hardware_profile",
+    "grapejuice_common.hardware_info.glx_info",
+    "grapejuice_common.hardware_info.xrandr"
+)
+
+TOP_MODULES = 8
+
+
+def measure(module: str) -> Tuple[int, List[Tuple[str, int, int]]]:
+    """
+    :return: Exit code of the interpreter, and (module, self time, cumulative time) for every imported module
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        env=os.environ
+    )
+
+    timings = []
+
+    for line in process.stderr.decode("UTF-8", errors="replace").splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_time, cumulative_time, name = line[len("import time:"):].split("|", 2)
+        timings.append((name.strip(), int(self_time), int(cumulative_time)))
+
+    return process.returncode, timings
+
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else None
+    failed = False
+
+    for entry_point in ENTRY_POINTS:
+        exit_code, timings = measure(entry_point)
+        by_name: Dict[str, Tuple[int, int]] = {name: (s, c) for name, s, c in timings}
+
+        if exit_code != 0 or entry_point not in by_name:
+            print(f"{entry_point:<45} could not be imported (exit code {exit_code})")
+            continue
+
+        total_ms = by_name[entry_point][1] / 1000
+        print(f"{entry_point:<45} {total_ms:10.2f} ms")
+
+        own_modules = sorted(
+            ((name, s) for name, s, _ in timings if name.startswith(("grapejuice", "grapejuiced"))),
+            key=lambda t: t[1],
+            reverse=True
+        )
+
+        for name, self_time in own_modules[:TOP_MODULES]:
+            print(f"    {name:<60} {self_time / 1000:8.2f} ms")
+
+        deferred = [name for name in DEFERRED_MODULES if name in by_name]
+        if deferred:
+            print(f"    imports deferred modules: {', '.join(deferred)}")
+            failed = True
+
+        if budget_ms is not None and total_ms > budget_ms:
+            print(f"    exceeds the budget of {budget_ms:.2f} ms")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmarks RegistryFile against a synthetic Wine registry hive.
+
+Usage: PYTHONPATH=src python benchmarks/registry_file_benchmark.py [size in MB]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from grapejuice_common.wine.registry_file import RegistryFile
+
+KEY_TEMPLATE = """[Software\\\\Benchmark\\\\Vendor{vendor}\\\\Product{product}] 1646400000
+#time=1d82c1f5f0d2e3a
+"DisplayName"="Synthetic product {product} of vendor {vendor}"
+"InstallLocation"="C:\\\\Program Files\\\\Vendor{vendor}\\\\Product{product}"
+"Version"=dword:{product:08x}
+"Blob"=hex:00,01,02,03,04,05,06,07,08,09,0a,0b,0c,0d,0e,0f,10,11,12,13,14,15,16,\\
+  17,18,19,1a,1b,1c,1d,1e,1f
+
+"""
+
+LOOKUPS = (
+    r"Software\\Wine\\DllOverrides",
+    r"Software\\Roblox\\RobloxStudioBrowser\\roblox.com"
+)
+
+
+def generate_hive(path: Path, size_mb: int):
+    target_size = size_mb * 1024 * 1024
+    written = 0
+    n = 0
+
+    with path.open("w") as fp:
+        fp.write("WINE REGISTRY Version 2\n;; All keys relative to \\\\User\\\\S-1-5-21-0-0-0-1000\n\n#arch=win64\n\n")
+
+        while written < target_size:
+            block = KEY_TEMPLATE.format(vendor=n // 100, product=n)
+            fp.write(block)
+            written += len(block)
+            n += 1
+
+            # Put the interesting keys somewhere in the middle
+            if n == 100000:
+                fp.write('[Software\\\\Wine\\\\DllOverrides] 1646400000\n"d3d11"="native"\n\n')
+                fp.write('[Software\\\\Roblox\\\\RobloxStudioBrowser\\\\roblox.com] 1646400000\n".ROBLOSECURITY"="x"\n\n')
+
+    return n
+
+
+def timed(label: str, fn):
+    t0 = time.perf_counter()
+    result = fn()
+    print(f"{label:<40} {(time.perf_counter() - t0) * 1000:10.2f} ms")
+
+    return result
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    with tempfile.TemporaryDirectory() as tmp:
+        hive_path = Path(tmp) / "user.reg"
+        n_keys = generate_hive(hive_path, size_mb)
+        print(f"Generated {hive_path.stat().st_size / 1024 / 1024:.1f} MB hive with {n_keys} keys")
+
+        hive = RegistryFile(hive_path)
+        timed("load (index key headers)", hive.load)
+
+        for path in LOOKUPS:
+            timed(f"find_key {path.split(chr(92))[-1]}", lambda p=path: hive.find_key(p))
+
+        timed("find_key (cached)", lambda: hive.find_key(LOOKUPS[0]))
+        timed("materialize every key", lambda: sum(1 for p in list(hive.key_paths) if hive.find_key(p)))
+
+
+if __name__ == '__main__':
+    main()
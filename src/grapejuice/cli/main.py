@@ -76,7 +76,7 @@ def studio(uri):
 def first_time_setup():
     from grapejuice_common.features.settings import current_settings
     from grapejuice_common.errors import WineprefixNotFoundUsingHints
-    from grapejuice_common.wine.wineprefix import Wineprefix
+    from grapejuice_common.wine.wineprefix_registry import wineprefix_registry
     from grapejuice_common.recipes.roblox_player_recipe import RobloxPlayerRecipe
     from grapejuice_common.wine.wine_functions import \
         get_player_wineprefix, \
@@ -102,7 +102,7 @@ def first_time_setup():
         current_settings.save_prefix_model(player_prefix_model)
         settings_dict = current_settings.as_dict()
 
-        player_prefix = Wineprefix(player_prefix_model)
+        player_prefix = wineprefix_registry.get(player_prefix_model)
 
     log.info("Starting Roblox Player recipe")
     player_recipe = RobloxPlayerRecipe()
@@ -126,7 +126,7 @@ def first_time_setup():
         log.info("Saving studio Wineprefix to settings")
         current_settings.save_prefix_model(studio_prefix_model)
 
-        studio_prefix = Wineprefix(studio_prefix_model)
+        studio_prefix = wineprefix_registry.get(studio_prefix_model)
 
     assert studio_prefix, "Studio Wineprefix was not created?!"
 
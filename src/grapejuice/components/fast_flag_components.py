@@ -1,71 +1,115 @@
-from typing import Callable
+from typing import Callable, Dict, Optional, Tuple
 
 from gi.repository import Gtk
 
 from grapejuice_common import paths
 from grapejuice_common.gtk.gtk_base import GtkBase
 from grapejuice_common.gtk.gtk_util import set_gtk_widgets_visibility
+from grapejuice_common.models.fast_flag_types import FastFlagType
 from grapejuice_common.models.fast_flags import FastFlag
 from grapejuice_common.util.event import Event, Subscription
 
 
 class GrapeFlagEditorWidget(Gtk.Box):
+    """
+    Edits the value of a flag. Widgets for every value type are created once and reused when the editor is bound to
+    another flag.
+    """
     _getter: Callable[[], any]
     _setter: Callable[[any], None]
+    _editors: Dict[Optional[FastFlagType], Tuple[Gtk.Widget, Callable[[], any], Callable[[any], None]]]
+    _binding: bool = False
 
     changed: Event()
 
-    def __init__(self, flag: FastFlag, *args, **kwargs):
+    def __init__(self, *args, flag: Optional[FastFlag] = None, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.changed = Event()
+        self._editors = dict()
 
-        if flag.is_a(bool):
+        if flag is not None:
+            self.bind(flag)
+
+    def _on_widget_changed(self):
+        if not self._binding:
+            self.changed()
+
+    def _create_editor(self, editor_type: Optional[FastFlagType]):
+        if editor_type is FastFlagType.bool:
             widget = Gtk.Switch()
-            widget.set_active(flag.value)
             widget.set_vexpand(False)
             widget.set_vexpand_set(True)
 
-            self._getter = widget.get_active
-            self._setter = widget.set_active
+            getter = widget.get_active
+            setter = widget.set_active
 
-            widget.connect("state-set", lambda *_: self.changed())
+            widget.connect("state-set", lambda *_: self._on_widget_changed())
 
-        elif flag.is_a(str):
+        elif editor_type is FastFlagType.string:
             widget = Gtk.Entry()
-            widget.set_text(flag.value)
             widget.set_hexpand(True)
             widget.set_hexpand_set(True)
 
-            self._getter = widget.get_text
-            self._setter = lambda v: widget.set_text(str(v))
+            getter = widget.get_text
+
+            def setter(v):
+                widget.set_text(str(v))
 
-            widget.connect("changed", lambda *_: self.changed())
+            widget.connect("changed", lambda *_: self._on_widget_changed())
 
-        elif flag.is_a(int):
+        elif editor_type is FastFlagType.int:
             adjustment = Gtk.Adjustment()
             adjustment.set_step_increment(1.0)
+            adjustment.set_lower(-2147483648)
             adjustment.set_upper(2147483647)
-            adjustment.set_value(flag.value)
 
             widget = Gtk.SpinButton()
             widget.set_adjustment(adjustment)
-            widget.set_value(flag.value)
 
-            self._getter = lambda: int(adjustment.get_value())
-            self._setter = lambda v: adjustment.set_value(int(v))
+            def getter():
+                return int(adjustment.get_value())
 
-            adjustment.connect("value-changed", lambda *_: self.changed())
+            def setter(v):
+                adjustment.set_value(int(v))
+
+            adjustment.connect("value-changed", lambda *_: self._on_widget_changed())
 
         else:
             widget = Gtk.Label()
 
-            self._setter = lambda v: widget.set_text(f"{v} (unknown type!)")
-            self._getter = lambda: None
+            def getter():
+                return None
+
+            def setter(v):
+                widget.set_text(f"{v} (unknown type!)")
 
         self.add(widget)
 
-        widget.show()
+        return widget, getter, setter
+
+    def bind(self, flag: FastFlag):
+        editor_type = flag.type
+
+        if not flag.is_a(editor_type.python_type):
+            # The value could not be converted to the type of the flag
+            editor_type = None
+
+        if editor_type not in self._editors:
+            self._editors[editor_type] = self._create_editor(editor_type)
+
+        for t, (widget, _, _) in self._editors.items():
+            widget.set_visible(t is editor_type)
+
+        _, self._getter, self._setter = self._editors[editor_type]
+
+        self._binding = True
+
+        try:
+            self._setter(flag.value)
+
+        finally:
+            self._binding = False
 
     @property
     def value(self):
@@ -77,22 +121,22 @@ class GrapeFlagEditorWidget(Gtk.Box):
 
 
 class GrapeFastFlagRow(GtkBase):
-    _flag: FastFlag
+    _flag: Optional[FastFlag] = None
     _editor_widget: GrapeFlagEditorWidget
     _change_subscription: Subscription = None
 
     flag_changed: Event
 
-    def __init__(self, flag: FastFlag):
+    def __init__(self, flag: Optional[FastFlag] = None):
         super().__init__(
             glade_path=paths.fast_flag_editor_glade(),
             root_widget_name="fast_flag_row"
         )
 
-        self._flag = flag
         self.flag_changed = Event()
 
-        self._editor_widget = GrapeFlagEditorWidget(flag)
+        self._editor_widget = GrapeFlagEditorWidget()
+        self._editor_widget.show()
         self.widgets.fast_flag_widgets.add(self._editor_widget)
         self._change_subscription = Subscription(
             self._editor_widget.changed,
@@ -101,24 +145,43 @@ class GrapeFastFlagRow(GtkBase):
 
         self.widgets.fflag_reset_button.connect("clicked", self._reset_button_clicked)
 
+        if flag is not None:
+            self.bind(flag)
+
+    def bind(self, flag: FastFlag):
+        """
+        Show another flag in this row
+        """
+        self._flag = flag
+        self._editor_widget.bind(flag)
+
         self.update_display()
 
     def _on_editor_value_changed(self):
+        if self._flag is None:
+            return
+
         self._flag.value = self._editor_widget.value
         self.update_display()
 
         self.flag_changed(self._flag)
 
     def _reset_button_clicked(self, *_):
+        if self._flag is None:
+            return
+
         self._flag.reset()
-        self._editor_widget.value = self._flag.value
+        self._editor_widget.bind(self._flag)
+        self.update_display()
+
+        self.flag_changed(self._flag)
 
     def update_display(self):
         self.widgets.fflag_name_label.set_text(self._flag.name)
         set_gtk_widgets_visibility([self.widgets.icon_fflag_changed], self._flag.has_changed)
         set_gtk_widgets_visibility(
             [self.widgets.fflag_reset_button],
-            self._flag.has_changed and (not self._flag.is_a(bool))
+            self._flag.has_changed and self._flag.type is not FastFlagType.bool
         )
 
     def destroy(self):
@@ -3,7 +3,6 @@ import random
 import subprocess
 import sys
 import time
-from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 
@@ -39,24 +38,14 @@ class ExtractFastFlags(background.BackgroundTask):
 
     def work(self) -> None:
         from grapejuice_common.ipc.dbus_client import dbus_connection
+        from grapejuice_common.wine.wine_functions import get_studio_wineprefix
 
-        should_extract_flags = True
+        # Studio only has to be started when a new version was installed since the last extraction
+        if get_studio_wineprefix().roblox.fast_flags_are_extracted:
+            self._log.info("Fast Flags of the installed Roblox Studio version were extracted before")
+            return
 
-        # Only check fast flags every x minutes, checking more often is overkill
-        # This also reduces overall compute time used, yay!
-
-        if paths.fast_flag_cache_location().exists():
-            ten_minutes_ago = datetime.now() - timedelta(minutes=10)
-
-            stat = os.stat(paths.fast_flag_cache_location())
-            if stat.st_mtime > ten_minutes_ago.timestamp():
-                should_extract_flags = False
-
-        if should_extract_flags:
-            dbus_connection().extract_fast_flags()
-
-        else:
-            time.sleep(1)  # Make it feel like Grapejuice is doing something
+        dbus_connection().extract_fast_flags()
 
 
 class OpenLogsDirectory(background.BackgroundTask):
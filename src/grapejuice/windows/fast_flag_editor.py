@@ -1,14 +1,13 @@
 import os
-from typing import Dict, Optional, List
+from typing import Dict, List
 
 from grapejuice.components.fast_flag_components import GrapeFastFlagRow
 from grapejuice_common import paths
 from grapejuice_common.gtk.components.grape_enum_menu import GrapeEnumMenu
 from grapejuice_common.gtk.gtk_base import GtkBase, handler
-from grapejuice_common.gtk.gtk_paginator import GtkPaginator
 from grapejuice_common.gtk.gtk_util import set_style_class_conditionally
+from grapejuice_common.gtk.gtk_virtual_list import GtkVirtualList
 from grapejuice_common.models.fast_flags import FastFlagList
-from grapejuice_common.models.paginator import Paginator
 from grapejuice_common.roblox_product import RobloxProduct
 from grapejuice_common.util.event import Subscription
 from grapejuice_common.wine.wineprefix import Wineprefix
@@ -19,13 +18,12 @@ def _base_fast_flags() -> FastFlagList:
     from grapejuice_common.wine.wine_functions import get_studio_wineprefix
 
     studio_prefix = get_studio_wineprefix()
+    snapshot = studio_prefix.roblox.fast_flag_snapshot()
 
-    return FastFlagList(source_file=next(
-        filter(
-            lambda f: f.exists(),
-            (paths.fast_flag_cache_location(), studio_prefix.roblox.fast_flag_dump_path)
-        )
-    ))
+    if snapshot is not None:
+        return FastFlagList(source_dictionary=snapshot.flags, types=snapshot.types)
+
+    return FastFlagList(source_file=studio_prefix.roblox.fast_flag_dump_path)
 
 
 def _parse_saved_flags(prefix: Wineprefix) -> Dict[RobloxProduct, FastFlagList]:
@@ -53,15 +51,13 @@ class FastFlagEditor(GtkBase):
     _fast_flags: Dict[RobloxProduct, FastFlagList]
     _roblox_product_menu: GrapeEnumMenu
     _roblox_product_selected_subscription: Subscription
-    _displayed_rows: List[GrapeFastFlagRow]
-    _displayed_rows_subscriptions: List[Subscription]
-    _paginator: Optional[Paginator] = None
+    _row_subscriptions: List[Subscription]
+    _virtual_list: GtkVirtualList
+    _search_query: str = ""
 
     __selected_product: RobloxProduct
     __unsaved_changes: bool = False
 
-    _paginator_paged_subscription: Optional[Subscription] = None
-
     def __init__(self, target_prefix: Wineprefix):
         super().__init__(
             glade_path=paths.fast_flag_editor_glade(),
@@ -72,11 +68,13 @@ class FastFlagEditor(GtkBase):
         self._target_prefix = target_prefix
         self._flags = _parse_saved_flags(target_prefix)
 
-        self._displayed_rows = []
-        self._displayed_rows_subscriptions = []
-
-        self._gtk_paginator = GtkPaginator()
-        self.widgets.paginator_box.add(self._gtk_paginator.root_widget)
+        self._row_subscriptions = []
+        self._virtual_list = GtkVirtualList(
+            self.gtk_fast_flag_list,
+            self.fast_flag_scroll,
+            self.widgets.fast_flag_scrollbar,
+            self._create_row
+        )
 
         self._selected_product = next(
             iter(
@@ -117,20 +115,15 @@ class FastFlagEditor(GtkBase):
     def _on_selected_product_changed(self, product: RobloxProduct):
         self._selected_product = product
 
-    def _clear_displayed_rows(self):
-        gtk_list = self.gtk_fast_flag_list
-
-        for sub in self._displayed_rows_subscriptions:
-            sub.unsubscribe()
+    def _create_row(self) -> GrapeFastFlagRow:
+        row = GrapeFastFlagRow()
 
-        for row in list(gtk_list.get_children()):
-            gtk_list.remove(row)
+        def on_flag_changed(_flag):
+            self._unsaved_changes = True
 
-        for row in self._displayed_rows:
-            row.destroy()
+        self._row_subscriptions.append(Subscription(row.flag_changed, on_flag_changed))
 
-        self._displayed_rows = list()
-        self._displayed_rows_subscriptions = []
+        return row
 
     @property
     def _selected_product(self) -> RobloxProduct:
@@ -139,60 +132,17 @@ class FastFlagEditor(GtkBase):
     @_selected_product.setter
     def _selected_product(self, product: RobloxProduct):
         self.__selected_product = product
-
-        page_size = 50
-
-        if self._paginator and self._paginator.filter_function:
-            self._paginator = Paginator(
-                self._active_flags,
-                page_size,
-                filter_function=self._paginator.filter_function
-            )
-
-        else:
-            self._paginator = Paginator(self._active_flags, page_size)
-
-        self._gtk_paginator.model = self._paginator
-
-        self._clear_displayed_rows()
-
-        if self._paginator_paged_subscription:
-            self._paginator_paged_subscription.unsubscribe()
-
-        self._paginator_paged_subscription = Subscription(
-            self._paginator.paged,
-            self._populate_flag_list
-        )
-
-        self._populate_flag_list()
+        self._show_flags()
 
     @property
     def _active_flags(self):
         return self._flags[self.__selected_product]
 
-    def _populate_flag_list(self):
-        self._clear_displayed_rows()
-
-        gtk_list = self.gtk_fast_flag_list
-
-        def on_flag_changed(_flag):
-            self._unsaved_changes = True
-
-        for flag in self._paginator.page:
-            row = GrapeFastFlagRow(flag)
+    def _show_flags(self):
+        flags = self._active_flags
+        flags.sort()
 
-            gtk_list.add(row.root_widget)
-            self._displayed_rows.append(row)
-
-            self._displayed_rows_subscriptions.append(
-                Subscription(row.flag_changed, on_flag_changed)
-            )
-
-        self.fast_flag_scroll.get_vadjustment().set_value(0)
-        gtk_list.show_all()
-
-        for row in self._displayed_rows:
-            row.update_display()
+        self._virtual_list.model = flags.search(self._search_query) if self._search_query else flags
 
     @property
     def _unsaved_changes(self):
@@ -242,24 +192,15 @@ class FastFlagEditor(GtkBase):
 
     @handler
     def on_search_changed(self, search_entry):
-        query = search_entry.get_text().lower()
-
-        if query:
-            def filter_function(flags_list):
-                return filter(lambda flag: query in flag.name.lower(), flags_list)
-
-            self._paginator.filter_function = filter_function
-
-        else:
-            self._paginator.filter_function = None
+        self._search_query = search_entry.get_text()
+        self._show_flags()
 
     @handler
     def reset_all_flags(self, *_):
         for flags in self._flags.values():
             flags.reset_all_flags()
 
-            for row in self._displayed_rows:
-                row.update_display()
+        self._virtual_list.refresh()
 
         self._unsaved_changes = True
 
@@ -279,10 +220,7 @@ class FastFlagEditor(GtkBase):
         self._unsaved_changes = False
 
     def __del__(self):
-        self._clear_displayed_rows()
+        for subscription in self._row_subscriptions:
+            subscription.unsubscribe()
 
         self._roblox_product_selected_subscription.unsubscribe()
-
-        if self._paginator_paged_subscription:
-            self._paginator_paged_subscription.unsubscribe()
-            self._paginator_paged_subscription = None
@@ -42,6 +42,7 @@ from grapejuice_common.util.event import Subscription
 from grapejuice_common.util.stores import WritableStore
 from grapejuice_common.wine.wine_functions import create_new_model_for_user, get_studio_wineprefix
 from grapejuice_common.wine.wineprefix import Wineprefix
+from grapejuice_common.wine.wineprefix_registry import wineprefix_registry
 
 
 def _open_fast_flags_for(prefix: Wineprefix):
@@ -146,7 +147,7 @@ class MainWindow(GtkBase):
         self._show_start_page()
 
         self._current_prefix = ComputedField(
-            lambda: None if self._current_prefix_model is None else Wineprefix(self._current_prefix_model)
+            lambda: None if self._current_prefix_model is None else wineprefix_registry.get(self._current_prefix_model)
         )
 
         _check_for_updates(self.widgets)
@@ -412,7 +413,7 @@ class MainWindow(GtkBase):
 
         model.create_name_on_disk_from_display_name()
         current_settings.save_prefix_model(model)
-        prefix = Wineprefix(model)
+        prefix = wineprefix_registry.get(model)
 
         def after_installation(_task):
             self._populate_prefix_list()
@@ -126,6 +126,13 @@ def _general_settings():
                         "profiling step only happens when the hardware profile is not set or when the current "
                         "hardware does not match the previously profiled hardware. This setting is automatically "
                         "disabled if hardware profiling fails."
+        ),
+        _from_user_settings(
+            key="persistent_wineservers",
+            default_value=False,
+            display_name="Keep Wine servers running",
+            description="Keeps the Wine server of a Wineprefix running after Roblox closes, and starts the servers "
+                        "when the Grapejuice daemon starts. This makes launching Roblox faster."
         )
     ]
 
@@ -67,6 +67,21 @@ class RobloxExecutableNotFound(RuntimeError):
         super().__init__(f"Roblox executable '{executable_name}' could not be found!")
 
 
+class FastFlagExtractionFailed(RuntimeError):
+    def __init__(self, reason: str):
+        super().__init__(f"Roblox Studio did not dump its Fast Flags: {reason}")
+
+
+class DownloadChecksumMismatch(RuntimeError):
+    def __init__(self, url: str, expected: str, actual: str):
+        super().__init__(f"The download from {url} is corrupt, expected SHA-256 {expected} but got {actual}")
+
+
+class ReleaseMetadataUnavailable(RuntimeError):
+    def __init__(self, url: str, reason):
+        super().__init__(f"Could not get release information from {url}: {reason}")
+
+
 class NoWineprefixConfiguration(RuntimeError):
     def __init__(self):
         super().__init__("Configuration for a Wineprefix instance cannot be None")
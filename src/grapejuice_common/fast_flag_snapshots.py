@@ -0,0 +1,109 @@
+import gzip
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from grapejuice_common import paths, variables
+from grapejuice_common.models.fast_flag_types import infer_types
+from grapejuice_common.util import atomic_write
+
+LOG = logging.getLogger(__name__)
+
+# Version 2 snapshots store the inferred type of every flag next to the flags
+INDEX_VERSION = 2
+
+FastFlagDictionary = Dict[str, any]
+
+
+@dataclass(frozen=True)
+class FastFlagSnapshot:
+    flags: FastFlagDictionary
+    types: str
+
+
+class FastFlagSnapshots:
+    """
+    Fast Flag dumps of Roblox Studio, one per Studio version. Snapshots are stored as compressed compact JSON named
+    after the hash of their contents, so versions that ship the same flags share a snapshot. The index maps the names
+    of the Studio version directories onto those hashes.
+    """
+    _directory: Path
+    _index: Optional[Dict[str, str]] = None
+
+    def __init__(self, directory: Optional[Path] = None):
+        self._directory = directory or paths.fast_flag_snapshot_directory()
+
+    @property
+    def _index_path(self) -> Path:
+        return self._directory / "index.json"
+
+    def _snapshot_path(self, digest: str) -> Path:
+        return self._directory / f"{digest}.json.gz"
+
+    def _load_index(self) -> Dict[str, str]:
+        if self._index is None:
+            self._index = dict()
+
+            try:
+                with self._index_path.open("r", encoding=variables.text_encoding()) as fp:
+                    index = json.load(fp)
+
+                if index.get("version", None) == INDEX_VERSION:
+                    self._index = index.get("snapshots", dict())
+
+            except FileNotFoundError:
+                pass
+
+            except (json.JSONDecodeError, AttributeError) as e:
+                LOG.warning(f"Ignoring invalid Fast Flag snapshot index: {e}")
+
+        return self._index
+
+    def has(self, studio_version: str) -> bool:
+        digest = self._load_index().get(studio_version, None)
+
+        return digest is not None and self._snapshot_path(digest).exists()
+
+    def load(self, studio_version: str) -> Optional[FastFlagSnapshot]:
+        digest = self._load_index().get(studio_version, None)
+        if digest is None:
+            return None
+
+        try:
+            with gzip.open(self._snapshot_path(digest), "rb") as fp:
+                payload = json.loads(fp.read().decode(variables.text_encoding()))
+
+            return FastFlagSnapshot(flags=payload["flags"], types=payload["types"])
+
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            LOG.warning(f"Could not read Fast Flag snapshot for {studio_version}: {e}")
+
+        return None
+
+    def store(self, studio_version: str, flags: FastFlagDictionary) -> Path:
+        flags = dict(sorted(flags.items()))
+        payload = {"flags": flags, "types": infer_types(flags)}
+
+        compact = json.dumps(payload, separators=(",", ":")).encode(variables.text_encoding())
+        digest = hashlib.blake2s(compact).hexdigest()
+        snapshot_path = self._snapshot_path(digest)
+
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+        if not snapshot_path.exists():
+            atomic_write(snapshot_path, gzip.compress(compact, mtime=0))
+
+        index = self._load_index()
+        index[studio_version] = digest
+
+        atomic_write(
+            self._index_path,
+            json.dumps({"version": INDEX_VERSION, "snapshots": index}).encode(variables.text_encoding())
+        )
+
+        LOG.info(f"Stored Fast Flag snapshot {digest} for Studio {studio_version}")
+
+        return snapshot_path
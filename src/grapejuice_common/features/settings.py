@@ -1,21 +1,33 @@
+import atexit
+import hashlib
 import json
 import logging
+import threading
 from copy import deepcopy
 from dataclasses import asdict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, TYPE_CHECKING
 
 from grapejuice_common import paths
 from grapejuice_common.errors import HardwareProfilingError, NoHardwareProfile, PresentableError
-from grapejuice_common.hardware_info.hardware_profile import HardwareProfile, profile_hardware
+from grapejuice_common.features.wineprefix_index import WineprefixIndex
 from grapejuice_common.models.wineprefix_configuration_model import WineprefixConfigurationModel
+from grapejuice_common.util import atomic_write
+
+if TYPE_CHECKING:
+    # The hardware modules are imported when the hardware profile is used, importing settings should stay cheap
+    from grapejuice_common.hardware_info.hardware_profile import HardwareProfile
 
 LOG = logging.getLogger(__name__)
 
 CURRENT_SETTINGS_VERSION = 2
 
+# Saves requested within this many seconds of each other are written to disk once
+SAVE_DELAY = 0.25
+
 k_version = "__version__"  # Magic variable gets underscores
 k_hardware_profile = "__hardware_profile__"
+k_hardware_fingerprint = "__hardware_fingerprint__"
 
 k_show_fast_flag_warning = "show_fast_flag_warning"
 k_wine_binary = "wine_binary"
@@ -29,18 +41,30 @@ k_enabled_tweaks = "enabled_tweaks"
 k_ignore_wine_version = "ignore_wine_version"
 k_unsupported_settings = "unsupported_settings"
 k_try_profiling_hardware = "try_profiling_hardware"
+k_persistent_wineservers = "persistent_wineservers"
+
+# Stored instead of a fingerprint when sysfs cannot identify the hardware, so the LSPci comparison only runs once
+NO_HARDWARE_FINGERPRINT = "unavailable"
+
+
+def _hardware_fingerprint() -> str:
+    from grapejuice_common.hardware_info.hardware_fingerprint import hardware_fingerprint
+
+    return hardware_fingerprint() or NO_HARDWARE_FINGERPRINT
 
 
 def default_settings() -> Dict[str, any]:
     return {
         k_version: 0,
         k_hardware_profile: None,
+        k_hardware_fingerprint: None,
         k_show_fast_flag_warning: True,
         k_no_daemon_mode: True,
         k_release_channel: "master",
         k_disable_updates: False,
         k_ignore_wine_version: False,
         k_try_profiling_hardware: True,
+        k_persistent_wineservers: False,
         k_wineprefixes: [],
         k_unsupported_settings: dict()
     }
@@ -54,9 +78,18 @@ def _text_encoding():
 class UserSettings:
     _settings_object: Dict[str, any] = None
     _location: Path = None
-
-    def __init__(self, file_location=paths.grapejuice_user_settings()):
-        self._location = file_location
+    _lock: threading.RLock
+    _profiling_thread: Optional[threading.Thread] = None
+    _save_timer: Optional[threading.Timer] = None
+    _save_pending: bool = False
+    _flush_at_exit: bool = False
+    _written_digest: Optional[str] = None
+    _prefix_index: Optional[WineprefixIndex] = None
+    _indexed_prefixes: Optional[List[Dict]] = None
+
+    def __init__(self, file_location: Optional[Path] = None):
+        self._location = file_location or paths.grapejuice_user_settings()
+        self._lock = threading.RLock()
         self.load()
 
     def perform_migrations(self, desired_migration_version: int = CURRENT_SETTINGS_VERSION):
@@ -79,6 +112,7 @@ class UserSettings:
             if callable(migration_function):
                 LOG.info(f"Applying migration {index}: {migration_function}")
                 migration_function(self._settings_object)
+                self._prefix_index = None
 
                 LOG.info(f"Applying and saving new settings version {x}")
                 self.set(k_version, x, save=True)
@@ -93,7 +127,11 @@ class UserSettings:
         return self.get(k_version, 0)
 
     @property
-    def hardware_profile(self) -> HardwareProfile:
+    def hardware_profile(self) -> "HardwareProfile":
+        from grapejuice_common.hardware_info.hardware_profile import HardwareProfile
+
+        self.wait_for_hardware_profiling()
+
         if self._profile_hardware():
             self.save()
 
@@ -102,23 +140,42 @@ class UserSettings:
 
         return HardwareProfile.from_dict(self._settings_object[k_hardware_profile])
 
+    @property
+    def _wineprefix_index(self) -> WineprefixIndex:
+        """
+        The index is built when it is first used after loading, and rebuilt when the list of prefixes is replaced
+        """
+        with self._lock:
+            prefixes = self._settings_object.setdefault(k_wineprefixes, [])
+
+            if self._prefix_index is None or self._indexed_prefixes is not prefixes:
+                self._prefix_index = WineprefixIndex(prefixes)
+                self._indexed_prefixes = prefixes
+
+            return self._prefix_index
+
     @property
     def raw_wineprefixes_sorted(self) -> List[Dict]:
-        return list(sorted(
-            self._settings_object.get(k_wineprefixes),
-            key=lambda wp: wp.get("priority", 999)
-        ))
+        return self._wineprefix_index.raw_prefixes
 
     @property
     def parsed_wineprefixes_sorted(self) -> List[WineprefixConfigurationModel]:
-        return list(map(WineprefixConfigurationModel.from_dict, self.raw_wineprefixes_sorted))
+        """
+        :return: Prefix models ordered by priority, the instances are shared with other lookups
+        """
+        return self._wineprefix_index.models
 
     def find_wineprefix(self, search_id: str) -> Optional[WineprefixConfigurationModel]:
-        for prefix_configuration in self._settings_object.get(k_wineprefixes, []):
-            if prefix_configuration["id"] == search_id:
-                return WineprefixConfigurationModel.from_dict(prefix_configuration)
+        return self._wineprefix_index.find(search_id)
+
+    def wineprefix_revision(self, search_id: str) -> Optional[int]:
+        return self._wineprefix_index.revision_of(search_id)
 
-        return None
+    def find_wineprefix_by_hints(self, hints: List[str]) -> Optional[WineprefixConfigurationModel]:
+        return self._wineprefix_index.find_by_hints(hints)
+
+    def find_wineprefix_by_name_on_disk(self, name_on_disk: str) -> Optional[WineprefixConfigurationModel]:
+        return self._wineprefix_index.find_by_name_on_disk(name_on_disk)
 
     def get(self, key: str, default_value: any = None):
         if self._settings_object:
@@ -127,21 +184,46 @@ class UserSettings:
         return default_value
 
     def set(self, key: str, value: any, save: bool = False) -> any:
-        self._settings_object[key] = value
+        with self._lock:
+            self._settings_object[key] = value
 
-        if save:
-            self.save()
+            if save:
+                self.save()
 
         return value
 
-    def _profile_hardware(self, always_profile: Optional[bool] = False) -> bool:
+    def _hardware_has_changed(self, saved_profile: Dict[str, any], fingerprint: str) -> Optional[bool]:
         """
-        Profile the hardware of the machine Grapejuice is running on. This method may silently
-        fail as profiling hardware is quite a complex task. Due to this, the return value
-        of this method is a boolean indicating if the caller should save the Grapejuice settings.
-        :param always_profile: Override any logic in the method, and just go ahead with the profiling
-        :return: Boolean indicating whether settings should be saved or not.
+        :return: Whether the hardware differs from the profiled hardware, None when that could not be determined
         """
+        from grapejuice_common.hardware_info.hardware_profile import HardwareProfile
+
+        if saved_profile.get("version", -1) != HardwareProfile.version:
+            return True
+
+        if self._settings_object.get(k_hardware_fingerprint, None) is not None:
+            return fingerprint != self._settings_object[k_hardware_fingerprint]
+
+        # Without a fingerprint to compare to, fall back to comparing the graphics cards
+        from grapejuice_common.hardware_info.lspci import LSPci
+
+        try:
+            hardware_list = LSPci()
+
+        except Exception as e:
+            LOG.info("Failed to get LSPci info: " + str(e))
+
+            return None
+
+        has_changed = hardware_list.graphics_id != saved_profile["graphics_id"]
+
+        if not has_changed:
+            # Profiles made before fingerprints existed get one, so the next start does not need LSPci
+            self.set(k_hardware_fingerprint, fingerprint, save=True)
+
+        return has_changed
+
+    def _should_profile_hardware(self, fingerprint: str, always_profile: Optional[bool] = False) -> bool:
         saved_profile = None if always_profile else self._settings_object.get(k_hardware_profile, None)
 
         should_try = self._settings_object.get(k_try_profiling_hardware, True)
@@ -149,39 +231,68 @@ class UserSettings:
             return False
 
         if saved_profile:
-            from grapejuice_common.hardware_info.lspci import LSPci
-
-            try:
-                hardware_list = LSPci()
+            return self._hardware_has_changed(saved_profile, fingerprint) is True
 
-            except Exception as e:
-                LOG.info("Failed to get LSPci info: " + str(e))
+        return True
 
-                return False
+    def _run_hardware_profiler(self, fingerprint: str):
+        from grapejuice_common.hardware_info.hardware_profile import profile_hardware
 
-            should_profile_hardware = (hardware_list.graphics_id != saved_profile["graphics_id"]) or \
-                                      (saved_profile.get("version", -1) != HardwareProfile.version)
+        LOG.info("Going to profile hardware")
 
-        else:
-            should_profile_hardware = True
-
-        if should_profile_hardware:
-            LOG.info("Going to profile hardware")
+        try:
+            profile = profile_hardware()
 
-            try:
-                profile = profile_hardware()
+            with self._lock:
                 self._settings_object[k_hardware_profile] = profile.as_dict
+                self._settings_object[k_hardware_fingerprint] = fingerprint
 
-            except HardwareProfilingError as e:
-                LOG.error("Failed to profile hardware: " + str(e))
-                LOG.info("No longer try to profile hardware due to errors")
+        except HardwareProfilingError as e:
+            LOG.error("Failed to profile hardware: " + str(e))
+            LOG.info("No longer try to profile hardware due to errors")
 
-                self.set(k_try_profiling_hardware, False, save=False)
+            self.set(k_try_profiling_hardware, False, save=False)
 
+    def _profile_hardware(self, always_profile: Optional[bool] = False) -> bool:
+        """
+        Profile the hardware of the machine Grapejuice is running on. This method may silently
+        fail as profiling hardware is quite a complex task. Due to this, the return value
+        of this method is a boolean indicating if the caller should save the Grapejuice settings.
+        :param always_profile: Override any logic in the method, and just go ahead with the profiling
+        :return: Boolean indicating whether settings should be saved or not.
+        """
+        fingerprint = _hardware_fingerprint()
+
+        if self._should_profile_hardware(fingerprint, always_profile):
+            self._run_hardware_profiler(fingerprint)
             return True
 
         return False
 
+    def _profile_hardware_in_background(self):
+        """
+        Checks the hardware fingerprint, which only takes a few file reads. When the hardware changed, it is profiled
+        on another thread and the settings are saved once that is done. The previous profile remains in use until then.
+        """
+        fingerprint = _hardware_fingerprint()
+
+        if not self._should_profile_hardware(fingerprint):
+            return
+
+        def profile():
+            self._run_hardware_profiler(fingerprint)
+            self.save()
+
+        # Profiling must not keep Grapejuice from exiting, the hardware is profiled again on the next start
+        self._profiling_thread = threading.Thread(target=profile, name="hardware-profiler", daemon=True)
+        self._profiling_thread.start()
+
+    def wait_for_hardware_profiling(self):
+        thread = self._profiling_thread
+
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
     def load(self):
         save_settings = False
 
@@ -189,19 +300,20 @@ class UserSettings:
             LOG.debug(f"Loading settings from '{self._location}'")
 
             try:
-                with self._location.open("r") as fp:
-                    self._settings_object = json.load(fp)
+                data = self._location.read_bytes()
+                self._written_digest = hashlib.blake2s(data).hexdigest()
+                self._settings_object = json.loads(data.decode(_text_encoding()))
 
-                    # Make sure all the default settings are present
-                    # Using a for loop because magic settings shouldn't be touched
-                    for k, v in default_settings().items():
-                        # Do not touch magic variables here
-                        if k.startswith("__") and k.endswith("__"):
-                            continue
+                # Make sure all the default settings are present
+                # Using a for loop because magic settings shouldn't be touched
+                for k, v in default_settings().items():
+                    # Do not touch magic variables here
+                    if k.startswith("__") and k.endswith("__"):
+                        continue
 
-                        if k not in self._settings_object:
-                            self._settings_object[k] = v
-                            save_settings = True
+                    if k not in self._settings_object:
+                        self._settings_object[k] = v
+                        save_settings = True
 
             except json.JSONDecodeError as e:
                 raise PresentableError(
@@ -217,17 +329,50 @@ class UserSettings:
             self._settings_object = default_settings()
             save_settings = True
 
-        save_settings = self._profile_hardware() or save_settings
+        self._profile_hardware_in_background()
 
         if save_settings:
             LOG.info("Saving settings after load, because something was wrong.")
             self.save()
 
-    def save(self):
-        LOG.debug(f"Saving settings file to '{self._location}'")
+    def save(self, immediately: bool = False):
+        """
+        Save the settings. Unless immediately is set, the settings are written shortly after, so multiple changes in
+        a row only cause one write. Pending saves are flushed when the interpreter exits.
+        """
+        with self._lock:
+            self._save_pending = True
+
+            if immediately:
+                self.flush()
+                return
+
+            if not self._flush_at_exit:
+                atexit.register(self.flush)
+                self._flush_at_exit = True
+
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(SAVE_DELAY, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def flush(self):
+        """
+        Write pending changes to disk right away
+        """
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
 
-        # Sort wineprefixes before saving so the file order matches the UI
-        self._settings_object[k_wineprefixes] = self.raw_wineprefixes_sorted
+            if self._save_pending:
+                self._save_pending = False
+                self._write()
+
+    def _write(self):
+
+        # Sort wineprefixes before saving so the file order matches the UI, in place so the index stays valid
+        self._settings_object.setdefault(k_wineprefixes, [])[:] = self.raw_wineprefixes_sorted
 
         # Store in value so its not called twice
         defaults = default_settings()
@@ -242,53 +387,56 @@ class UserSettings:
         for k in unsupported_setting_keys:
             self._settings_object[k_unsupported_settings][k] = self._settings_object.pop(k)
 
-        # Perform actual save
-        self._location.parent.mkdir(parents=True, exist_ok=True)
-        with self._location.open("w+", encoding=_text_encoding()) as fp:
-            self._settings_object = {
-                **defaults,
-                **(self._settings_object or {})
-            }
+        self._settings_object = {
+            **defaults,
+            **(self._settings_object or {})
+        }
+
+        data = json.dumps(self._settings_object, indent=2).encode(_text_encoding())
+        digest = hashlib.blake2s(data).hexdigest()
+
+        if digest == self._written_digest:
+            LOG.debug("Settings did not change, not writing them")
+            return
 
-            # Dump the string, `json.dump` destroys the file when something goes wrong
-            json_string = json.dumps(self._settings_object, indent=2)
+        LOG.debug(f"Saving settings file to '{self._location}'")
 
-            fp.write(json_string)
+        # A crash while saving cannot leave a truncated settings file behind
+        self._location.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self._location, data)
+        self._written_digest = digest
 
     def save_prefix_model(self, model: WineprefixConfigurationModel):
-        did_update = False
         model_as_dict = asdict(model)
 
-        # Extract and re-insert wineprefixes list in case it doesn't exist
-        prefixes = self._settings_object.get(k_wineprefixes, [])
-
-        if self.find_wineprefix(model.id) is None:
-            prefixes.append(model_as_dict)
-            did_update = True
+        with self._lock:
+            index = self._wineprefix_index
+            prefix_configuration = index.find_raw(model.id)
 
-        else:
-            for prefix_configuration in prefixes:
-                if prefix_configuration["id"] == model.id:
-                    for k, v in model_as_dict.items():
-                        prefix_configuration[k] = v
+            if prefix_configuration is None:
+                prefix_configuration = model_as_dict
+                self._settings_object[k_wineprefixes].append(prefix_configuration)
 
-                    did_update = True
+            else:
+                prefix_configuration.update(model_as_dict)
 
-        self._settings_object[k_wineprefixes] = prefixes
+            index.put(model, prefix_configuration)
 
-        if did_update:
-            self.save()
+        self.save()
 
     def remove_prefix_model(self, model: WineprefixConfigurationModel):
-        def keep_model(m: Dict):
-            return m["id"] != model.id
+        with self._lock:
+            index = self._wineprefix_index
+            prefix_configuration = index.find_raw(model.id)
+
+            if prefix_configuration is not None:
+                prefixes = self._settings_object[k_wineprefixes]
+                prefixes[:] = [p for p in prefixes if p is not prefix_configuration]
+
+                index.remove(model.id)
 
-        self._settings_object[k_wineprefixes] = list(
-            filter(
-                keep_model,
-                self._settings_object.get(k_wineprefixes, [])
-            )
-        )
+        from grapejuice_common.wine.wineprefix_registry import wineprefix_registry
+        wineprefix_registry.forget(model.id)
 
         self.save()
 
@@ -296,4 +444,31 @@ class UserSettings:
         return deepcopy(self._settings_object)
 
 
-current_settings = UserSettings()
+class _LazyUserSettings:
+    """
+    Stands in for the UserSettings instance until it is used, so importing this module does not read the settings
+    file or profile hardware
+    """
+    _instance: Optional[UserSettings] = None
+    _lock = threading.Lock()
+
+    def _get_instance(self) -> UserSettings:
+        instance = self._instance
+
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    type(self)._instance = UserSettings()
+
+                instance = self._instance
+
+        return instance
+
+    def __getattr__(self, name: str):
+        return getattr(self._get_instance(), name)
+
+    def __repr__(self):
+        return f"<lazy {UserSettings.__name__}: {'loaded' if self._instance else 'not loaded'}>"
+
+
+current_settings: UserSettings = _LazyUserSettings()
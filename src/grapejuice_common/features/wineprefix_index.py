@@ -0,0 +1,143 @@
+from bisect import insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from grapejuice_common.models.wineprefix_configuration_model import WineprefixConfigurationModel
+
+SortKey = Tuple[int, int]
+
+# The hints and name on disk a prefix was indexed under. Callers mutate models in place, so these can't be read back
+# from the model when it is unlinked.
+IndexedFields = Tuple[Tuple[str, ...], str]
+
+
+class WineprefixIndex:
+    """
+    Wineprefix configurations from the user settings, indexed by id, by hint and by name on disk. Models are created
+    once and shared by every lookup. Prefixes are ordered by priority, prefixes with the same priority keep the order
+    they have in the settings.
+    """
+    _models: Dict[str, WineprefixConfigurationModel]
+    _raw: Dict[str, Dict[str, any]]
+    _keys: Dict[str, SortKey]
+    _indexed: Dict[str, IndexedFields]
+    _order: List[Tuple[SortKey, str]]
+    _by_hint: Dict[str, List[Tuple[SortKey, str]]]
+    _by_name_on_disk: Dict[str, str]
+    _revisions: Dict[str, int]
+    _sequence: int = 0
+    _revision: int = 0
+
+    def __init__(self, raw_prefixes: Iterable[Dict[str, any]] = tuple()):
+        self._models = dict()
+        self._raw = dict()
+        self._keys = dict()
+        self._indexed = dict()
+        self._order = []
+        self._by_hint = dict()
+        self._by_name_on_disk = dict()
+        self._revisions = dict()
+
+        for raw_prefix in raw_prefixes:
+            self.put(WineprefixConfigurationModel.from_dict(raw_prefix), raw_prefix)
+
+    def _unlink(self, prefix_id: str):
+        self._models.pop(prefix_id)
+        self._raw.pop(prefix_id)
+        self._revisions.pop(prefix_id)
+        entry = (self._keys.pop(prefix_id), prefix_id)
+        hints, name_on_disk = self._indexed.pop(prefix_id)
+
+        self._order.remove(entry)
+
+        for hint in hints:
+            entries = self._by_hint.get(hint, [])
+
+            if entry in entries:
+                entries.remove(entry)
+
+        if self._by_name_on_disk.get(name_on_disk, None) == prefix_id:
+            self._by_name_on_disk.pop(name_on_disk)
+
+    def put(self, model: WineprefixConfigurationModel, raw_prefix: Dict[str, any]):
+        """
+        Add a prefix, or replace the prefix with the same id
+        :param raw_prefix: The dictionary that stores this prefix in the settings
+        """
+        if model.id in self._models:
+            sequence = self._keys[model.id][1]
+            self._unlink(model.id)
+
+        else:
+            sequence = self._sequence
+            self._sequence += 1
+
+        key = (model.priority, sequence)
+        entry = (key, model.id)
+
+        self._models[model.id] = model
+        self._raw[model.id] = raw_prefix
+        self._keys[model.id] = key
+        self._indexed[model.id] = (tuple(set(model.hints)), model.name_on_disk)
+        insort(self._order, entry)
+
+        for hint in self._indexed[model.id][0]:
+            insort(self._by_hint.setdefault(hint, []), entry)
+
+        self._by_name_on_disk.setdefault(model.name_on_disk, model.id)
+
+        self._revision += 1
+        self._revisions[model.id] = self._revision
+
+    def remove(self, prefix_id: str):
+        if prefix_id in self._models:
+            self._unlink(prefix_id)
+
+    def find(self, prefix_id: str) -> Optional[WineprefixConfigurationModel]:
+        return self._models.get(prefix_id, None)
+
+    def revision_of(self, prefix_id: str) -> Optional[int]:
+        """
+        :return: A number that changes every time the prefix is put into the index, None for unknown prefixes
+        """
+        return self._revisions.get(prefix_id, None)
+
+    def find_raw(self, prefix_id: str) -> Optional[Dict[str, any]]:
+        return self._raw.get(prefix_id, None)
+
+    def find_by_name_on_disk(self, name_on_disk: str) -> Optional[WineprefixConfigurationModel]:
+        prefix_id = self._by_name_on_disk.get(name_on_disk, None)
+
+        return None if prefix_id is None else self._models[prefix_id]
+
+    def find_by_hints(self, hints: Iterable[str]) -> Optional[WineprefixConfigurationModel]:
+        """
+        :return: The prefix with the highest priority that has all the hints
+        """
+        hints = list(hints)
+        if not hints:
+            return self._models[self._order[0][1]] if self._order else None
+
+        # Walk the shortest hint list and check the other hints on its models
+        candidates = min((self._by_hint.get(hint, []) for hint in hints), key=len)
+
+        for _, prefix_id in candidates:
+            model_hints = self._models[prefix_id].hints
+
+            if all(hint in model_hints for hint in hints):
+                return self._models[prefix_id]
+
+        return None
+
+    @property
+    def models(self) -> List[WineprefixConfigurationModel]:
+        return [self._models[prefix_id] for _, prefix_id in self._order]
+
+    @property
+    def raw_prefixes(self) -> List[Dict[str, any]]:
+        return [self._raw[prefix_id] for _, prefix_id in self._order]
+
+    def __contains__(self, prefix_id: str):
+        return prefix_id in self._models
+
+    def __len__(self):
+        return len(self._models)
@@ -0,0 +1,151 @@
+from typing import Callable, List, Optional, Sequence
+
+from gi.repository import Gtk, Gdk, GLib
+
+# Height used for sizing the pool until a row has been allocated
+FALLBACK_ROW_HEIGHT = 40
+
+SCROLL_STEP = 3
+
+
+class GtkVirtualList:
+    """
+    Shows a long sequence in a Gtk.ListBox using a small pool of rows. Only as many rows as fit in the scrolled window
+    are created, when the user scrolls they are rebound to other items. The scrolled window should use the external
+    vertical scrollbar policy, the position in the sequence is controlled by the given scrollbar instead.
+
+    Rows must have a root_widget and a bind(item) method.
+    """
+    _list_box: Gtk.ListBox
+    _scroll: Gtk.ScrolledWindow
+    _adjustment: Gtk.Adjustment
+    _create_row: Callable[[], any]
+    _rows: List[any]
+    _list_box_rows: List[Gtk.ListBoxRow]
+    _model: Sequence
+    _row_height: int = FALLBACK_ROW_HEIGHT
+    _visible_rows: int = 1
+    _refresh_pending: bool = False
+
+    def __init__(
+        self,
+        list_box: Gtk.ListBox,
+        scroll: Gtk.ScrolledWindow,
+        scrollbar: Gtk.Scrollbar,
+        create_row: Callable[[], any]
+    ):
+        self._list_box = list_box
+        self._scroll = scroll
+        self._create_row = create_row
+        self._rows = []
+        self._list_box_rows = []
+        self._model = []
+
+        self._adjustment = Gtk.Adjustment(value=0, lower=0, upper=0, step_increment=1, page_increment=1, page_size=1)
+        self._adjustment.connect("value-changed", lambda *_: self._bind_rows())
+        scrollbar.set_adjustment(self._adjustment)
+
+        scroll.add_events(Gdk.EventMask.SCROLL_MASK | Gdk.EventMask.SMOOTH_SCROLL_MASK)
+        scroll.connect("scroll-event", self._on_scroll_event)
+        scroll.connect("size-allocate", self._on_size_allocate)
+
+    @property
+    def model(self) -> Sequence:
+        return self._model
+
+    @model.setter
+    def model(self, model: Optional[Sequence]):
+        self._model = model if model is not None else []
+        self._update_adjustment()
+
+        if self._adjustment.get_value() != 0:
+            # Rebinding happens through the value-changed handler
+            self._adjustment.set_value(0)
+
+        else:
+            self._bind_rows()
+
+    @property
+    def rows(self) -> List[any]:
+        return list(self._rows)
+
+    def refresh(self):
+        """
+        Rebind the rows, needed when the items in the model were modified
+        """
+        self._update_adjustment()
+        self._bind_rows()
+
+    def _update_adjustment(self):
+        page_size = min(self._visible_rows, len(self._model)) or 1
+
+        self._adjustment.set_upper(len(self._model))
+        self._adjustment.set_page_size(page_size)
+        self._adjustment.set_page_increment(page_size)
+
+    def _bind_rows(self):
+        offset = int(self._adjustment.get_value())
+        items = self._model[offset:offset + self._visible_rows]
+
+        while len(self._rows) < len(items):
+            row = self._create_row()
+
+            list_box_row = Gtk.ListBoxRow()
+            list_box_row.add(row.root_widget)
+            row.root_widget.show()
+            self._list_box.add(list_box_row)
+
+            self._rows.append(row)
+            self._list_box_rows.append(list_box_row)
+
+        for i, (row, list_box_row) in enumerate(zip(self._rows, self._list_box_rows)):
+            if i < len(items):
+                row.bind(items[i])
+                list_box_row.show()
+
+            else:
+                list_box_row.hide()
+
+    def _deferred_refresh(self):
+        self._refresh_pending = False
+        self.refresh()
+
+        return False
+
+    def _on_size_allocate(self, _widget, allocation):
+        shown_rows = list(filter(Gtk.Widget.get_visible, self._list_box_rows))
+
+        if shown_rows:
+            row_height = shown_rows[0].get_allocated_height()
+
+            if row_height > 1:
+                self._row_height = row_height
+
+        visible_rows = max(1, allocation.height // self._row_height + 1)
+
+        if visible_rows != self._visible_rows:
+            self._visible_rows = visible_rows
+
+            # Rebinding rows changes their size, which must not happen during allocation. Several allocations in
+            # a row, like while the window is being resized, are handled by a single refresh.
+            if not self._refresh_pending:
+                self._refresh_pending = True
+                GLib.idle_add(self._deferred_refresh)
+
+    def _on_scroll_event(self, _widget, event):
+        if event.direction == Gdk.ScrollDirection.UP:
+            delta = -SCROLL_STEP
+
+        elif event.direction == Gdk.ScrollDirection.DOWN:
+            delta = SCROLL_STEP
+
+        elif event.direction == Gdk.ScrollDirection.SMOOTH:
+            delta = event.delta_y * SCROLL_STEP
+
+        else:
+            return False
+
+        upper = max(0, self._adjustment.get_upper() - self._adjustment.get_page_size())
+        self._adjustment.set_value(min(upper, max(0, self._adjustment.get_value() + delta)))
+
+        return True
@@ -4,7 +4,7 @@ import subprocess
 from copy import deepcopy
 from typing import Dict, Optional, Tuple
 
-from grapejuice_common.util import environment_as
+from grapejuice_common.util import environment_with
 
 OPENGL_ATTRIBUTE_PTN = re.compile(r"(OpenGL.+):(.+)")
 
@@ -18,16 +18,15 @@ def _parse_opengl_version(s):
     return None
 
 
-def _get_glx_info() -> str:
-    return subprocess.check_output(["glxinfo"]).decode("UTF-8")
+def _get_glx_info(env: Optional[Dict[str, str]] = None) -> str:
+    return subprocess.check_output(["glxinfo"], env=environment_with(env)).decode("UTF-8")
 
 
 class GLXInfo:
     _attributes: Dict[str, str]
 
     def __init__(self, env: Optional[Dict[str, str]] = None):
-        with environment_as(env):
-            info_string = _get_glx_info()
+        info_string = _get_glx_info(env)
 
         lines_of_interest = list(
             map(
@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SYSFS_DRM = Path("/sys/class/drm")
+
+# card0 is a device, card0-HDMI-A-1 is one of its connectors
+DRM_CARD_PTN = re.compile(r"card\d+")
+
+DEVICE_ATTRIBUTES = ("vendor", "device", "subsystem_vendor", "subsystem_device", "revision", "class")
+
+
+def _read_attribute(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+
+    except OSError:
+        return None
+
+
+def _link_name(path: Path) -> Optional[str]:
+    try:
+        return os.path.basename(os.readlink(path))
+
+    except OSError:
+        return None
+
+
+def _describe_card(card: Path) -> Dict[str, Optional[str]]:
+    device = card / "device"
+    description = {name: _read_attribute(device / name) for name in DEVICE_ATTRIBUTES}
+
+    description["address"] = os.path.basename(os.path.realpath(device))
+    description["driver"] = _link_name(device / "driver")
+
+    return description
+
+
+def hardware_fingerprint(drm_directory: Path = SYSFS_DRM) -> Optional[str]:
+    """
+    Identifies the graphics hardware and the drivers bound to it using only a few reads from sysfs, so it can be
+    checked on every start to decide whether the hardware has to be profiled again.
+    :return: A hash of the DRM cards in the system, None when sysfs is not available
+    """
+    try:
+        cards: List[str] = sorted(filter(DRM_CARD_PTN.fullmatch, os.listdir(drm_directory)))
+
+    except OSError:
+        return None
+
+    if not cards:
+        return None
+
+    descriptions = [_describe_card(drm_directory / card) for card in cards]
+    data = json.dumps(descriptions, sort_keys=True).encode("UTF-8")
+
+    return hashlib.blake2s(data).hexdigest()
@@ -1,10 +1,13 @@
 import json
 import logging
 import sys
-from dataclasses import dataclass, asdict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass, asdict, field
 from itertools import chain
 from subprocess import CalledProcessError
-from typing import Dict, List
+from typing import Dict, List, Optional, Callable
 
 from grapejuice_common.errors import HardwareProfilingError, format_exception
 from grapejuice_common.hardware_info.chassis_type import is_mobile_chassis, ChassisType
@@ -17,6 +20,9 @@ from grapejuice_common.roblox_renderer import RobloxRenderer
 
 log = logging.getLogger(__name__)
 
+# xrandr, lspci and glxinfo for two cards can all run at the same time
+MAX_CONCURRENT_PROBES = 4
+
 
 def get_prime_env(card: GraphicsCard, provider: XRandRProvider) -> Dict[str, str]:
     prime_env = {"DRI_PRIME": str(provider.index)}
@@ -32,16 +38,18 @@ def get_prime_env(card: GraphicsCard, provider: XRandRProvider) -> Dict[str, str
     return prime_env
 
 
-def can_prime_card(card: GraphicsCard, provider: XRandRProvider):
-    is_valid_sink = provider.sink_output or provider.sink_offload
+def is_valid_prime_sink(provider: XRandRProvider) -> bool:
+    return provider.sink_output or provider.sink_offload
+
 
-    if not is_valid_sink:
+def can_prime_card(card: GraphicsCard, provider: XRandRProvider, glx_info: Callable[..., GLXInfo] = GLXInfo):
+    if not is_valid_prime_sink(provider):
         return False
 
-    base_glx_info_hash = hash(GLXInfo())
+    base_glx_info_hash = hash(glx_info())
 
     try:
-        primed_glx_info_hash = hash(GLXInfo(env=get_prime_env(card, provider)))
+        primed_glx_info_hash = hash(glx_info(env=get_prime_env(card, provider)))
 
     except CalledProcessError as e:
         log.error(e)
@@ -50,8 +58,66 @@ def can_prime_card(card: GraphicsCard, provider: XRandRProvider):
     return base_glx_info_hash != primed_glx_info_hash
 
 
+def _glx_info_probe_name(env: Optional[Dict[str, str]]) -> str:
+    return " ".join(["glxinfo", *(f"{k}={v}" for k, v in sorted((env or dict()).items()))])
+
+
+class HardwareProbes:
+    """
+    Runs the programs the profiler gets its information from on a thread pool. Every probe runs at most once, its
+    result is shared by everything that needs it. Failures are raised when the result is used, so a probe that turns
+    out not to be needed cannot fail profiling.
+    """
+    _executor: ThreadPoolExecutor
+    _futures: Dict[str, Future]
+    _timings: Dict[str, float]
+    _lock: threading.Lock
+
+    def __init__(self, executor: ThreadPoolExecutor):
+        self._executor = executor
+        self._futures = dict()
+        self._timings = dict()
+        self._lock = threading.Lock()
+
+    def _timed(self, name: str, probe: Callable, *args, **kwargs):
+        started_at = time.perf_counter()
+
+        try:
+            return probe(*args, **kwargs)
+
+        finally:
+            duration = time.perf_counter() - started_at
+            log.debug(f"Probe {name} took {duration:.3f}s")
+
+            with self._lock:
+                self._timings[name] = round(duration, 3)
+
+    def start(self, name: str, probe: Callable, *args, **kwargs) -> Future:
+        with self._lock:
+            future = self._futures.get(name, None)
+
+            if future is None:
+                future = self._executor.submit(self._timed, name, probe, *args, **kwargs)
+                self._futures[name] = future
+
+            return future
+
+    def start_glx_info(self, env: Optional[Dict[str, str]] = None) -> Future:
+        return self.start(_glx_info_probe_name(env), GLXInfo, env=env)
+
+    def glx_info(self, env: Optional[Dict[str, str]] = None) -> GLXInfo:
+        return self.start_glx_info(env).result()
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._timings)
+
+
 @dataclass(init=False)
 class ComputeParametersState:
+    probes: HardwareProbes
+
     xrandr: XRandR
     hardware_list: LSPci
 
@@ -94,6 +160,7 @@ class HardwareProfile:
     is_multi_gpu: bool
 
     version: int = 2
+    probe_timings: Dict[str, float] = field(default_factory=dict)
 
     @property
     def gpu_vendor(self) -> GPUVendor:
@@ -137,15 +204,23 @@ class HardwareProfile:
             state.should_prime,
             state.use_mesa_gl_override,
             state.preferred_roblox_renderer.value,
-            state.is_multi_gpu
+            state.is_multi_gpu,
+            probe_timings=state.probes.timings
         )
 
 
 def _collect_information(state: ComputeParametersState):
     log.info("Getting lspci and XRandR data")
 
-    state.xrandr = xrandr_factory()
-    state.hardware_list = LSPci()
+    probes = state.probes
+    xrandr = probes.start("xrandr", xrandr_factory)
+    hardware_list = probes.start("lspci", LSPci)
+
+    # Most paths through the profiler need the unprimed GL information, get it while waiting for the others
+    probes.start_glx_info()
+
+    state.xrandr = xrandr.result()
+    state.hardware_list = hardware_list.result()
 
     graphics_cards = state.hardware_list.graphics_cards
     state.should_prime = state.number_of_graphics_cards > 1
@@ -162,10 +237,15 @@ def _collect_information(state: ComputeParametersState):
 
     # Let's just hope cards and providers always follow the same order here
     state.card_provider_lookup = dict(zip(state.graphics_cards_unordered, state.xrandr.providers))
+
+    for card, provider in state.card_provider_lookup.items():
+        if is_valid_prime_sink(provider):
+            probes.start_glx_info(get_prime_env(card, provider))
+
     state.can_prime_lookup = dict(zip(
         state.graphics_cards_unordered,
         map(
-            lambda card: can_prime_card(card, state.card_provider_lookup[card]),
+            lambda card: can_prime_card(card, state.card_provider_lookup[card], probes.glx_info),
             state.graphics_cards_unordered
         )
     ))
@@ -232,10 +312,10 @@ def _pick_renderer(state: ComputeParametersState):
         try:
             provider = state.card_provider_lookup.get(state.target_card, None)
             if state.should_prime and provider:
-                glx_info = GLXInfo(env=get_prime_env(state.target_card, provider))
+                glx_info = state.probes.glx_info(env=get_prime_env(state.target_card, provider))
 
             else:
-                glx_info = GLXInfo()
+                glx_info = state.probes.glx_info()
 
             # Some GPUs are so old that they do not even support a version of OpenGL high enough
             # for Roblox. In this case some mesa trickery is required.
@@ -266,15 +346,17 @@ def profile_hardware() -> HardwareProfile:
     log.info("Computing hardware profile parameters")
 
     try:
-        state = ComputeParametersState()
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_PROBES, thread_name_prefix="hardware-probe") as executor:
+            state = ComputeParametersState()
+            state.probes = HardwareProbes(executor)
 
-        _collect_information(state)
-        _consider_chassis(state)
-        _consider_cards_that_can_be_primed(state)
-        _pick_target_card(state)
-        _pick_renderer(state)
+            _collect_information(state)
+            _consider_chassis(state)
+            _consider_cards_that_can_be_primed(state)
+            _pick_target_card(state)
+            _pick_renderer(state)
 
-        return HardwareProfile.from_profiler(state)
+            return HardwareProfile.from_profiler(state)
 
     except Exception as e:
         log.error(f"{type(e).__name__}: {str(e)}")
@@ -5,7 +5,7 @@ import subprocess
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 
-from grapejuice_common.util import environment_as
+from grapejuice_common.util import environment_with
 
 
 def _stdout_encoding():
@@ -62,14 +62,26 @@ class LSPciEntry:
 
 
 class LSPci:
+    """
+    The PCI devices of the machine. Display controllers are read from sysfs when possible, lspci is only run when
+    sysfs or the PCI ID database are not available.
+    """
     _entries: List[LSPciEntry]
 
-    def __init__(self):
+    def __init__(self, use_sysfs: bool = True):
         self._entries = []
 
-        with environment_as({"LC_ALL": "C", "LANG": None}):
-            content = subprocess.check_output(["lspci", "-vvv"]).decode(_stdout_encoding())
-            self._parse(content)
+        if use_sysfs:
+            from grapejuice_common.hardware_info.sysfs_pci import sysfs_display_controllers
+
+            entries = sysfs_display_controllers()
+            if entries is not None:
+                self._entries = entries
+                return
+
+        environment = environment_with({"LC_ALL": "C", "LANG": None})
+        content = subprocess.check_output(["lspci", "-vvv"], env=environment).decode(_stdout_encoding())
+        self._parse(content)
 
     def _parse(self, content: str):
         work: Optional[LSPciEntry] = None
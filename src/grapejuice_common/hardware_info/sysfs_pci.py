@@ -0,0 +1,226 @@
+import gzip
+import logging
+import os
+import re
+from pathlib import Path
+from typing import List, Optional
+
+from grapejuice_common.hardware_info.lspci import LSPciEntry
+
+log = logging.getLogger(__name__)
+
+SYSFS_PCI_DEVICES = Path("/sys/bus/pci/devices")
+
+PCI_IDS_LOCATIONS = [
+    Path("/usr/share/hwdata/pci.ids"),
+    Path("/usr/share/misc/pci.ids"),
+    Path("/usr/share/pci.ids"),
+    Path("/usr/share/hwdata/pci.ids.gz"),
+    Path("/usr/share/misc/pci.ids.gz")
+]
+
+# PCI base class of display controllers
+DISPLAY_CONTROLLER_CLASS = 0x03
+
+# Top level entries in pci.ids, vendors and device classes
+TOP_LEVEL_LINE_PTN = re.compile(r"^(?:[0-9a-f]{4}|C [0-9a-f]{2})  ", re.MULTILINE)
+
+
+def _read_pci_ids() -> Optional[str]:
+    for location in PCI_IDS_LOCATIONS:
+        try:
+            if location.suffix == ".gz":
+                with gzip.open(location, "rb") as fp:
+                    return fp.read().decode("UTF-8", errors="replace")
+
+            return location.read_text(encoding="UTF-8", errors="replace")
+
+        except OSError:
+            continue
+
+    return None
+
+
+def _block_end(text: str, start: int, depth: int) -> int:
+    """
+    :return: The position where the entries nested below the line at start end
+    """
+    position = text.find("\n", start + 1)
+    if position == -1:
+        return len(text)
+
+    if depth == 0:
+        match = TOP_LEVEL_LINE_PTN.search(text, position)
+        return match.start() - 1 if match else len(text)
+
+    child_prefix = "\n" + "\t" * (depth + 1)
+
+    while position != -1 and (text.startswith(child_prefix, position) or text.startswith("\n#", position)):
+        position = text.find("\n", position + 1)
+
+    return len(text) if position == -1 else position
+
+
+def _find_entry(text: str, prefix: str, start: int, end: int) -> Optional[int]:
+    position = text.find(prefix, start, end)
+
+    return None if position == -1 else position
+
+
+def _entry_name(text: str, position: int, prefix: str) -> str:
+    line_end = text.find("\n", position + 1)
+
+    return text[position + len(prefix):line_end if line_end != -1 else len(text)].strip()
+
+
+class PciIds:
+    """
+    Looks up names in the pci.ids database the same way lspci does
+    """
+    _text: str
+
+    def __init__(self, text: str):
+        # Lookups search for a newline before the identifier
+        self._text = "\n" + text
+
+    def _vendor_position(self, vendor: int) -> Optional[int]:
+        return _find_entry(self._text, f"\n{vendor:04x}  ", 0, len(self._text))
+
+    def vendor_name(self, vendor: int) -> Optional[str]:
+        position = self._vendor_position(vendor)
+
+        return None if position is None else _entry_name(self._text, position, f"\n{vendor:04x}  ")
+
+    def device_name(self, vendor: int, device: int) -> Optional[str]:
+        vendor_position = self._vendor_position(vendor)
+        if vendor_position is None:
+            return None
+
+        prefix = f"\n\t{device:04x}  "
+        position = _find_entry(self._text, prefix, vendor_position, _block_end(self._text, vendor_position, 0))
+
+        return None if position is None else _entry_name(self._text, position, prefix)
+
+    def _class_lookup(self, base_class: int, sub_class: int, prog_if: Optional[int] = None) -> Optional[str]:
+        prefix = f"\nC {base_class:02x}  "
+        class_position = _find_entry(self._text, prefix, 0, len(self._text))
+        if class_position is None:
+            return None
+
+        prefix = f"\n\t{sub_class:02x}  "
+        position = _find_entry(self._text, prefix, class_position, _block_end(self._text, class_position, 0))
+        if position is None or prog_if is None:
+            return None if position is None else _entry_name(self._text, position, prefix)
+
+        sub_class_position = position
+        prefix = f"\n\t\t{prog_if:02x}  "
+        position = _find_entry(self._text, prefix, sub_class_position, _block_end(self._text, sub_class_position, 1))
+
+        return None if position is None else _entry_name(self._text, position, prefix)
+
+    def class_name(self, base_class: int, sub_class: int) -> Optional[str]:
+        return self._class_lookup(base_class, sub_class)
+
+    def prog_if_name(self, base_class: int, sub_class: int, prog_if: int) -> Optional[str]:
+        return self._class_lookup(base_class, sub_class, prog_if)
+
+
+def _read_hex(path: Path) -> int:
+    return int(path.read_text().strip(), 16)
+
+
+def _device_description(pci_ids: PciIds, vendor: int, device: int) -> str:
+    vendor_name = pci_ids.vendor_name(vendor)
+    device_name = pci_ids.device_name(vendor, device)
+
+    if vendor_name is None:
+        return f"Device {vendor:04x}:{device:04x}"
+
+    return f"{vendor_name} {device_name or f'Device {device:04x}'}"
+
+
+def _entry_from_sysfs(pci_ids: PciIds, device_path: Path, pci_id: str) -> LSPciEntry:
+    pci_class = _read_hex(device_path / "class")
+    base_class, sub_class, prog_if = pci_class >> 16, (pci_class >> 8) & 0xff, pci_class & 0xff
+
+    class_name = pci_ids.class_name(base_class, sub_class) or f"Class {base_class:02x}{sub_class:02x}"
+    description = _device_description(pci_ids, _read_hex(device_path / "vendor"), _read_hex(device_path / "device"))
+
+    try:
+        revision = _read_hex(device_path / "revision")
+
+    except OSError:
+        revision = 0
+
+    if revision:
+        description += f" (rev {revision:02x})"
+
+    # lspci -v appends the programming interface when it is set or has a name
+    prog_if_name = pci_ids.prog_if_name(base_class, sub_class, prog_if)
+    if prog_if or prog_if_name:
+        description += f" (prog-if {prog_if:02x}" + (f" [{prog_if_name}]" if prog_if_name else "") + ")"
+
+    entry = LSPciEntry(pci_id)
+    entry.attributes[class_name.lower()] = description
+
+    driver = device_path / "driver"
+    if os.path.islink(driver):
+        entry.attributes["kernel driver in use"] = os.path.basename(os.readlink(driver))
+
+    return entry
+
+
+def sysfs_display_controllers(
+    devices_directory: Path = SYSFS_PCI_DEVICES,
+    pci_ids: Optional[PciIds] = None
+) -> Optional[List[LSPciEntry]]:
+    """
+    Enumerate display controllers through sysfs instead of lspci
+    :return: Entries that look like the ones parsed from lspci -vvv, None when sysfs or pci.ids are not available
+    """
+    try:
+        addresses = sorted(os.listdir(devices_directory))
+
+    except OSError:
+        return None
+
+    if not addresses:
+        return None
+
+    display_addresses = []
+
+    try:
+        for address in addresses:
+            if (_read_hex(devices_directory / address / "class") >> 16) == DISPLAY_CONTROLLER_CLASS:
+                display_addresses.append(address)
+
+    except (OSError, ValueError) as e:
+        log.info(f"Could not read PCI classes from sysfs: {e}")
+        return None
+
+    if pci_ids is None:
+        text = _read_pci_ids()
+
+        if text is None:
+            log.info("Could not find pci.ids, cannot name devices without lspci")
+            return None
+
+        pci_ids = PciIds(text)
+
+    # lspci only shows PCI domains when there is more than one
+    show_domains = any(not address.startswith("0000:") for address in addresses)
+
+    try:
+        return [
+            _entry_from_sysfs(
+                pci_ids,
+                devices_directory / address,
+                address if show_domains else address.split(":", 1)[1]
+            )
+            for address in display_addresses
+        ]
+
+    except (OSError, ValueError) as e:
+        log.info(f"Could not read display controllers from sysfs: {e}")
+
+    return None
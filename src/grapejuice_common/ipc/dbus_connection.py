@@ -103,3 +103,6 @@ class DBusConnection(IDBusConnection):
 
     def install_roblox(self, prefix_id: str):
         return self.proxy.InstallRoblox(prefix_id)
+
+    def warm_prefix(self, prefix_id: str):
+        return self.proxy.WarmPrefix(prefix_id)
@@ -40,3 +40,7 @@ class IDBusConnection(ABC):
     @abstractmethod
     def install_roblox(self, prefix_id: str):
         pass
+
+    @abstractmethod
+    def warm_prefix(self, prefix_id: str):
+        pass
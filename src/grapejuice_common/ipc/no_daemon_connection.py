@@ -54,9 +54,16 @@ class NoDaemonModeConnection(IDBusConnection):
         if not recipe.exists_in(prefix):
             recipe.make_in(prefix)
 
-        prefix.roblox.extract_fast_flags()
+        if not prefix.roblox.fast_flags_are_extracted:
+            prefix.roblox.extract_fast_flags()
 
     def install_roblox(self, prefix_id: str):
         from grapejuice_common.wine.wine_functions import find_wineprefix
 
         find_wineprefix(prefix_id).roblox.install_roblox()
+
+    def warm_prefix(self, prefix_id: str):
+        from grapejuice_common.wine.wine_functions import find_wineprefix
+        from grapejuice_common.wine.wineserver_manager import wineserver_manager
+
+        return wineserver_manager.warm(find_wineprefix(prefix_id).core_control)
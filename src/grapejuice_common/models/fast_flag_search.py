@@ -0,0 +1,93 @@
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Splits FFlagStudioHTTPEnabled2 into F, Flag, Studio, HTTP, Enabled, 2, underscores separate tokens as well
+TOKEN_PTN = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+# Sorts after every character that can appear in a flag name
+PREFIX_RANGE_END = "\uffff"
+
+
+def name_tokens(name: str) -> List[str]:
+    return TOKEN_PTN.findall(name)
+
+
+def _prefix_range(sorted_strings: Sequence[str], prefix: str) -> Tuple[int, int]:
+    return bisect_left(sorted_strings, prefix), bisect_left(sorted_strings, prefix + PREFIX_RANGE_END)
+
+
+class FastFlagSearchIndex:
+    """
+    Case insensitive substring search over flag names. Matches are ranked: names starting with the query come first,
+    then names with a CamelCase or underscore separated segment starting with the query, then the other names that
+    contain the query. Prefix lookups are binary searches over the sorted names and tokens. When the user keeps
+    typing, substring matching only considers the results of the previous query.
+    """
+    _lowered: List[str]
+    _by_name: List[int]
+    _sorted_names: List[str]
+    _rank: List[int]
+    _tokens: Dict[str, List[int]]
+    _sorted_tokens: List[str]
+
+    _last_query: Optional[str] = None
+    _last_matches: Optional[List[int]] = None
+
+    def __init__(self, names: Sequence[str]):
+        self._lowered = [name.lower() for name in names]
+        self._by_name = sorted(range(len(names)), key=self._lowered.__getitem__)
+        self._sorted_names = [self._lowered[i] for i in self._by_name]
+
+        self._rank = [0] * len(names)
+        for rank, i in enumerate(self._by_name):
+            self._rank[i] = rank
+
+        self._tokens = dict()
+        for i, name in enumerate(names):
+            for token in set(map(str.lower, name_tokens(name))):
+                self._tokens.setdefault(token, []).append(i)
+
+        self._sorted_tokens = sorted(self._tokens)
+
+    def _substring_matches(self, query: str) -> List[int]:
+        if self._last_query is not None and self._last_query in query:
+            candidates = self._last_matches
+
+        else:
+            candidates = range(len(self._lowered))
+
+        lowered = self._lowered
+        matches = [i for i in candidates if query in lowered[i]]
+
+        self._last_query = query
+        self._last_matches = matches
+
+        return matches
+
+    def search(self, query: str) -> List[int]:
+        """
+        :return: Indices of the names containing the query, best matches first
+        """
+        query = query.lower()
+        if not query:
+            return list(self._by_name)
+
+        matches = self._substring_matches(query)
+
+        lo, hi = _prefix_range(self._sorted_names, query)
+        prefix_matches = self._by_name[lo:hi]
+        seen = set(prefix_matches)
+
+        token_hits = set()
+        lo, hi = _prefix_range(self._sorted_tokens, query)
+        for token in self._sorted_tokens[lo:hi]:
+            token_hits.update(self._tokens[token])
+
+        token_hits.difference_update(seen)
+        token_matches = sorted(token_hits, key=self._rank.__getitem__)
+        seen.update(token_hits)
+
+        other_matches = sorted((i for i in matches if i not in seen), key=self._rank.__getitem__)
+
+        return prefix_matches + token_matches + other_matches
@@ -0,0 +1,122 @@
+import re
+from enum import Enum
+from typing import Dict, Iterable, Optional
+
+
+class FastFlagType(Enum):
+    """
+    The type of the value of a Fast Flag, the values are the single character tags stored with snapshots
+    """
+    bool = "b"
+    int = "i"
+    string = "s"
+
+    @property
+    def python_type(self) -> type:
+        return _python_types[self]
+
+
+_python_types = {
+    FastFlagType.bool: bool,
+    FastFlagType.int: int,
+    FastFlagType.string: str
+}
+
+# Roblox encodes the type of a flag in the prefix of its name, optionally preceded by D (dynamic) or S (synchronised)
+FLAG_CLASS_PTN = re.compile(r"[DS]?F(Flag|Int|Log|String)")
+
+BOOL_TAG = FastFlagType.bool.value
+INT_TAG = FastFlagType.int.value
+STRING_TAG = FastFlagType.string.value
+
+FLAG_CLASS_TYPES = {
+    "Flag": BOOL_TAG,
+    "Int": INT_TAG,
+    "Log": INT_TAG,
+    "String": STRING_TAG
+}
+
+INT_VALUE_PTN = re.compile(r"-?\d+")
+
+
+def _value_before_comment(value) -> str:
+    return str(value).split(";", 1)[0].strip()
+
+
+def _infer_from_value(value) -> str:
+    if isinstance(value, bool):
+        return BOOL_TAG
+
+    if isinstance(value, int):
+        return INT_TAG
+
+    value = _value_before_comment(value)
+
+    if value.lower() in ("true", "false"):
+        return BOOL_TAG
+
+    if INT_VALUE_PTN.fullmatch(value):
+        return INT_TAG
+
+    return STRING_TAG
+
+
+def infer_types(flags: Dict[str, any]) -> str:
+    """
+    Infer the types of all flags in one pass. The prefix of a name decides the type, values are only inspected for
+    flags without a known prefix.
+    :return: One type tag per flag, in the order of the dictionary
+    """
+    match_class = FLAG_CLASS_PTN.match
+    tags = []
+
+    for name, value in flags.items():
+        match = match_class(name)
+        tags.append(FLAG_CLASS_TYPES[match.group(1)] if match else _infer_from_value(value))
+
+    return "".join(tags)
+
+
+def _coerce_bool(value):
+    if isinstance(value, bool):
+        return value
+
+    lowered = _value_before_comment(value).lower()
+
+    return lowered == "true" if lowered in ("true", "false") else value
+
+
+def _coerce_int(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+
+    try:
+        return int(_value_before_comment(value))
+
+    except ValueError:
+        return value
+
+
+def _coerce_string(value):
+    return value if isinstance(value, str) else str(value)
+
+
+_coercions = {
+    BOOL_TAG: _coerce_bool,
+    INT_TAG: _coerce_int,
+    STRING_TAG: _coerce_string
+}
+
+
+def coerce_value(value, tag: str):
+    """
+    Convert the value of a flag to the type of the tag, values that cannot be converted are returned as they are
+    """
+    return _coercions.get(tag, _coerce_string)(value)
+
+
+def coerce_flags(flags: Dict[str, any], types: Optional[Iterable[str]] = None) -> Dict[str, any]:
+    if types is None:
+        types = infer_types(flags)
+
+    return dict((name, coerce_value(value, tag)) for (name, value), tag in zip(flags.items(), types))
@@ -1,99 +1,265 @@
 import json
 import logging
 import os
-from itertools import chain
 from pathlib import Path
 from typing import List, Dict, Optional, Iterable
 
 from grapejuice_common import variables
+from grapejuice_common.models.fast_flag_search import FastFlagSearchIndex
+from grapejuice_common.models.fast_flag_types import FastFlagType, infer_types, coerce_value
 
 LOG = logging.getLogger(__name__)
 
 FastFlagDictionary = Dict[str, any]
 
 
-def mangle_flags(flags: Dict[str, str]):
-    new_flags = dict()
-
-    for k, v in flags.items():
-        if isinstance(v, str):
-            v = v.split(";")[0].strip()
-            v_lower = v.lower()
+class FastFlag:
+    """
+    View on a single flag inside of a FastFlagList
+    """
+    __slots__ = ("_flags", "_index")
 
-            if v_lower in ("true", "false"):
-                v = v_lower == "true"
+    def __init__(self, flags: "FastFlagList", index: int):
+        self._flags = flags
+        self._index = index
 
-            elif v_lower.isnumeric():
-                v = int(v)
+    def is_a(self, cls):
+        return isinstance(self.value, cls)
 
-        new_flags[k] = v
+    @property
+    def name(self):
+        return self._flags.name_at(self._index)
 
-    return new_flags
+    @property
+    def type(self) -> FastFlagType:
+        return self._flags.type_at(self._index)
 
+    @property
+    def value(self):
+        return self._flags.value_at(self._index)
 
-class FastFlag:
-    def __init__(self, name, value):
-        self._name = name
-        self._original_value = value
-        self.value = value
-
-    def is_a(self, cls):
-        return isinstance(self.value, cls)
+    @value.setter
+    def value(self, v):
+        self._flags.set_value_at(self._index, v)
 
     @property
-    def name(self):
-        return self._name
+    def original_value(self):
+        return self._flags.original_value_at(self._index)
 
     @property
     def has_changed(self):
-        return self.value != self._original_value
+        return self._flags.changed_at(self._index)
 
     def to_tuple(self):
         return self.name, self.value
 
     def reset(self):
-        self.value = self._original_value
+        self.value = self.original_value
 
     def __lt__(self, other):
         if isinstance(other, FastFlag):
-            return self._name < other.name
+            return self.name < other.name
 
         return -1
 
+    def __eq__(self, other):
+        return isinstance(other, FastFlag) and other._flags is self._flags and other._index == self._index
+
+    def __hash__(self):
+        return hash((id(self._flags), self._index))
+
     def __repr__(self):
-        return f"FFlag '{self._name}': {self.value}"
+        return f"FFlag '{self.name}': {self.value}"
 
 
 class FastFlagList:
-    _list: List[FastFlag]
+    """
+    Column store for Fast Flags. Names, values and original values live in parallel lists, the position of a flag is
+    found through a name index and changed flags are tracked in a bytearray. Flags are ordered with changed flags
+    first, then by name. Editing a flag does not move it, the order only catches up with changed flags when sort is
+    called, so rows stay put while the user edits them.
+
+    Every flag has a type tag, inferred for all flags at once when they are loaded. Values are kept as they were read
+    and only converted to their type when they are first accessed.
+    """
+    _names: List[str]
+    _values: List[any]
+    _originals: List[any]
+    _index: Dict[str, int]
+    _types: bytearray
+    _coerced: bytearray
+    _changed: bytearray
+    _n_changed: int = 0
+    _by_name: Optional[List[int]] = None
+    _order: Optional[List[int]] = None
+    _order_is_stale: bool = False
+    _revision: int = 0
+    _search_index: Optional[FastFlagSearchIndex] = None
 
     def __init__(
         self,
         initial_flags: Optional[Iterable[FastFlag]] = None,
         source_file: Optional[Path] = None,
-        source_dictionary: Optional[Dict] = None
+        source_dictionary: Optional[Dict] = None,
+        types: Optional[str] = None
     ):
-        self._list = list() if initial_flags is None else list(initial_flags)
+        """
+        :param types: Type tags for the flags in source_dictionary, inferred when omitted
+        """
+        self._clear()
+
+        if initial_flags is not None:
+            for flag in initial_flags:
+                self.add_flag(flag.name, flag.original_value, flag.value, flag.type.value)
 
         if source_file is not None:
             self._flags_from_file(source_file)
 
         if source_dictionary is not None:
-            self._flags_from_dictionary(source_dictionary)
+            self._flags_from_dictionary(source_dictionary, types)
+
+    def _clear(self):
+        self._names = []
+        self._values = []
+        self._originals = []
+        self._index = dict()
+        self._types = bytearray()
+        self._coerced = bytearray()
+        self._changed = bytearray()
+        self._n_changed = 0
+        self._invalidate_order(names_changed=True)
+
+    def add_flag(self, name: str, original_value: any, value: any, tag: Optional[str] = None):
+        """
+        Add a flag, or set the value of the flag when there already is one with the same name
+        :param tag: The type tag of the flag, inferred from the original value when omitted
+        """
+        i = self._index.get(name, None)
+
+        if i is None:
+            tag = tag or infer_types({name: original_value})
+            original_value = coerce_value(original_value, tag)
+
+            self._index[name] = len(self._names)
+            self._names.append(name)
+            self._values.append(original_value)
+            self._originals.append(original_value)
+            self._types.append(ord(tag))
+            self._coerced.append(1)
+            self._changed.append(0)
+            self._invalidate_order(names_changed=True)
+
+            i = len(self._names) - 1
+
+        self.set_value_at(i, value)
+
+    def _invalidate_order(self, names_changed: bool = False):
+        self._order = None
+        self._order_is_stale = False
+        self._revision += 1
+
+        if names_changed:
+            self._by_name = None
+            self._search_index = None
+
+    def _coerce(self, i: int):
+        tag = chr(self._types[i])
+
+        self._originals[i] = coerce_value(self._originals[i], tag)
+        self._values[i] = coerce_value(self._values[i], tag)
+        self._coerced[i] = 1
+
+    def _coerce_all(self):
+        if all(self._coerced):
+            return
+
+        coerced = self._coerced
+
+        for i in range(len(self._names)):
+            if not coerced[i]:
+                self._coerce(i)
+
+    def name_at(self, i: int) -> str:
+        """
+        Accessors by storage position, used by the FastFlag views
+        """
+        return self._names[i]
+
+    def type_at(self, i: int) -> FastFlagType:
+        return FastFlagType(chr(self._types[i]))
+
+    def value_at(self, i: int):
+        if not self._coerced[i]:
+            self._coerce(i)
+
+        return self._values[i]
+
+    def original_value_at(self, i: int):
+        if not self._coerced[i]:
+            self._coerce(i)
+
+        return self._originals[i]
+
+    def changed_at(self, i: int) -> bool:
+        return self._changed[i] == 1
+
+    def set_value_at(self, i: int, value: any):
+        if not self._coerced[i]:
+            self._coerce(i)
+
+        value = coerce_value(value, chr(self._types[i]))
+        self._values[i] = value
+        self._revision += 1
+
+        changed = 1 if value != self._originals[i] else 0
+        if changed != self._changed[i]:
+            self._changed[i] = changed
+            self._n_changed += 1 if changed else -1
+            self._order_is_stale = True
 
     def _flags_from_file(self, file: Path):
         with file.open("r", encoding=variables.text_encoding()) as fp:
             self._flags_from_dictionary(json.load(fp))
 
-    def _flags_from_dictionary(self, flags):
-        self._list = list(
-            map(
-                lambda t: FastFlag(*t),
-                flags.items()
-            )
-        )
+    def _flags_from_dictionary(self, flags, types: Optional[str] = None):
+        self._clear()
+
+        if types is None or len(types) != len(flags):
+            types = infer_types(flags)
+
+        self._names = list(flags.keys())
+        self._values = list(flags.values())
+        self._originals = list(self._values)
+        self._index = dict(zip(self._names, range(len(self._names))))
+        self._types = bytearray(types, "ascii")
+        self._coerced = bytearray(len(self._names))
+        self._changed = bytearray(len(self._names))
+
+    def _ordered_indices(self) -> List[int]:
+        if self._by_name is None:
+            names = self._names
+            self._by_name = sorted(range(len(names)), key=names.__getitem__)
 
-        self.sort()
+        if self._order is None:
+            if self._n_changed == 0:
+                self._order = self._by_name
+
+            else:
+                changed = self._changed
+                self._order = [i for i in self._by_name if changed[i]] + [i for i in self._by_name if not changed[i]]
+
+        return self._order
+
+    @property
+    def revision(self) -> int:
+        """
+        :return: A number that changes whenever a value or the order of the flags changes
+        """
+        return self._revision
+
+    @property
+    def changed_count(self) -> int:
+        return self._n_changed
 
     def export_to_file(self, fast_flags_path):
         os.makedirs(os.path.dirname(fast_flags_path), exist_ok=True)
@@ -102,48 +268,79 @@ class FastFlagList:
             json.dump(self.as_dictionary, fp)
 
     def overlay_flags(self, other_flags: "FastFlagList"):
-        d = dict(zip(map(lambda f: f.name, self), self._list))
+        index = self._index
 
-        for flag in filter(lambda f: f.name in d, other_flags):
-            d[flag.name].value = flag.value
+        for j in range(len(other_flags)):
+            i = index.get(other_flags.name_at(j), None)
 
-        self.sort()
+            if i is not None:
+                self.set_value_at(i, other_flags.value_at(j))
 
     def get_changed_flags(self) -> "FastFlagList":
-        return FastFlagList(initial_flags=filter(lambda flag: flag.has_changed, self._list))
+        changed_flags = FastFlagList()
+        changed = self._changed
+
+        for i in filter(changed.__getitem__, self._ordered_indices()):
+            changed_flags.add_flag(self._names[i], self._originals[i], self._values[i], chr(self._types[i]))
+
+        return changed_flags
 
     @property
     def as_dictionary(self) -> FastFlagDictionary:
-        return dict(map(lambda flag: flag.to_tuple(), self))
+        self._coerce_all()
+        order = self._ordered_indices()
+
+        return dict(zip(map(self._names.__getitem__, order), map(self._values.__getitem__, order)))
 
     def reset_all_flags(self):
-        for flag in self:
-            flag.reset()
+        if self._n_changed == 0:
+            return
+
+        changed = self._changed
+
+        for i in range(len(self._names)):
+            if changed[i]:
+                self._values[i] = self._originals[i]
+                changed[i] = 0
+
+        self._n_changed = 0
+        self._invalidate_order()
+
+    def search(self, query: str) -> List[FastFlag]:
+        """
+        :return: The flags with a name containing the query, best matches first
+        """
+        if self._search_index is None:
+            self._search_index = FastFlagSearchIndex(self._names)
+
+        return [FastFlag(self, i) for i in self._search_index.search(query)]
+
+    def find(self, name: str) -> Optional[FastFlag]:
+        i = self._index.get(name, None)
+
+        return None if i is None else FastFlag(self, i)
 
     def sort(self):
-        self._list = list(
-            chain(
-                sorted(
-                    filter(
-                        lambda f: f.has_changed,
-                        self._list
-                    )
-                ),
-                sorted(
-                    filter(
-                        lambda f: not f.has_changed,
-                        self._list
-                    )
-                )
-            )
-        )
+        """
+        Move flags that were changed or reset since the last sort to their place in the order
+        """
+        if self._order_is_stale:
+            self._invalidate_order()
+
+        self._ordered_indices()
 
     def __iter__(self):
-        for flag in self._list:
-            yield flag
+        for i in self._ordered_indices():
+            yield FastFlag(self, i)
 
     def __len__(self):
-        return len(self._list)
+        return len(self._names)
+
+    def __contains__(self, name: str):
+        return name in self._index
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [FastFlag(self, i) for i in self._ordered_indices()[item]]
 
-    def __getitem__(self, *args):
-        return self._list.__getitem__(*args)
+        return FastFlag(self, self._ordered_indices()[item])
@@ -10,19 +10,37 @@ class Paginator:
         self._page_size = page_size
         self._current_page = 0
         self._filter_function = filter_function
+        self._filtered = None
+        self._filtered_key = None
 
         self.paged = Event()
 
+    def invalidate(self):
+        """
+        Drop the cached filtered view, needed when a collection without a revision was modified
+        """
+        self._filtered = None
+
     @property
     def _filtered_collection(self):
+        # Collections with a revision tell when they were modified, others have to be invalidated explicitly
+        key = (self._filter_function, getattr(self._collection, "revision", None))
+
+        if self._filtered is not None and self._filtered_key == key:
+            return self._filtered
+
         collection = self._collection
 
         if callable(self._filter_function):
+            # Filters decide the order of their results
             collection = list(self._filter_function(self._collection))
 
-        if hasattr(collection, "sort"):
+        elif hasattr(collection, "sort"):
             collection.sort()
 
+        self._filtered = collection
+        self._filtered_key = key
+
         return collection
 
     @property
@@ -140,8 +140,20 @@ def grapejuice_cache_directory() -> Path:
     return _ensure_directory(xdg_cache_home() / "grapejuice")
 
 
-def fast_flag_cache_location() -> Path:
-    return grapejuice_cache_directory() / "fast_flags.json"
+def fast_flag_snapshot_directory() -> Path:
+    return grapejuice_cache_directory() / "fast_flags"
+
+
+def registry_cache_directory() -> Path:
+    return grapejuice_cache_directory() / "registry"
+
+
+def artifact_cache_directory() -> Path:
+    return grapejuice_cache_directory() / "artifacts"
+
+
+def release_metadata_cache_directory() -> Path:
+    return grapejuice_cache_directory() / "release_metadata"
 
 
 # TODO: Add method to extract this data
@@ -13,6 +13,7 @@ import requests
 from packaging import version
 
 from grapejuice_common import variables, paths
+from grapejuice_common.errors import ReleaseMetadataUnavailable
 from grapejuice_common.features import settings
 from grapejuice_common.logs.log_util import log_function
 
@@ -20,6 +21,9 @@ LOG = logging.getLogger(__name__)
 
 VERSION_PTN = re.compile(r"__version__\s*=\s*\"([\d\.]+)\".*")
 
+# Seconds before the version on GitLab is checked again
+GITLAB_VERSION_TTL = 60 * 60
+
 
 class UpdateError(RuntimeError):
     pass
@@ -38,19 +42,19 @@ class UpdateInformationProvider(ABC):
         if return_cached and UpdateInformationProvider._cached_gitlab_version is not None:
             return UpdateInformationProvider._cached_gitlab_version
 
+        from grapejuice_common.util.release_metadata_cache import release_metadata_cache
+
         url = variables.git_grapejuice_init()
-        response = requests.get(url)
 
-        if response.status_code < 200 or response.status_code > 299:
-            LOG.error(
-                "Failed to get the version of grapejuice on GitLab. Returning version 0\n"
-                f"URL: {url}\n"
-                f"Response text: {response.text}\n"
-            )
+        try:
+            text = release_metadata_cache().get_text(url, ttl=GITLAB_VERSION_TTL)
+
+        except ReleaseMetadataUnavailable as e:
+            LOG.error(f"Failed to get the version of grapejuice on GitLab. Returning version 0\n{e}")
 
             return version.parse("0.0.0")
 
-        for line in response.text.replace("\r", "").split("\n"):
+        for line in text.replace("\r", "").split("\n"):
             match = VERSION_PTN.match(line)
             if not match:
                 continue
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Optional, Dict, TypeVar, Tuple, Iterable
@@ -18,16 +19,10 @@ def prepare_uri(uri):
         return None
 
 
-def download_file(url, target_path: Path):
-    import requests
+def download_file(url, target_path: Path, sha256: Optional[str] = None):
+    from grapejuice_common.util.downloads import download_manager
 
-    response = requests.get(url)
-    response.raise_for_status()
-
-    with open(target_path, "wb+") as fp:
-        fp.write(response.content)
-
-    return target_path
+    return download_manager.download(url, Path(target_path), sha256=sha256)
 
 
 def xdg_open(*args):
@@ -60,6 +55,45 @@ def working_directory_as(working_directory: Optional[Path] = None):
         yield
 
 
+@contextmanager
+def atomic_writer(
+    path: Path,
+    mode: str = "wb",
+    encoding: Optional[str] = None,
+    newline: Optional[str] = None,
+    permissions: Optional[int] = None
+):
+    """
+    Write a file through a uniquely named temporary file next to it. The temporary file is synced to disk and moved
+    into place once the block completes, so readers see either the old or the new file, never a partial one. The
+    original file is left alone when the block raises.
+    :param permissions: Mode of the new file, by default it is only accessible to the current user
+    """
+    path = Path(path)
+    fd, temporary_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+
+    try:
+        if permissions is not None:
+            os.fchmod(fd, permissions)
+
+        with os.fdopen(fd, mode, encoding=encoding, newline=newline) as fp:
+            yield fp
+
+            fp.flush()
+            os.fsync(fp.fileno())
+
+        os.replace(temporary_name, path)
+
+    finally:
+        if os.path.exists(temporary_name):
+            os.remove(temporary_name)
+
+
+def atomic_write(path: Path, data: bytes, permissions: Optional[int] = None):
+    with atomic_writer(path, permissions=permissions) as fp:
+        fp.write(data)
+
+
 EnvironmentValue = Optional[str]
 Environment = Dict[str, EnvironmentValue]
 
@@ -82,6 +116,23 @@ def _apply_environment(environment: Environment):
             os.environ[k] = v
 
 
+def environment_with(environment: Optional[Environment]) -> Dict[str, str]:
+    """
+    Unlike environment_as, this does not touch os.environ, so it is safe to use from multiple threads
+    :return: A copy of the current environment with the given variables applied, None values are removed
+    """
+    combined = dict(os.environ)
+
+    for k, v in (environment or dict()).items():
+        if v is None:
+            combined.pop(k, None)
+
+        else:
+            combined[k] = v
+
+    return combined
+
+
 @contextmanager
 def environment_as(environment: Optional[Environment]):
     if environment is None:
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from grapejuice_common import variables
+from grapejuice_common.util import atomic_writer
+from grapejuice_common.util.downloads import DownloadManager, download_manager
+
+LOG = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# Releases of DXVK and the FPS unlocker together with a few installers fit comfortably
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class Artifact:
+    url: str
+    sha256: str
+    size: int
+    etag: Optional[str] = None
+    last_used: float = 0.0
+
+
+def _url_key(url: str) -> str:
+    return hashlib.blake2s(url.encode("UTF-8")).hexdigest()
+
+
+def _sha256_of(path: Path) -> str:
+    hasher = hashlib.sha256()
+
+    with path.open("rb") as fp:
+        for chunk in iter(lambda: fp.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+
+    return hasher.hexdigest()
+
+
+class ArtifactStore:
+    """
+    Content-addressed store for downloaded files. A download is stored once by its SHA-256 and looked up by the URL it
+    came from, so installing the same release into several Wineprefixes costs one download. URLs that do not pin a
+    version can be revalidated against the ETag the server reports. The least recently used artifacts are evicted when
+    the store grows beyond its maximum size.
+    """
+    _directory: Path
+    _max_size: int
+    _downloads: DownloadManager
+    _artifacts: Optional[Dict[str, Artifact]] = None
+    _lock: threading.RLock
+
+    def __init__(self, directory: Path, max_size: int = DEFAULT_MAX_SIZE, downloads: DownloadManager = None):
+        self._directory = directory
+        self._max_size = max_size
+        self._downloads = downloads or download_manager
+        self._lock = threading.RLock()
+
+    @property
+    def _index_path(self) -> Path:
+        return self._directory / "index.json"
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self._directory / "objects" / sha256[:2] / sha256
+
+    def _incoming_path(self, url: str) -> Path:
+        return self._directory / "incoming" / _url_key(url)
+
+    def _load(self) -> Dict[str, Artifact]:
+        if self._artifacts is not None:
+            return self._artifacts
+
+        self._artifacts = dict()
+
+        if self._index_path.exists():
+            try:
+                with self._index_path.open("r", encoding=variables.text_encoding()) as fp:
+                    index = json.load(fp)
+
+                if index.get("version", None) == INDEX_VERSION:
+                    for raw_artifact in index.get("artifacts", []):
+                        artifact = Artifact(**raw_artifact)
+                        self._artifacts[artifact.url] = artifact
+
+            except (OSError, ValueError, TypeError) as e:
+                LOG.warning(f"Discarding the artifact index at {self._index_path}: {e}")
+
+        return self._artifacts
+
+    def _save(self):
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+        with atomic_writer(self._index_path, "w", encoding=variables.text_encoding()) as fp:
+            json.dump(
+                {
+                    "version": INDEX_VERSION,
+                    "artifacts": [asdict(artifact) for artifact in self._load().values()]
+                },
+                fp
+            )
+
+    def _remote_etag(self, url: str) -> Optional[str]:
+        try:
+            response = self._downloads.session.head(url, allow_redirects=True, timeout=10)
+            response.raise_for_status()
+
+            return response.headers.get("ETag", None)
+
+        except Exception as e:
+            LOG.warning(f"Could not revalidate {url}, using the stored artifact: {e}")
+            return None
+
+    def _cached(self, url: str, sha256: Optional[str], revalidate: bool) -> Optional[Artifact]:
+        artifact = self._load().get(url, None)
+
+        if artifact is None or not self._blob_path(artifact.sha256).exists():
+            return None
+
+        if sha256 and artifact.sha256 != sha256.lower():
+            return None
+
+        if revalidate:
+            if not artifact.etag:
+                # Without an ETag there is no way to tell whether the stored copy is current
+                return None
+
+            remote_etag = self._remote_etag(url)
+
+            if remote_etag is not None and remote_etag != artifact.etag:
+                LOG.info(f"{url} has changed since it was stored")
+                return None
+
+        return artifact
+
+    def fetch(self, url: str, sha256: Optional[str] = None, revalidate: bool = False) -> Path:
+        """
+        Get the file behind a URL from the store, downloading it when it is not stored yet
+        :param sha256: Expected SHA-256 of the file, a stored artifact with a different hash is downloaded again
+        :param revalidate: Ask the server whether the file changed, for URLs that always point to the latest version
+        :return: Path to the stored file, which must not be modified
+        """
+        with self._lock:
+            artifact = self._cached(url, sha256, revalidate)
+
+            if artifact is None:
+                headers = dict()
+
+                # The ETag has to describe the body that is stored. The download only resumes a leftover partial file
+                # when the server confirms it is still the same file.
+                incoming_path = self._downloads.download(
+                    url,
+                    self._incoming_path(url),
+                    sha256=sha256,
+                    on_response=headers.update
+                )
+
+                etag = headers.get("ETag", None)
+                digest = sha256.lower() if sha256 else _sha256_of(incoming_path)
+
+                blob_path = self._blob_path(digest)
+                blob_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(incoming_path, blob_path)
+
+                artifact = Artifact(url, digest, blob_path.stat().st_size, etag=etag)
+                self._load()[url] = artifact
+
+                LOG.info(f"Stored {url} as {digest}")
+
+            artifact.last_used = time.time()
+            self._evict(keep=artifact.sha256)
+            self._save()
+
+            return self._blob_path(artifact.sha256)
+
+    def link(self, url: str, target_path: Path, sha256: Optional[str] = None, revalidate: bool = False) -> Path:
+        """
+        Fetch a file and hard link it to the target path, the file is copied when a hard link is not possible
+        :return: The target path
+        """
+        blob_path = self.fetch(url, sha256=sha256, revalidate=revalidate)
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if target_path.exists() or target_path.is_symlink():
+            os.remove(target_path)
+
+        try:
+            os.link(blob_path, target_path)
+
+        except OSError:
+            shutil.copyfile(blob_path, target_path)
+
+        return target_path
+
+    def _evict(self, keep: Optional[str] = None):
+        artifacts = self._load()
+
+        # Several URLs can point to the same content, a blob is as recent as its most recently used URL
+        blobs: Dict[str, List[Artifact]] = dict()
+        for artifact in artifacts.values():
+            blobs.setdefault(artifact.sha256, []).append(artifact)
+
+        total_size = sum(group[0].size for group in blobs.values())
+        least_recently_used = sorted(blobs.items(), key=lambda t: max(a.last_used for a in t[1]))
+
+        for digest, group in least_recently_used:
+            if total_size <= self._max_size:
+                break
+
+            if digest == keep:
+                continue
+
+            LOG.info(f"Evicting {digest} from the artifact store")
+
+            blob_path = self._blob_path(digest)
+            if blob_path.exists():
+                os.remove(blob_path)
+
+            for artifact in group:
+                artifacts.pop(artifact.url, None)
+
+            total_size -= group[0].size
+
+    def clear(self):
+        with self._lock:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._artifacts = None
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return sum(artifact.size for artifact in {a.sha256: a for a in self._load().values()}.values())
+
+
+_artifact_store: Optional[ArtifactStore] = None
+
+
+def artifact_store() -> ArtifactStore:
+    global _artifact_store
+
+    if _artifact_store is None:
+        from grapejuice_common.paths import artifact_cache_directory
+
+        _artifact_store = ArtifactStore(artifact_cache_directory())
+
+    return _artifact_store
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Mapping
+
+from grapejuice_common.errors import DownloadChecksumMismatch
+from grapejuice_common.util import atomic_writer
+from grapejuice_common.util.event import Event
+
+LOG = logging.getLogger(__name__)
+
+# Seconds to wait for a connection, and for data once connected
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 60
+
+CHUNK_SIZE = 64 * 1024
+
+PARTIAL_SUFFIX = ".part"
+VALIDATOR_SUFFIX = ".validator"
+
+HTTP_PARTIAL_CONTENT = 206
+HTTP_RANGE_NOT_SATISFIABLE = 416
+
+
+@dataclass(frozen=True)
+class DownloadProgress:
+    url: str
+    target_path: Path
+    downloaded: int
+    total: Optional[int]
+
+    @property
+    def fraction(self) -> Optional[float]:
+        if not self.total:
+            return None
+
+        return min(1.0, self.downloaded / self.total)
+
+    @property
+    def finished(self) -> bool:
+        return self.total is not None and self.downloaded >= self.total
+
+
+ProgressCallback = Callable[[DownloadProgress], None]
+ResponseCallback = Callable[[Mapping[str, str]], None]
+
+
+def partial_path(target_path: Path) -> Path:
+    return target_path.with_name(target_path.name + PARTIAL_SUFFIX)
+
+
+def validator_path(target_path: Path) -> Path:
+    return target_path.with_name(target_path.name + PARTIAL_SUFFIX + VALIDATOR_SUFFIX)
+
+
+def _response_validator(headers: Mapping[str, str]) -> Optional[str]:
+    """
+    :return: A value for If-Range that identifies this version of the remote file, None when it can't be identified
+    """
+    etag = headers.get("ETag", None)
+
+    # If-Range only accepts strong ETags
+    if etag and not etag.startswith("W/"):
+        return etag
+
+    return headers.get("Last-Modified", None)
+
+
+def _read_validator(target_path: Path) -> Optional[str]:
+    try:
+        with validator_path(target_path).open("r", encoding="UTF-8") as fp:
+            return json.load(fp).get("validator", None)
+
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _write_validator(target_path: Path, validator: Optional[str]):
+    path = validator_path(target_path)
+
+    if validator is None:
+        _remove(path)
+        return
+
+    with atomic_writer(path, "w", encoding="UTF-8") as fp:
+        json.dump({"validator": validator}, fp)
+
+
+def _remove(path: Path):
+    if path.exists():
+        os.remove(path)
+
+
+def _hash_file(path: Path, hasher):
+    with path.open("rb") as fp:
+        for chunk in iter(lambda: fp.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+
+
+class DownloadManager:
+    """
+    Downloads files over a pooled HTTP session. Responses are streamed to a .part file next to the target, which is
+    renamed into place once the download is complete and verified. An interrupted download is resumed with an HTTP
+    range request, guarded by If-Range with the ETag or Last-Modified of the first response, so a file that changed
+    on the server is downloaded again instead of being stitched together. Every received chunk is reported through
+    the progress event.
+    """
+    progress: Event
+    _session = None
+    _lock: threading.Lock
+
+    def __init__(self):
+        self.progress = Event()
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                import requests
+
+                self._session = requests.Session()
+                self._session.headers["User-Agent"] = "Grapejuice"
+
+            return self._session
+
+    def _request(self, url: str, offset: int, validator: Optional[str]):
+        headers = {"Range": f"bytes={offset}-", "If-Range": validator} if offset > 0 else dict()
+
+        return self.session.get(url, headers=headers, stream=True, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+
+    def download(
+        self,
+        url: str,
+        target_path: Path,
+        *,
+        sha256: Optional[str] = None,
+        resume: bool = True,
+        on_progress: Optional[ProgressCallback] = None,
+        on_response: Optional[ResponseCallback] = None
+    ) -> Path:
+        """
+        Download a file
+        :param sha256: Expected SHA-256 of the file in hexadecimal, the download is discarded when it does not match
+        :param resume: Continue a previously interrupted download of the same target, as long as the remote file did
+        not change since
+        :param on_progress: Called for every received chunk, in addition to the progress event
+        :param on_response: Called with the headers of the response, before the body is downloaded
+        :return: The target path
+        """
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = partial_path(target_path)
+
+        # A partial download can only be continued when the server can tell whether it is still the same file
+        validator = _read_validator(target_path) if resume and part_path.exists() else None
+        offset = part_path.stat().st_size if validator is not None else 0
+
+        response = self._request(url, offset, validator)
+
+        if offset > 0 and response.status_code == HTTP_RANGE_NOT_SATISFIABLE:
+            LOG.info(f"Server refused to resume {url}, starting over")
+            response.close()
+
+            offset = 0
+            response = self._request(url, offset, None)
+
+        with response:
+            response.raise_for_status()
+
+            if offset > 0 and response.status_code != HTTP_PARTIAL_CONTENT:
+                LOG.info(f"Remote file changed or server does not support resuming {url}, starting over")
+                offset = 0
+
+            if offset == 0:
+                _write_validator(target_path, _response_validator(response.headers))
+
+            if callable(on_response):
+                on_response(response.headers)
+
+            content_length = response.headers.get("Content-Length", None)
+            total = offset + int(content_length) if content_length is not None else None
+
+            hasher = hashlib.sha256() if sha256 else None
+            if hasher is not None and offset > 0:
+                _hash_file(part_path, hasher)
+
+            downloaded = offset
+
+            with part_path.open("ab" if offset > 0 else "wb") as fp:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if not chunk:
+                        continue
+
+                    fp.write(chunk)
+                    downloaded += len(chunk)
+
+                    if hasher is not None:
+                        hasher.update(chunk)
+
+                    progress = DownloadProgress(url, target_path, downloaded, total)
+                    self.progress(progress)
+
+                    if callable(on_progress):
+                        on_progress(progress)
+
+                # The .part file has a fixed name so it can be resumed, it is synced before it replaces the target
+                fp.flush()
+                os.fsync(fp.fileno())
+
+        if hasher is not None and hasher.hexdigest().lower() != sha256.lower():
+            os.remove(part_path)
+            _remove(validator_path(target_path))
+
+            raise DownloadChecksumMismatch(url, sha256, hasher.hexdigest())
+
+        os.replace(part_path, target_path)
+        _remove(validator_path(target_path))
+        LOG.info(f"Downloaded {url} to {target_path} ({downloaded} bytes)")
+
+        return target_path
+
+
+download_manager = DownloadManager()
@@ -0,0 +1,128 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+LOG = logging.getLogger(__name__)
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+INOTIFY_EVENT = struct.Struct("iIII")
+
+POLL_INTERVAL = 0.25
+
+# The cancellation callback is checked at least this often
+MAX_WAIT_SLICE = 0.5
+
+_libc = None
+
+
+def _inotify_libc():
+    global _libc
+
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+
+    return _libc
+
+
+class _Inotify:
+    _fd: int
+
+    def __init__(self, directory: Path, mask: int):
+        libc = _inotify_libc()
+
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        if libc.inotify_add_watch(self._fd, str(directory).encode(), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def read_names(self, timeout: float) -> Optional[set]:
+        """
+        :return: Names of the files events were received for, None when nothing happened before the timeout
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return None
+
+        names = set()
+        data = os.read(self._fd, 64 * 1024)
+        offset = 0
+
+        while offset < len(data):
+            _, _, _, name_length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+
+            names.add(data[offset:offset + name_length].rstrip(b"\0").decode(errors="replace"))
+            offset += name_length
+
+        return names
+
+    def close(self):
+        os.close(self._fd)
+
+
+def wait_for_file(
+    path: Path,
+    is_complete: Callable[[Path], bool],
+    timeout: float,
+    is_cancelled: Optional[Callable[[], bool]] = None
+) -> bool:
+    """
+    Wait until a file is written. Uses inotify to wake up when the file is closed after writing, and falls back to
+    polling when inotify is not available.
+    :param path: The file to wait for, its parent directory is created when it does not exist
+    :param is_complete: Decides whether the file contains everything that is expected
+    :param timeout: Maximum number of seconds to wait
+    :param is_cancelled: Stops the wait early when it returns True
+    :return: Whether the file is complete
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    deadline = time.monotonic() + timeout
+
+    try:
+        watch = _Inotify(path.parent, IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE)
+
+    except (OSError, AttributeError) as e:
+        LOG.warning(f"Could not use inotify, falling back to polling: {e}")
+        watch = None
+
+    try:
+        # The file might have been completed before the watch was added
+        if path.exists() and is_complete(path):
+            return True
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (callable(is_cancelled) and is_cancelled()):
+                # The file might have been completed right before the process that writes it exited
+                return path.exists() and is_complete(path)
+
+            if watch is None:
+                time.sleep(min(remaining, POLL_INTERVAL))
+                changed = True
+
+            else:
+                names = watch.read_names(min(remaining, MAX_WAIT_SLICE))
+                changed = names is not None and path.name in names
+
+            if changed and path.exists() and is_complete(path):
+                return True
+
+    finally:
+        if watch is not None:
+            watch.close()
@@ -0,0 +1,182 @@
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+LOG = logging.getLogger(__name__)
+
+
+def _exit_code_from_status(status: int) -> int:
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+
+    return os.WEXITSTATUS(status)
+
+
+def _main_loop_is_running() -> bool:
+    """
+    :return: Whether a thread is running a main loop on the default GLib context, like Gtk.main in the GUI or the
+    GLib.MainLoop of the daemon
+    """
+    # The CLI never imports GLib, so it can't have a main loop
+    glib = sys.modules.get("gi.repository.GLib", None)
+    if glib is None:
+        return False
+
+    # A running main loop owns its context, so it can't be acquired from another thread
+    context = glib.MainContext.default()
+    if context.acquire():
+        context.release()
+        return False
+
+    return True
+
+
+class ProcessWrapper:
+    """
+    A child process that is reaped by the ProcessSupervisor. Its exit code, runtime and peak resident set size are
+    known as soon as it exits. The on_exit callback runs on the main loop of the default GLib context while one is
+    running, so callbacks are free to touch widgets. Without a main loop it runs on the thread that reaped the process.
+    """
+    on_exit: callable = None
+
+    _started_at: float
+    _exited_at: Optional[float] = None
+    _exit_code: Optional[int] = None
+    _peak_rss: Optional[int] = None
+    _exited_event: threading.Event
+
+    def __init__(self, proc: subprocess.Popen, on_exit: callable = None):
+        self.proc = proc
+        self.on_exit = on_exit
+
+        self._started_at = time.monotonic()
+        self._exited_event = threading.Event()
+
+    @property
+    def pid(self) -> int:
+        return self.proc.pid
+
+    @property
+    def exited(self) -> bool:
+        return self._exited_event.is_set()
+
+    @property
+    def exit_code(self) -> Optional[int]:
+        return self._exit_code
+
+    @property
+    def runtime(self) -> float:
+        """
+        :return: Seconds the process has been running for, or ran for when it has exited
+        """
+        return (self._exited_at or time.monotonic()) - self._started_at
+
+    @property
+    def peak_rss(self) -> Optional[int]:
+        """
+        :return: The maximum resident set size of the process in bytes, only known after it exited
+        """
+        return self._peak_rss
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._exited_event.wait(timeout)
+
+    def kill(self):
+        if not self.exited:
+            os.kill(self.proc.pid, signal.SIGINT)
+
+    def set_exited(self, exit_code: Optional[int], peak_rss: Optional[int]):
+        """
+        Called by the supervisor once it reaped the process
+        """
+        self._exited_at = time.monotonic()
+        self._exit_code = exit_code
+        self._peak_rss = peak_rss
+
+        # Popen must not try to reap the process again
+        self.proc.returncode = exit_code
+
+        self._exited_event.set()
+
+
+class ProcessSupervisor:
+    """
+    Reaps child processes as soon as they exit. Every supervised process gets a thread that blocks in wait4, so
+    nothing wakes up while children are running.
+    """
+    _lock: threading.Lock
+    _processes: Dict[int, ProcessWrapper]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processes = dict()
+
+    @property
+    def processes(self) -> List[ProcessWrapper]:
+        with self._lock:
+            return list(self._processes.values())
+
+    def supervise(self, proc: subprocess.Popen, on_exit: callable = None) -> ProcessWrapper:
+        wrapper = ProcessWrapper(proc, on_exit=on_exit)
+
+        with self._lock:
+            self._processes[proc.pid] = wrapper
+
+        thread = threading.Thread(
+            target=self._reap,
+            args=(wrapper,),
+            name=f"process-supervisor-{proc.pid}",
+            daemon=True
+        )
+        thread.start()
+
+        return wrapper
+
+    def _reap(self, wrapper: ProcessWrapper):
+        try:
+            _, status, rusage = os.wait4(wrapper.pid, 0)
+
+            # ru_maxrss is in kilobytes on Linux
+            wrapper.set_exited(_exit_code_from_status(status), rusage.ru_maxrss * 1024)
+
+        except ChildProcessError:
+            # The process was reaped elsewhere, Popen knows how it ended
+            wrapper.set_exited(wrapper.proc.poll(), None)
+
+        with self._lock:
+            self._processes.pop(wrapper.pid, None)
+
+        if wrapper.exit_code != 0:
+            LOG.error(f"Process returned with non-zero exit code {wrapper.exit_code}")
+
+        LOG.info(
+            f"Process {wrapper.pid} exited after {wrapper.runtime:.1f}s, peak RSS: {wrapper.peak_rss} bytes"
+        )
+
+        if callable(wrapper.on_exit):
+            if _main_loop_is_running():
+                from gi.repository import GLib
+
+                GLib.idle_add(self._call_on_exit, wrapper)
+
+            else:
+                self._call_on_exit(wrapper)
+
+    @staticmethod
+    def _call_on_exit(wrapper: ProcessWrapper) -> bool:
+        try:
+            wrapper.on_exit()
+
+        except Exception as e:
+            LOG.error(f"Exit callback of process {wrapper.pid} failed: {e}")
+
+        # Remove the idle source
+        return False
+
+
+process_supervisor = ProcessSupervisor()
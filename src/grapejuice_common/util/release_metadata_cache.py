@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Optional
+
+from grapejuice_common import variables
+from grapejuice_common.errors import ReleaseMetadataUnavailable
+from grapejuice_common.util import atomic_writer
+from grapejuice_common.util.downloads import DownloadManager, download_manager
+
+LOG = logging.getLogger(__name__)
+
+# Unauthenticated GitHub API requests are limited to 60 per hour
+DEFAULT_TTL = 6 * 60 * 60
+
+# Release lookups happen on launch paths, so give up quickly and use the stored response instead
+REQUEST_TIMEOUT = (5, 10)
+
+HTTP_NOT_MODIFIED = 304
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    body: str
+    etag: Optional[str] = None
+    fetched_at: float = 0.0
+
+
+def _url_key(url: str) -> str:
+    return hashlib.blake2s(url.encode("UTF-8")).hexdigest()
+
+
+class ReleaseMetadataCache:
+    """
+    Persistent cache for small responses from release APIs, like the latest release of DXVK on GitHub. A response is
+    used without contacting the server until its time to live runs out, after which it is revalidated using its ETag.
+    When the server cannot be reached, the last response is used no matter how old it is.
+    """
+    _directory: Path
+    _ttl: float
+    _downloads: DownloadManager
+    _responses: Dict[str, CachedResponse]
+    _lock: threading.Lock
+
+    def __init__(self, directory: Path, ttl: float = DEFAULT_TTL, downloads: DownloadManager = None):
+        self._directory = directory
+        self._ttl = ttl
+        self._downloads = downloads or download_manager
+        self._responses = dict()
+        self._lock = threading.Lock()
+
+    def _response_path(self, url: str) -> Path:
+        return self._directory / f"{_url_key(url)}.json"
+
+    def _load(self, url: str) -> Optional[CachedResponse]:
+        if url in self._responses:
+            return self._responses[url]
+
+        path = self._response_path(url)
+        if not path.exists():
+            return None
+
+        try:
+            with path.open("r", encoding=variables.text_encoding()) as fp:
+                response = CachedResponse(**json.load(fp))
+
+        except (OSError, ValueError, TypeError) as e:
+            LOG.warning(f"Discarding the cached response at {path}: {e}")
+            return None
+
+        self._responses[url] = response
+
+        return response
+
+    def _store(self, response: CachedResponse):
+        self._responses[response.url] = response
+
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+
+            with atomic_writer(self._response_path(response.url), "w", encoding=variables.text_encoding()) as fp:
+                json.dump(asdict(response), fp)
+
+        except OSError as e:
+            LOG.warning(f"Could not store the response from {response.url}: {e}")
+
+    def _revalidate(self, url: str, cached: Optional[CachedResponse]) -> CachedResponse:
+        headers = {"If-None-Match": cached.etag} if cached and cached.etag else dict()
+
+        response = self._downloads.session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+
+        if cached is not None and response.status_code == HTTP_NOT_MODIFIED:
+            return CachedResponse(url, cached.body, cached.etag, time.time())
+
+        response.raise_for_status()
+
+        return CachedResponse(url, response.text, response.headers.get("ETag", None), time.time())
+
+    def get_text(self, url: str, ttl: Optional[float] = None) -> str:
+        """
+        :param ttl: Seconds a response stays fresh, overrides the time to live of the cache
+        :return: The body of the response
+        """
+        ttl = self._ttl if ttl is None else ttl
+
+        with self._lock:
+            cached = self._load(url)
+
+            if cached is not None and time.time() - cached.fetched_at < ttl:
+                return cached.body
+
+            try:
+                fresh = self._revalidate(url, cached)
+
+            except Exception as e:
+                if cached is None:
+                    raise ReleaseMetadataUnavailable(url, e) from e
+
+                LOG.warning(f"Using the stored response from {url}, it could not be revalidated: {e}")
+                return cached.body
+
+            self._store(fresh)
+
+            return fresh.body
+
+    def get_json(self, url: str, ttl: Optional[float] = None):
+        return json.loads(self.get_text(url, ttl=ttl))
+
+    def invalidate(self, url: str):
+        with self._lock:
+            self._responses.pop(url, None)
+
+            path = self._response_path(url)
+            if path.exists():
+                os.remove(path)
+
+
+_release_metadata_cache: Optional[ReleaseMetadataCache] = None
+
+
+def release_metadata_cache() -> ReleaseMetadataCache:
+    global _release_metadata_cache
+
+    if _release_metadata_cache is None:
+        from grapejuice_common.paths import release_metadata_cache_directory
+
+        _release_metadata_cache = ReleaseMetadataCache(release_metadata_cache_directory())
+
+    return _release_metadata_cache
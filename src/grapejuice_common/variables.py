@@ -90,6 +90,10 @@ def required_player_wine_version():
     return "wine-7.0"
 
 
+RBXFPSUNLOCKER_LATEST_RELEASE = "https://api.github.com/repos/axstin/rbxfpsunlocker/releases/latest"
+DXVK_LATEST_RELEASE = "https://api.github.com/repos/doitsujin/dxvk/releases/latest"
+
+
 @dataclass(frozen=True)
 class FpsUnlockerRelease:
     id: int
@@ -99,14 +103,10 @@ class FpsUnlockerRelease:
 
 
 def current_rbxfpsunlocker_release() -> FpsUnlockerRelease:
-    import requests
+    from grapejuice_common.util.release_metadata_cache import release_metadata_cache
 
     try:
-
-        gh_release = requests.get("https://api.github.com/repos/axstin/rbxfpsunlocker/releases/latest")
-        gh_release.raise_for_status()
-
-        gh_release = gh_release.json()
+        gh_release = release_metadata_cache().get_json(RBXFPSUNLOCKER_LATEST_RELEASE)
 
         url_ptn = re.compile(r"(https://github.com/axstin.rbxfpsunlocker/files/\d+/[\w-]+?\.zip)")
         found_urls = url_ptn.findall(gh_release["body"])
@@ -170,14 +170,10 @@ DXVK_VERSION_PTN = re.compile(r"^v(.*)")
 
 
 def current_dxvk_release() -> DXVKRelease:
-    import requests
+    from grapejuice_common.util.release_metadata_cache import release_metadata_cache
 
     try:
-
-        gh_release = requests.get("https://api.github.com/repos/doitsujin/dxvk/releases/latest")
-        gh_release.raise_for_status()
-
-        gh_release = gh_release.json()
+        gh_release = release_metadata_cache().get_json(DXVK_LATEST_RELEASE)
         version = None
 
         tag_name = gh_release.get("tag_name", "")
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from grapejuice_common import variables
+from grapejuice_common.util import atomic_write
+
+LOG = logging.getLogger(__name__)
+
+SIDECAR_SUFFIX = ".grapejuice-hash"
+
+
+@dataclass
+class AppSettingsWriteResult:
+    written: List[Path] = field(default_factory=list)
+    skipped: List[Path] = field(default_factory=list)
+    bytes_written: int = 0
+
+    @property
+    def files_written(self) -> int:
+        return len(self.written)
+
+    def __str__(self):
+        return f"wrote {self.bytes_written} bytes to {self.files_written} files, {len(self.skipped)} were up to date"
+
+
+def render_app_settings(flags: Dict[str, any]) -> bytes:
+    return json.dumps(flags, indent=2).encode(variables.text_encoding())
+
+
+def _sidecar_path(path: Path) -> Path:
+    return path.with_name(path.name + SIDECAR_SUFFIX)
+
+
+def _file_state(path: Path, digest: str) -> Optional[Dict[str, any]]:
+    try:
+        stat = path.stat()
+
+    except FileNotFoundError:
+        return None
+
+    return {"digest": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _is_up_to_date(path: Path, digest: str) -> bool:
+    """
+    The sidecar records the hash of the payload together with the size and modification time of the file it was
+    written to, a file that was changed or replaced by someone else is written again.
+    """
+    try:
+        with _sidecar_path(path).open("r", encoding=variables.text_encoding()) as fp:
+            recorded = json.load(fp)
+
+    except (OSError, ValueError):
+        return False
+
+    return recorded == _file_state(path, digest)
+
+
+def write_app_settings(flags: Dict[str, any], settings_paths: Iterable[Path]) -> AppSettingsWriteResult:
+    """
+    Write ClientAppSettings.json to every path that does not contain these flags yet. The payload is serialized and
+    hashed once, files are replaced atomically.
+    """
+    payload = render_app_settings(flags)
+    digest = hashlib.blake2s(payload).hexdigest()
+    result = AppSettingsWriteResult()
+
+    for path in settings_paths:
+        if _is_up_to_date(path, digest):
+            result.skipped.append(path)
+            continue
+
+        LOG.info(f"Writing app settings to: {path}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, payload)
+
+        atomic_write(
+            _sidecar_path(path),
+            json.dumps(_file_state(path, digest)).encode(variables.text_encoding())
+        )
+
+        result.written.append(path)
+        result.bytes_written += len(payload)
+
+    return result
@@ -1,28 +1,56 @@
 import logging
 import re
-from copy import deepcopy
 from pathlib import Path
-from typing import Union, IO, List, Callable, Dict
+from types import MappingProxyType
+from typing import Union, List, Dict, Optional, Iterable, Mapping
 
 LOG = logging.getLogger(__name__)
 
-KEY_PTN = re.compile(r"\[(.*)?].*")
+HIVE_ENCODING = "UTF-8"
 
+KEY_HEADER_START = b"["
+VALUE_CONTINUATION = "\\"
+SCAN_CHUNK_SIZE = 1024 * 1024
 
-def line_iterator(fp: IO):
-    for line in fp.read().split("\n"):
-        yield line.strip("\r").strip()
+# Only key headers and comments are interesting while indexing, everything else is skipped by the regex engine
+INDEX_LINE_PTN = re.compile(rb"\n(?:\[([^\n]*)\][ \t]*([^\s]*)[^\n]*|(;;[^\n]*))")
+
+META_ATTRIBUTE_PTN = re.compile(r"#(.*)?=(.*)")
+ATTRIBUTE_PTN = re.compile(r"\"(.*)?\"\s*=\s*(.*)")
+DEFAULT_ATTRIBUTE_PTN = re.compile(r"@\s*=\s*(.*)")
+
+# Offsets of the lines following a key header, keys can appear more than once in a hive
+KeyOffsets = List[int]
+
+# Paths are indexed as raw bytes, so nothing has to be decoded while scanning the hive
+IndexedPath = bytes
+
+
+def _decode_line(line: bytes) -> str:
+    return line.decode(HIVE_ENCODING, errors="replace").strip("\r\n").strip()
+
+
+def _encode_path(path: str) -> IndexedPath:
+    return path.encode(HIVE_ENCODING)
+
+
+def _decode_path(path: IndexedPath) -> str:
+    return path.decode(HIVE_ENCODING, errors="replace")
 
 
 class RegistryKey:
     _path: str
-    _value: any
+    _value: any = None
     _attributes: Dict[str, str]
 
     def __init__(self, path: str):
         self._path = path
         self._attributes = dict()
 
+    @property
+    def path(self) -> str:
+        return self._path
+
     @property
     def value(self):
         return self._value
@@ -38,18 +66,24 @@ class RegistryKey:
         return self._attributes.get(key, None)
 
     @property
-    def attributes(self) -> Dict[str, str]:
-        return deepcopy(self._attributes)
+    def attributes(self) -> Mapping[str, str]:
+        return MappingProxyType(self._attributes)
 
 
 class RegistryFile:
+    """
+    Reads Wine registry hives. Loading the file only builds an index of the key headers and where their
+    bodies start, attributes are parsed when a key is requested through find_key.
+    """
     _path: Path
 
     _version: str = ""
     _comments: List[str]
     _root_key: RegistryKey
+    _root_offset: Optional[int] = None
+    _index: Dict[IndexedPath, KeyOffsets]
+    _key_values: Dict[IndexedPath, bytes]
     _keys: Dict[str, RegistryKey]
-    _last_key_read: Union[RegistryKey, None] = None
 
     def __init__(self, path: Union[str, Path]):
         if isinstance(path, str):
@@ -59,74 +93,153 @@ class RegistryFile:
             self._path = path.absolute()
 
         self._comments = []
+        self._index = dict()
+        self._key_values = dict()
         self._keys = dict()
         self._root_key = RegistryKey("\\")
 
     @property
-    def _current_key(self) -> RegistryKey:
-        if self._last_key_read is not None:
-            return self._last_key_read
+    def path(self) -> Path:
+        return self._path
 
-        else:
-            return self._root_key
+    @property
+    def version(self) -> str:
+        return self._version
 
-    def find_key(self, path: str):
-        return self._keys.get(path, None)
+    @property
+    def comments(self) -> List[str]:
+        return list(self._comments)
 
-    def load(self):
-        class LoadState:
-            operator: Callable[[str], None]
+    @property
+    def key_paths(self) -> Iterable[str]:
+        return map(_decode_path, self._index.keys())
+
+    @property
+    def root_key(self) -> RegistryKey:
+        if self._root_offset is not None:
+            self._materialize(self._root_key, [self._root_offset])
+            self._root_offset = None
+
+        return self._root_key
+
+    def __contains__(self, path: str) -> bool:
+        return _encode_path(path) in self._index
 
-        def normal(ln: str):
-            if ln.startswith(";;"):
-                return comment(ln)
+    def find_key(self, path: str) -> Optional[RegistryKey]:
+        registry_key = self._keys.get(path, None)
+        if registry_key is not None:
+            return registry_key
 
-            match = KEY_PTN.match(ln)
-            if match:
-                return key(ln)
+        indexed_path = _encode_path(path)
+        offsets = self._index.get(indexed_path, None)
+        if offsets is None:
+            return None
 
-            return attribute(ln)
+        registry_key = RegistryKey(path)
+        value = self._key_values.get(indexed_path, None)
+        registry_key.value = None if value is None else value.decode(HIVE_ENCODING, errors="replace")
+        self._materialize(registry_key, offsets)
 
-        def version(ln: str):
-            self._version = ln
-            LoadState.operator = normal
+        self._keys[path] = registry_key
 
-        def comment(ln: str):
-            self._comments.append(ln)
+        return registry_key
 
-        def key(ln: str):
-            split = ln.split(" ")
-            path = split[0].lstrip("[").strip("]")
-            registry_key = self._keys.setdefault(path, RegistryKey(path))
+    def _materialize(self, registry_key: RegistryKey, offsets: KeyOffsets):
+        with self._path.open("rb") as fp:
+            for offset in offsets:
+                fp.seek(offset)
+                pending = ""
 
-            if len(split) > 1:
-                registry_key.value = split[1].strip()
+                for raw_line in fp:
+                    if raw_line.startswith(KEY_HEADER_START):
+                        break
 
-            self._last_key_read = registry_key
+                    line = _decode_line(raw_line)
 
-        def attribute(ln: str):
-            if not ln:
-                return
+                    # Long hex values are wrapped over multiple lines
+                    if line.endswith(VALUE_CONTINUATION):
+                        pending += line[:-1]
+                        continue
 
-            match = re.match(r"#(.*)?=(.*)", ln)
-            if match:
-                self._current_key.set_attribute(match.group(1), match.group(2))
-                return
+                    self._parse_attribute(registry_key, pending + line)
+                    pending = ""
 
-            match = re.match(r"\"(.*)?\"\s*=\s*(.*)", ln)
-            if match:
-                self._current_key.set_attribute(match.group(1), match.group(2))
-                return
+                if pending:
+                    self._parse_attribute(registry_key, pending)
 
-        LoadState.operator = version
+    @staticmethod
+    def _parse_attribute(registry_key: RegistryKey, ln: str):
+        if not ln or ln.startswith(";;"):
+            return
 
-        with self._path.open("r") as fp:
-            if callable(LoadState.operator):
-                for line in line_iterator(fp):
-                    LoadState.operator(line)
+        match = META_ATTRIBUTE_PTN.match(ln)
+        if match:
+            registry_key.set_attribute(match.group(1), match.group(2))
+            return
+
+        match = ATTRIBUTE_PTN.match(ln)
+        if match:
+            registry_key.set_attribute(match.group(1), match.group(2))
+            return
+
+        match = DEFAULT_ATTRIBUTE_PTN.match(ln)
+        if match:
+            registry_key.set_attribute("@", match.group(1))
+
+    def _index_lines(self, lines: bytes, lines_offset: int):
+        index = self._index
+        key_values = self._key_values
+
+        for match in INDEX_LINE_PTN.finditer(lines):
+            path, value, comment = match.groups()
+
+            if comment is not None:
+                self._comments.append(_decode_line(comment))
+                continue
+
+            # The body of a key starts after the newline of its header
+            body_offset = lines_offset + match.end() + 1
+
+            offsets = index.get(path, None)
+            if offsets is None:
+                index[path] = [body_offset]
 
             else:
-                LOG.warning("LoadState.operator is not callable")
+                offsets.append(body_offset)
+
+            if value:
+                key_values[path] = value
+
+    def load(self):
+        self._comments = []
+        self._index = dict()
+        self._key_values = dict()
+        self._keys = dict()
+        self._root_key = RegistryKey("\\")
+
+        with self._path.open("rb") as fp:
+            version_line = fp.readline()
+            self._version = _decode_line(version_line)
+
+            # The buffer always starts with the newline preceding its first line
+            buffer = b"\n"
+            buffer_offset = len(version_line) - 1
+            self._root_offset = len(version_line)
+
+            # Stream the hive in chunks, only complete lines are handed to the indexer
+            while True:
+                chunk = fp.read(SCAN_CHUNK_SIZE)
+                buffer += chunk
+
+                cut = buffer.rfind(b"\n") if chunk else len(buffer)
+                if cut > 0:
+                    self._index_lines(buffer[:cut], buffer_offset)
+
+                    buffer = buffer[cut:]
+                    buffer_offset += cut
+
+                if not chunk:
+                    break
 
     def __enter__(self):
         return self
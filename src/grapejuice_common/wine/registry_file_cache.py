@@ -0,0 +1,148 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Union, Dict, Optional, List
+
+from grapejuice_common import paths, variables
+from grapejuice_common.util import atomic_writer
+from grapejuice_common.wine.registry_file import RegistryFile, RegistryKey
+
+LOG = logging.getLogger(__name__)
+
+# Version 1 stored attribute values, which included session cookies
+CACHE_VERSION = 2
+
+HiveSignature = List[int]
+
+# Whether the key exists, and which of the queried attributes it has. Attribute values are never stored.
+CachedKey = Dict[str, any]
+
+
+def _hive_signature(path: Path) -> Optional[HiveSignature]:
+    try:
+        stat = os.stat(path)
+
+    except FileNotFoundError:
+        return None
+
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+def _cache_location(hive_path: Path) -> Path:
+    h = hashlib.new("blake2s")
+    h.update(str(hive_path).encode(variables.text_encoding()))
+
+    return paths.registry_cache_directory() / f"{h.hexdigest()}.json"
+
+
+def _new_cached_key(registry_key: Optional[RegistryKey]) -> CachedKey:
+    return {"exists": registry_key is not None, "attributes": dict()}
+
+
+class CachedRegistryFile:
+    """
+    Answers questions about a registry hive: whether a key exists and whether it has an attribute. The answers are
+    stored in the Grapejuice cache directory together with the (inode, size, mtime_ns) signature of the hive. As long
+    as Wine did not touch the hive, a lookup costs a stat and a read of the cache file. Hives hold secrets like the
+    Roblox session cookie, so attribute values are never cached, use RegistryFile to read them.
+    """
+    _path: Path
+    _cache_path: Path
+    _signature: Optional[HiveSignature] = None
+    _keys: Dict[str, CachedKey]
+    _hive: Optional[RegistryFile] = None
+
+    def __init__(self, path: Union[str, Path]):
+        self._path = Path(path).absolute()
+        self._cache_path = _cache_location(self._path)
+        self._keys = dict()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def load(self):
+        self._hive = None
+        self._keys = dict()
+        self._signature = _hive_signature(self._path)
+
+        if self._signature is None:
+            raise FileNotFoundError(self._path)
+
+        try:
+            with self._cache_path.open("r", encoding=variables.text_encoding()) as fp:
+                cached = json.load(fp)
+
+            if cached.get("version", None) == CACHE_VERSION and cached.get("signature", None) == self._signature:
+                self._keys = cached.get("keys", dict())
+
+            else:
+                LOG.debug(f"Registry cache for {self._path} is stale")
+
+                if cached.get("version", None) != CACHE_VERSION:
+                    os.remove(self._cache_path)
+
+        except FileNotFoundError:
+            pass
+
+        except (json.JSONDecodeError, AttributeError, OSError) as e:
+            LOG.warning(f"Ignoring invalid registry cache {self._cache_path}: {e}")
+
+    def _loaded_hive(self) -> RegistryFile:
+        if self._hive is None:
+            LOG.debug(f"Parsing registry hive {self._path}")
+
+            self._hive = RegistryFile(self._path)
+            self._hive.load()
+
+        return self._hive
+
+    def _save(self):
+        # Don't store lookups for a hive that changed while it was being read
+        if _hive_signature(self._path) != self._signature:
+            LOG.debug(f"Hive {self._path} changed while it was read, not caching it")
+            return
+
+        self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with atomic_writer(self._cache_path, "w", encoding=variables.text_encoding(), permissions=0o600) as fp:
+            json.dump({"version": CACHE_VERSION, "signature": self._signature, "keys": self._keys}, fp)
+
+    def _try_save(self):
+        try:
+            self._save()
+
+        except OSError as e:
+            LOG.warning(f"Could not write registry cache {self._cache_path}: {e}")
+
+    def _cached_key(self, path: str) -> CachedKey:
+        if path not in self._keys:
+            self._keys[path] = _new_cached_key(self._loaded_hive().find_key(path))
+            self._try_save()
+
+        return self._keys[path]
+
+    def has_key(self, path: str) -> bool:
+        return self._cached_key(path)["exists"]
+
+    def has_attribute(self, path: str, attribute: str) -> bool:
+        cached_key = self._cached_key(path)
+
+        if not cached_key["exists"]:
+            return False
+
+        attributes = cached_key["attributes"]
+
+        if attribute not in attributes:
+            attributes[attribute] = self._loaded_hive().find_key(path).get_attribute(attribute) is not None
+            self._try_save()
+
+        return attributes[attribute]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
@@ -0,0 +1,334 @@
+import codecs
+import fcntl
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from grapejuice_common.util import atomic_writer
+from grapejuice_common.wine.registry_file import RegistryFile, HIVE_ENCODING
+from grapejuice_common.wine.wineprefix_paths import WineprefixPaths
+from grapejuice_common.wine.wineserver_manager import wineserver_lock_path
+
+LOG = logging.getLogger(__name__)
+
+IMPORT_KEY_PTN = re.compile(r"^\[(.*)]\s*$")
+IMPORT_VALUE_PTN = re.compile(r"^(\"(?:[^\"\\]|\\.)*\"|@)\s*=\s*(.*)$")
+
+DELETE_VALUE = "-"
+
+# Seconds between 1601-01-01 and 1970-01-01, Wine stores modification times as FILETIME
+FILETIME_EPOCH_OFFSET = 11644473600
+
+ROOT_KEY_ALIASES = {
+    "HKEY_CURRENT_USER": "HKEY_CURRENT_USER",
+    "HKCU": "HKEY_CURRENT_USER",
+    "HKEY_LOCAL_MACHINE": "HKEY_LOCAL_MACHINE",
+    "HKLM": "HKEY_LOCAL_MACHINE",
+    "HKEY_CLASSES_ROOT": "HKEY_CLASSES_ROOT",
+    "HKCR": "HKEY_CLASSES_ROOT"
+}
+
+_writer_lock = threading.Lock()
+
+
+class UnsupportedRegistryImport(RuntimeError):
+    pass
+
+
+class WineserverIsRunning(RuntimeError):
+    def __init__(self, prefix_directory: Path):
+        super().__init__(f"The wineserver for {prefix_directory} is running, its hives cannot be edited directly")
+
+
+@dataclass
+class RegistryImportKey:
+    root: str
+    path: str
+    values: Dict[str, str] = field(default_factory=dict)
+
+
+def decode_registry_import(data: bytes) -> str:
+    """
+    regedit exports are UTF-16 with a byte order mark, hand written .reg files are usually UTF-8
+    """
+    if data.startswith(codecs.BOM_UTF16_LE) or data.startswith(codecs.BOM_UTF16_BE):
+        return data.decode("UTF-16")
+
+    return data.decode("UTF-8-sig")
+
+
+def _normalize_value(value: str) -> str:
+    # Wine always stores dwords as 8 hex digits
+    if value.lower().startswith("dword:"):
+        try:
+            return f"dword:{int(value[6:], 16):08x}"
+
+        except ValueError as e:
+            raise UnsupportedRegistryImport(f"Invalid dword value: {value}") from e
+
+    return value
+
+
+def parse_registry_import(text: str) -> List[RegistryImportKey]:
+    """
+    Parse the contents of a .reg file as understood by regedit /S
+    :param text: Contents of the .reg file
+    :return: The keys in the file, in order of appearance
+    """
+    keys: List[RegistryImportKey] = []
+    current_key: Optional[RegistryImportKey] = None
+    pending = ""
+
+    lines = text.replace("\r\n", "\n").split("\n")
+    header = lines[0].strip() if lines else ""
+
+    if header not in ("Windows Registry Editor Version 5.00", "REGEDIT4"):
+        raise UnsupportedRegistryImport(f"Unknown registry file header: {header}")
+
+    for raw_line in lines[1:]:
+        line = pending + raw_line.strip()
+
+        # Long hex values are wrapped over multiple lines
+        if line.endswith("\\") and not line.startswith("["):
+            pending = line[:-1]
+            continue
+
+        pending = ""
+
+        if not line or line.startswith(";"):
+            continue
+
+        match = IMPORT_KEY_PTN.match(line)
+        if match:
+            full_path = match.group(1)
+
+            if full_path.startswith("-"):
+                raise UnsupportedRegistryImport(f"Deleting keys is not supported: {full_path}")
+
+            root, _, path = full_path.partition("\\")
+            if root.upper() not in ROOT_KEY_ALIASES:
+                raise UnsupportedRegistryImport(f"Unsupported root key: {root}")
+
+            current_key = RegistryImportKey(ROOT_KEY_ALIASES[root.upper()], path)
+            keys.append(current_key)
+
+            continue
+
+        match = IMPORT_VALUE_PTN.match(line)
+        if match and current_key is not None:
+            current_key.values[match.group(1)] = _normalize_value(match.group(2).strip())
+            continue
+
+        raise UnsupportedRegistryImport(f"Could not parse registry line: {line}")
+
+    return keys
+
+
+def _hive_location(prefix_paths: WineprefixPaths, key: RegistryImportKey) -> Tuple[Path, List[str]]:
+    """
+    :return: The hive a key lives in, and the paths of the key relative to the root of that hive
+    """
+    if key.root == "HKEY_CURRENT_USER":
+        return prefix_paths.user_registry_hive, [key.path]
+
+    if key.root == "HKEY_CLASSES_ROOT":
+        return prefix_paths.system_registry_hive, ["Software\\Classes\\" + key.path]
+
+    # regedit runs under both wine and wine64, 32-bit programs see HKLM\Software through Wow6432Node
+    software, _, remainder = key.path.partition("\\")
+    if software.lower() == "software" and remainder and not remainder.lower().startswith("wow6432node"):
+        return prefix_paths.system_registry_hive, [key.path, "Software\\Wow6432Node\\" + remainder]
+
+    return prefix_paths.system_registry_hive, [key.path]
+
+
+def _hive_path_string(path: str) -> str:
+    return path.replace("\\", "\\\\")
+
+
+def _is_change(attributes: Dict[str, str], name: str, value: str) -> bool:
+    """
+    :param attributes: The current attributes of the key, with lowercase names
+    :return: Whether setting or deleting the value modifies the key
+    """
+    attribute = "@" if name == "@" else name[1:-1].lower()
+
+    if value == DELETE_VALUE:
+        return attribute in attributes
+
+    return attributes.get(attribute, None) != value
+
+
+def _create_private_directories(directory: Path):
+    # Wine refuses to use server directories that other users can access
+    if not directory.parent.exists():
+        _create_private_directories(directory.parent)
+
+    try:
+        directory.mkdir(mode=0o700)
+
+    except FileExistsError:
+        pass
+
+
+@contextmanager
+def wineserver_lock(prefix_directory: Path):
+    """
+    Take the lock a wineserver holds while it is alive. As long as it is held, no wineserver can start for the prefix
+    and overwrite the hives with its in-memory copy. The lock file is created when no wineserver ran for the prefix
+    since the last reboot, so one that starts during the write still has to wait for it.
+    """
+    lock_path = wineserver_lock_path(prefix_directory)
+
+    with _writer_lock:
+        _create_private_directories(lock_path.parent)
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+
+        with os.fdopen(fd, "r+b") as fp:
+            try:
+                fcntl.lockf(fp, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+            except OSError as e:
+                raise WineserverIsRunning(prefix_directory) from e
+
+            try:
+                yield
+
+            finally:
+                fcntl.lockf(fp, fcntl.LOCK_UN)
+
+
+class RegistryHiveEditor:
+    """
+    Merges values into a Wine registry hive. The hive is rewritten into a temporary file next to it, which then
+    replaces the original file through an atomic rename.
+    """
+    _path: Path
+    _changes: Dict[str, Dict[str, str]]
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._changes = dict()
+
+    def set_values(self, key_path: str, values: Dict[str, str]):
+        self._changes.setdefault(_hive_path_string(key_path), dict()).update(values)
+
+    def _pending_changes(self) -> Dict[str, Dict[str, str]]:
+        hive = RegistryFile(self._path)
+        hive.load()
+
+        existing_paths = dict((p.lower(), p) for p in hive.key_paths)
+        pending = dict()
+
+        for key_path, values in self._changes.items():
+            registry_key = hive.find_key(existing_paths.get(key_path.lower(), key_path))
+            attributes = dict((k.lower(), v) for k, v in (registry_key.attributes if registry_key else dict()).items())
+
+            changed_values = dict(
+                (name, value)
+                for name, value in values.items()
+                if _is_change(attributes, name, value)
+            )
+            if changed_values:
+                pending[key_path.lower()] = changed_values
+
+        return pending
+
+    def commit(self) -> bool:
+        """
+        :return: Whether the hive was modified
+        """
+        pending = self._pending_changes()
+        if not pending:
+            LOG.info(f"Registry hive {self._path} already contains all values")
+            return False
+
+        now = time.time()
+        filetime = f"{int((now + FILETIME_EPOCH_OFFSET) * 10_000_000):x}"
+        timestamp = str(int(now))
+
+        key_paths = dict((key_path.lower(), key_path) for key_path in self._changes)
+        permissions = os.stat(self._path).st_mode & 0o7777
+
+        def write_values(fp, values: Dict[str, str]):
+            for name, value in values.items():
+                if value != DELETE_VALUE:
+                    fp.write(f"{name}={value}\n")
+
+        with self._path.open("r", encoding=HIVE_ENCODING, newline="") as source, \
+                atomic_writer(self._path, "w", encoding=HIVE_ENCODING, newline="", permissions=permissions) as target:
+            values: Optional[Dict[str, str]] = None
+            names = set()
+
+            for line in source:
+                stripped = line.strip()
+
+                if stripped.startswith("["):
+                    if values is not None:
+                        write_values(target, values)
+
+                    key_path = stripped[1:].rpartition("]")[0]
+                    values = pending.pop(key_path.lower(), None)
+                    names = set(name.lower() for name in (values or dict()))
+
+                elif values is not None and stripped:
+                    match = IMPORT_VALUE_PTN.match(stripped)
+
+                    # Drop values that are replaced, along with their continuation lines
+                    if match and match.group(1).lower() in names:
+                        while line.rstrip().endswith("\\"):
+                            line = next(source, "")
+
+                        continue
+
+                elif values is not None:
+                    # The blank line terminates the key, the new values go after the existing ones
+                    write_values(target, values)
+                    values = None
+
+                target.write(line)
+
+            if values is not None:
+                target.write("\n")
+                write_values(target, values)
+
+            for key_path, new_values in pending.items():
+                if all(v == DELETE_VALUE for v in new_values.values()):
+                    continue
+
+                target.write(f"\n[{key_paths[key_path]}] {timestamp}\n#time={filetime}\n")
+                write_values(target, new_values)
+
+        return True
+
+
+def merge_registry_import(prefix_paths: WineprefixPaths, registry_text: str) -> bool:
+    """
+    Merge the contents of a .reg file into the hives of a Wineprefix without starting Wine
+    :return: Whether any of the hives was modified
+    """
+    editors: Dict[Path, RegistryHiveEditor] = dict()
+
+    for key in parse_registry_import(registry_text):
+        hive_path, key_paths = _hive_location(prefix_paths, key)
+
+        if not hive_path.exists():
+            raise FileNotFoundError(hive_path)
+
+        editor = editors.setdefault(hive_path, RegistryHiveEditor(hive_path))
+        for key_path in key_paths:
+            editor.set_values(key_path, key.values)
+
+    modified = False
+
+    with wineserver_lock(prefix_paths.base_directory):
+        for editor in editors.values():
+            modified = editor.commit() or modified
+
+    return modified
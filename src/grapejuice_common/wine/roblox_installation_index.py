@@ -0,0 +1,139 @@
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+LOG = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RobloxExecutable:
+    path: Path
+    versions_directory: Path
+    version: str
+    mtime_ns: int
+
+    @property
+    def sort_key(self) -> Tuple[int, str, str]:
+        return self.mtime_ns, self.version, str(self.path)
+
+
+def _modification_time(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+
+    except OSError:
+        return None
+
+
+class RobloxInstallationIndex:
+    """
+    Index of the executables in the Roblox Versions directories of a prefix. Every version directory is listed once,
+    the index is rebuilt when a Versions directory or one of the version directories in it is modified, which only
+    costs a stat per directory. Executables are ordered newest first, ties are broken by the name of the version so
+    the order does not depend on the order of directory entries.
+    """
+    _versions_directories: List[Path]
+    _state: Optional[Tuple] = None
+    _executables: Dict[str, List[RobloxExecutable]]
+    _scanned_directories: List[Path]
+    _lock: threading.Lock
+
+    def __init__(self, versions_directories: List[Path]):
+        self._versions_directories = list(versions_directories)
+        self._executables = dict()
+        self._scanned_directories = []
+        self._lock = threading.Lock()
+
+    def _current_state(self) -> Tuple:
+        return tuple(map(_modification_time, self._scanned_directories))
+
+    def _scan_directory(self, versions_directory: Path, directory: Path, version: str):
+        self._scanned_directories.append(directory)
+
+        try:
+            entries = list(os.scandir(directory))
+
+        except OSError:
+            return
+
+        for entry in entries:
+            if entry.name.lower().endswith(".exe") and entry.is_file():
+                executable = RobloxExecutable(
+                    path=Path(entry.path),
+                    versions_directory=versions_directory,
+                    version=version,
+                    mtime_ns=entry.stat().st_mtime_ns
+                )
+
+                self._executables.setdefault(entry.name.lower(), []).append(executable)
+
+            elif entry.is_dir() and directory == versions_directory:
+                self._scan_directory(versions_directory, Path(entry.path), entry.name)
+
+    def _rebuild(self):
+        self._executables = dict()
+        self._scanned_directories = []
+
+        for versions_directory in self._versions_directories:
+            self._scan_directory(versions_directory, versions_directory, "")
+
+        for executables in self._executables.values():
+            executables.sort(key=lambda e: e.sort_key, reverse=True)
+
+        LOG.debug(f"Indexed {sum(map(len, self._executables.values()))} Roblox executables")
+
+    def _ensure_current(self):
+        if self._state is not None and self._state == self._current_state():
+            return
+
+        self._rebuild()
+        self._state = self._current_state()
+
+    def invalidate(self):
+        with self._lock:
+            self._state = None
+
+    def executables(self, executable_name: str) -> List[RobloxExecutable]:
+        """
+        :return: All copies of the executable, newest first
+        """
+        with self._lock:
+            self._ensure_current()
+
+            return list(self._executables.get(executable_name.lower(), []))
+
+    def newest(self, executable_name: str) -> Optional[RobloxExecutable]:
+        executables = self.executables(executable_name)
+
+        return executables[0] if executables else None
+
+    def newest_per_versions_directory(self, executable_name: str) -> List[RobloxExecutable]:
+        newest: Dict[Path, RobloxExecutable] = dict()
+
+        for executable in self.executables(executable_name):
+            newest.setdefault(executable.versions_directory, executable)
+
+        return list(newest.values())
+
+
+_indices: Dict[Tuple[Path, ...], RobloxInstallationIndex] = dict()
+_indices_lock = threading.Lock()
+
+
+def installation_index(versions_directories: List[Path]) -> RobloxInstallationIndex:
+    """
+    :return: The shared index for these Versions directories, so the index outlives the Wineprefix objects
+    """
+    key = tuple(versions_directories)
+
+    with _indices_lock:
+        index = _indices.get(key, None)
+
+        if index is None:
+            index = RobloxInstallationIndex(versions_directories)
+            _indices[key] = index
+
+        return index
@@ -9,24 +9,19 @@ from grapejuice_common.hardware_info.hardware_profile import HardwareProfile
 from grapejuice_common.models.wineprefix_configuration_model import WineprefixConfigurationModel
 from grapejuice_common.roblox_renderer import RobloxRenderer
 from grapejuice_common.wine.wineprefix import Wineprefix
+from grapejuice_common.wine.wineprefix_registry import wineprefix_registry
 from grapejuice_common.wine.wineprefix_hints import WineprefixHint
 
 LOG = logging.getLogger(__name__)
 
 
 def get_wineprefix(hints: List[WineprefixHint], when_not_found_prefix_factory: Optional[callable] = None):
-    from grapejuice_common.features.settings import current_settings, k_wineprefixes
-
-    for prefix_configuration in current_settings.get(k_wineprefixes):
-        has_all_hints = True
+    from grapejuice_common.features.settings import current_settings
 
-        for hint in hints:
-            has_all_hints = has_all_hints and hint.value in prefix_configuration.get("hints", [])
+    configuration = current_settings.find_wineprefix_by_hints([hint.value for hint in hints])
 
-        if has_all_hints:
-            return Wineprefix(
-                configuration=WineprefixConfigurationModel.from_dict(prefix_configuration)
-            )
+    if configuration is not None:
+        return wineprefix_registry.get(configuration)
 
     if callable(when_not_found_prefix_factory):
         when_not_found_prefix_factory()
@@ -62,7 +57,7 @@ def _get_wineprefix_with_other_hints(
 
 def find_wineprefix(prefix_id: str) -> Wineprefix:
     from grapejuice_common.features.settings import current_settings
-    return Wineprefix(configuration=current_settings.find_wineprefix(prefix_id))
+    return wineprefix_registry.get(current_settings.find_wineprefix(prefix_id))
 
 
 def _dll_overrides(settings) -> str:
@@ -0,0 +1,101 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+LOG = logging.getLogger(__name__)
+
+PROC = Path("/proc")
+SCAN_TTL = 1.0
+
+WINDOWS_EXECUTABLE_SUFFIX = b".exe"
+
+
+@dataclass(frozen=True)
+class WineProcess:
+    pid: int
+    threads: int
+    image: str
+
+
+_scans: Dict[str, Tuple[float, List[WineProcess]]] = dict()
+_scans_lock = threading.Lock()
+
+
+def _read(path: Path) -> Optional[bytes]:
+    try:
+        with path.open("rb") as fp:
+            return fp.read()
+
+    except OSError:
+        # The process exited or belongs to somebody else
+        return None
+
+
+def _image_name(cmdline: bytes) -> Optional[str]:
+    """
+    Wine rewrites argv[0] of a process to the Windows path of its executable
+    """
+    argv0 = cmdline.split(b"\0", 1)[0]
+    image = argv0.replace(b"\\", b"/").rsplit(b"/", 1)[-1]
+
+    if not image.lower().endswith(WINDOWS_EXECUTABLE_SUFFIX):
+        return None
+
+    return image.decode("UTF-8", errors="replace")
+
+
+def _thread_count(status: Optional[bytes]) -> int:
+    for line in (status or b"").split(b"\n"):
+        if line.startswith(b"Threads:"):
+            return int(line.split(b":", 1)[1])
+
+    return 0
+
+
+def _scan(prefix_environ_entry: bytes) -> List[WineProcess]:
+    processes = []
+
+    for pid in filter(str.isdigit, os.listdir(PROC)):
+        pid_directory = PROC / pid
+
+        cmdline = _read(pid_directory / "cmdline")
+        image = _image_name(cmdline) if cmdline else None
+        if image is None:
+            continue
+
+        environ = _read(pid_directory / "environ")
+        if environ is None or prefix_environ_entry not in environ.split(b"\0"):
+            continue
+
+        processes.append(WineProcess(int(pid), _thread_count(_read(pid_directory / "status")), image))
+
+    return processes
+
+
+def wine_processes(prefix_directory: Path, max_age: float = SCAN_TTL) -> List[WineProcess]:
+    """
+    List the Windows processes running in a Wineprefix by scanning /proc
+    :param prefix_directory: Base directory of the Wineprefix
+    :param max_age: Seconds a previous scan for the same prefix may be reused
+    :return: The processes whose WINEPREFIX environment variable points at the prefix
+    """
+    key = str(prefix_directory)
+    now = time.monotonic()
+
+    with _scans_lock:
+        cached = _scans.get(key, None)
+        if cached is not None and now - cached[0] <= max_age:
+            return list(cached[1])
+
+    t0 = time.perf_counter()
+    processes = _scan(f"WINEPREFIX={key}".encode("UTF-8"))
+    LOG.debug(f"Found {len(processes)} Wine processes in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    with _scans_lock:
+        _scans[key] = (now, processes)
+
+    return list(processes)
@@ -2,17 +2,15 @@ import atexit
 import json
 import logging
 import os
-import re
-import shutil
-import signal
 import subprocess
 import sys
+import threading
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
 from string import Template
-from typing import Union, List, Dict, Optional
+from typing import Union, List, Dict, Optional, Tuple
 
 from grapejuice_common import paths
 from grapejuice_common.errors import HardwareProfilingError, WineHomeNotAbsolute, WineHomeInvalid, \
@@ -20,83 +18,15 @@ from grapejuice_common.errors import HardwareProfilingError, WineHomeNotAbsolute
 from grapejuice_common.hardware_info.graphics_card import GPUVendor
 from grapejuice_common.logs.log_util import log_function
 from grapejuice_common.models.wineprefix_configuration_model import WineprefixConfigurationModel
+from grapejuice_common.util.process_supervisor import ProcessWrapper, process_supervisor
 from grapejuice_common.util.string_util import non_empty_string
+from grapejuice_common.wine.wine_process_scanner import WineProcess, wine_processes
 from grapejuice_common.wine.wineprefix_paths import WineprefixPaths
 
 log = logging.getLogger(__name__)
 
-
-class ProcessWrapper:
-    on_exit: callable = None
-
-    def __init__(self, proc: subprocess.Popen, on_exit: callable = None):
-        self.proc = proc
-        self.on_exit = on_exit
-
-    @property
-    def exited(self):
-        proc = self.proc
-
-        if proc.returncode is None:
-            proc.poll()
-
-        return proc.returncode is not None
-
-    def kill(self):
-        if not self.exited:
-            os.kill(self.proc.pid, signal.SIGINT)
-
-    def __del__(self):
-        del self.proc
-
-
 open_fds = []
 
-processes: List[ProcessWrapper] = []
-is_polling = False
-
-
-@log_function
-def _poll_processes() -> bool:
-    """
-    Makes sure zombie launchers are taken care of
-    :return: Whether or not processes remain
-    """
-    global is_polling
-    exited = []
-
-    for proc in processes:
-        if proc.exited:
-            exited.append(proc)
-
-            if proc.proc.returncode != 0:
-                log.error(f"Process returned with non-zero exit code {proc.proc.returncode}")
-
-    for proc in exited:
-        processes.remove(proc)
-
-        if callable(proc.on_exit):
-            proc.on_exit()
-
-        del proc
-
-    processes_left = len(processes) > 0
-    if not processes_left:
-        is_polling = False
-        log.info("No processes left to poll, exiting thread")
-
-    return processes_left
-
-
-def poll_processes():
-    if is_polling:
-        return
-
-    log.info("Starting polling thread")
-
-    from gi.repository import GObject
-    GObject.timeout_add(100, _poll_processes)
-
 
 def close_fds(*_, **__):
     log.info("Closing fds")
@@ -116,7 +46,9 @@ def run_exe_no_daemon(
     exe_name: str,
     run_async: bool,
     working_directory: Optional[Path] = None,
-    post_run_function: callable = None
+    post_run_function: callable = None,
+    *,
+    env: Optional[Dict[str, str]] = None
 ) -> Union[ProcessWrapper, None]:
     log.info("Running in no_daemon_mode")
 
@@ -137,21 +69,17 @@ def run_exe_no_daemon(
     if run_async:
         log.info("Running process asynchronously")
 
-        wrapper = ProcessWrapper(
+        return process_supervisor.supervise(
             subprocess.Popen(
                 command,
                 stdout=stdout_fd,
                 stderr=stderr_fd,
-                cwd=working_directory
+                cwd=working_directory,
+                env=env
             ),
             on_exit=post_run_function
         )
 
-        processes.append(wrapper)
-        poll_processes()
-
-        return wrapper
-
     else:
         log.info("Running process synchronously")
 
@@ -159,7 +87,8 @@ def run_exe_no_daemon(
             command,
             stdout=stdout_fd,
             stderr=stderr_fd,
-            cwd=working_directory
+            cwd=working_directory,
+            env=env
         )
 
         if callable(post_run_function):
@@ -172,27 +101,21 @@ def run_exe_no_daemon(
 def run_exe_in_daemon(
     command: List[str],
     post_run_function: callable = None,
-    working_directory: Optional[Path] = None
+    working_directory: Optional[Path] = None,
+    env: Optional[Dict[str, str]] = None
 ) -> ProcessWrapper:
     log.info("Running process for daemon mode")
 
-    p = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=sys.stdout, stderr=sys.stderr, cwd=working_directory)
-    wrapper = ProcessWrapper(p, on_exit=post_run_function)
+    p = subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=sys.stdout,
+        stderr=sys.stderr,
+        cwd=working_directory,
+        env=env
+    )
 
-    processes.append(wrapper)
-    poll_processes()
-
-    return wrapper
-
-
-WINE_PROCESS_PTN = re.compile(r"^\s*([a-f0-9]+)\s+(\d+).*\'([\w.]+)\'")
-
-
-@dataclass(frozen=True)
-class WineProcess:
-    pid: str
-    threads: int
-    image: str
+    return process_supervisor.supervise(p, on_exit=post_run_function)
 
 
 DLL_OVERRIDE_SEP = ";"
@@ -213,6 +136,59 @@ def _legacy_hardware_variables(configuration: WineprefixConfigurationModel):
     return d
 
 
+@dataclass(frozen=True)
+class LaunchEnvironment:
+    """
+    The environment a Wineprefix is launched with, computed once per configuration and hardware profile.
+    Instances are passed to subprocess calls explicitly, os.environ is never modified.
+    """
+    key: str
+    wine_home: Path
+    variables: Dict[str, str]
+    user_keys: Tuple[str, ...]
+
+    @property
+    def wine_bin(self) -> Path:
+        return self.wine_home / "bin"
+
+    def as_environ(self) -> Dict[str, str]:
+        env = dict(os.environ)
+        env.update(self.variables)
+
+        # Variables in os.environ take priority
+        for k in self.user_keys:
+            if k in os.environ:
+                env[k] = os.environ[k]
+
+        # Make Wine defined in wine_home available in $PATH
+        path_components = (env.get("PATH", None) or "").split(os.path.pathsep)
+        wine_bin_string = str(self.wine_bin)
+
+        if wine_bin_string not in path_components:
+            env["PATH"] = os.path.pathsep.join([wine_bin_string, *filter(None, path_components)])
+
+        return env
+
+
+_launch_environments: Dict[Tuple[str, bool], LaunchEnvironment] = dict()
+_launch_environments_lock = threading.Lock()
+
+
+def _hardware_profile_key() -> str:
+    from grapejuice_common.features import settings
+    from grapejuice_common.features.settings import current_settings
+    from grapejuice_common.hardware_info.hardware_profile import HardwareProfile
+
+    saved_profile = current_settings.get(settings.k_hardware_profile, None) or dict()
+
+    return json.dumps([
+        HardwareProfile.version,
+        saved_profile.get("version", None),
+        saved_profile.get("graphics_id", None),
+        saved_profile.get("gpu_vendor_id", None)
+    ])
+
+
 class WineprefixCoreControl:
     _prefix_paths: WineprefixPaths
     _configuration: WineprefixConfigurationModel
@@ -221,6 +197,10 @@ class WineprefixCoreControl:
         self._prefix_paths = prefix_paths
         self._configuration = configuration
 
+    @property
+    def prefix_paths(self) -> WineprefixPaths:
+        return self._prefix_paths
+
     @property
     def wine_home(self) -> Path:
         from grapejuice_common import variables
@@ -256,8 +236,8 @@ class WineprefixCoreControl:
         return wine_home
 
     @property
-    def wine_bin(self):
-        return self.wine_home / "bin"
+    def wine_bin(self) -> Path:
+        return self.launch_environment().wine_bin
 
     def wine_binary(self, arch="") -> Path:
         log.info(f"Resolving wine binary for prefix {self._prefix_paths.base_directory}")
@@ -284,6 +264,9 @@ class WineprefixCoreControl:
     def _dri_prime_variables(self) -> Dict[str, str]:
         from grapejuice_common.features.settings import current_settings
 
+        if self._configuration.prime_offload_sink < 0:
+            return dict()
+
         try:
             profile = current_settings.hardware_profile
 
@@ -293,31 +276,37 @@ class WineprefixCoreControl:
 
             return dict()
 
-        prime_env = dict()
-
-        if self._configuration.prime_offload_sink >= 0:
-            sink = str(self._configuration.prime_offload_sink)
+        sink = str(self._configuration.prime_offload_sink)
 
-            prime_env = {"DRI_PRIME": sink}
+        prime_env = {"DRI_PRIME": sink}
 
-            if profile.gpu_vendor is GPUVendor.NVIDIA:
-                prime_env = {
-                    **prime_env,
-                    "__NV_PRIME_RENDER_OFFLOAD": sink,
-                    "__VK_LAYER_NV_optimus": "NVIDIA_only",
-                    "__GLX_VENDOR_LIBRARY_NAME": "nvidia"
-                }
+        if profile.gpu_vendor is GPUVendor.NVIDIA:
+            prime_env = {
+                **prime_env,
+                "__NV_PRIME_RENDER_OFFLOAD": sink,
+                "__VK_LAYER_NV_optimus": "NVIDIA_only",
+                "__GLX_VENDOR_LIBRARY_NAME": "nvidia"
+            }
 
         log.info(f"PRIME environment variables: {json.dumps(prime_env)}")
 
         return prime_env
 
-    def prepare_for_launch(self, accelerate_graphics: bool = False):
+    def _launch_environment_key(self, accelerate_graphics: bool) -> str:
+        configuration_string = json.dumps(asdict(self._configuration), sort_keys=True)
+
+        # The hardware profile only matters when PRIME variables are going to be applied
+        if accelerate_graphics and self._configuration.prime_offload_sink >= 0:
+            return configuration_string + _hardware_profile_key()
+
+        return configuration_string
+
+    def _compute_launch_environment(self, key: str, accelerate_graphics: bool) -> LaunchEnvironment:
         user_env = self._configuration.env
         dll_overrides = list(filter(non_empty_string, self._configuration.dll_overrides.split(DLL_OVERRIDE_SEP)))
         dll_overrides.extend(default_dll_overrides())
 
-        apply_env = {
+        variables = {
             "WINEDLLOVERRIDES": DLL_OVERRIDE_SEP.join(dll_overrides),
             **user_env,
             "WINEPREFIX": str(self._prefix_paths.base_directory),
@@ -326,13 +315,9 @@ class WineprefixCoreControl:
             **_legacy_hardware_variables(self._configuration)
         }
 
-        # Variables in os.environ take priority
-        for k, v in user_env.items():
-            apply_env[k] = os.environ.get(k, v)
-
         # Wine generates giant logs for some people
         # Setting WINEDEBUG to -all *should* fix it
-        if "WINEDEBUG" not in apply_env:
+        if "WINEDEBUG" not in variables:
             winedebug_string = "-all"
 
             if self._configuration.enable_winedebug:
@@ -342,41 +327,62 @@ class WineprefixCoreControl:
                 if configuration_winedebug_string:
                     winedebug_string = configuration_winedebug_string
 
-            apply_env["WINEDEBUG"] = winedebug_string
+            variables["WINEDEBUG"] = winedebug_string
 
-        # Make Wine defined in wine_home available in $PATH
-        path_string = apply_env.get("PATH", None) or os.environ.get("PATH", None) or ""
-        path_components = path_string.split(os.path.pathsep)
-        wine_bin_string = str(self.wine_bin)
+        log.info("Computed launch environment: " + json.dumps(variables))
 
-        if wine_bin_string not in path_components:
-            path_components.insert(0, wine_bin_string)
-            apply_env["PATH"] = os.path.pathsep.join(path_components)
+        return LaunchEnvironment(
+            key=key,
+            wine_home=self.wine_home,
+            variables=variables,
+            user_keys=tuple(user_env.keys())
+        )
+
+    def launch_environment(self, accelerate_graphics: bool = False) -> LaunchEnvironment:
+        cache_key = (self._configuration.id, accelerate_graphics)
+        key = self._launch_environment_key(accelerate_graphics)
+
+        with _launch_environments_lock:
+            environment = _launch_environments.get(cache_key, None)
+
+            if environment is None or environment.key != key:
+                environment = self._compute_launch_environment(key, accelerate_graphics)
+                _launch_environments[cache_key] = environment
 
-        log.info("Applying environment: " + json.dumps(apply_env))
+        return environment
 
-        # Apply env
-        for k, v in apply_env.items():
-            os.environ[k] = v
+    def prepare_for_launch(self, accelerate_graphics: bool = False) -> LaunchEnvironment:
+        environment = self.launch_environment(accelerate_graphics=accelerate_graphics)
 
         if not os.path.exists(self._prefix_paths.base_directory):
             self._prefix_paths.base_directory.mkdir(parents=True)
 
-    def load_registry_file(
-        self,
-        registry_file: Path,
-        prepare_wine: bool = True
-    ):
-        log.info(f"Loading registry file {registry_file} into the wineprefix")
+        return environment
 
-        if prepare_wine:
-            self.prepare_for_launch()
+    def _merge_registry_text(self, registry_text: str) -> bool:
+        """
+        Merges registry values straight into the hives, which is much faster than starting regedit twice
+        :return: Whether the values were merged, when False regedit should be used instead
+        """
+        from grapejuice_common.wine.registry_writer import merge_registry_import, UnsupportedRegistryImport, \
+            WineserverIsRunning
 
+        try:
+            merge_registry_import(self._prefix_paths, registry_text)
+            return True
+
+        except (UnsupportedRegistryImport, WineserverIsRunning, FileNotFoundError) as e:
+            log.info(f"Falling back to regedit: {e}")
+
+        return False
+
+    def _import_with_regedit(self, registry_text: str):
         target_filename = str(int(time.time())) + ".reg"
         target_path = self._prefix_paths.temp_directory / target_filename
         target_path.parent.mkdir(parents=True, exist_ok=True)
 
-        shutil.copyfile(registry_file, target_path)
+        with target_path.open("w+") as fp:
+            fp.write(registry_text)
 
         winreg = f"C:\\windows\\temp\\{target_filename}"
         self.run_exe("regedit", "/S", winreg, run_async=False, use_wine64=False)
@@ -384,6 +390,24 @@ class WineprefixCoreControl:
 
         os.remove(target_path)
 
+    def load_registry_file(
+        self,
+        registry_file: Path,
+        prepare_wine: bool = True
+    ):
+        log.info(f"Loading registry file {registry_file} into the wineprefix")
+
+        from grapejuice_common.wine.registry_writer import decode_registry_import
+
+        if prepare_wine:
+            self.prepare_for_launch()
+
+        with registry_file.open("rb") as fp:
+            registry_text = decode_registry_import(fp.read())
+
+        if not self._merge_registry_text(registry_text):
+            self._import_with_regedit(registry_text)
+
     def load_patched_registry_files(
         self,
         registry_file: Path,
@@ -391,20 +415,13 @@ class WineprefixCoreControl:
     ):
         self.prepare_for_launch()
 
-        target_filename = str(int(time.time())) + ".reg"
-        target_path = self._prefix_paths.temp_directory / target_filename
-
         with registry_file.open("r") as fp:
             template = Template(fp.read())
 
-        with target_path.open("w+") as fp:
-            fp.write(template.safe_substitute(patches))
+        registry_text = template.safe_substitute(patches)
 
-        winreg = f"C:\\windows\\temp\\{target_filename}"
-        self.run_exe("regedit", "/S", winreg, run_async=False, use_wine64=False)
-        self.run_exe("regedit", "/S", winreg, run_async=False, use_wine64=True)
-
-        os.remove(target_path)
+        if not self._merge_registry_text(registry_text):
+            self._import_with_regedit(registry_text)
 
     def disable_mime_associations(self):
         self.load_registry_file(paths.assets_directory() / "disable_mime_assoc.reg")
@@ -439,9 +456,13 @@ class WineprefixCoreControl:
         from grapejuice_common.features.settings import current_settings
         from grapejuice_common.features import settings
 
-        self.prepare_for_launch(accelerate_graphics=accelerate_graphics)
+        environment = self.prepare_for_launch(accelerate_graphics=accelerate_graphics)
         log.info("Prepared environment for wine")
 
+        if current_settings.get(settings.k_persistent_wineservers):
+            from grapejuice_common.wine.wineserver_manager import wineserver_manager
+            wineserver_manager.warm(self, environment)
+
         if isinstance(exe_path, Path):
             exe_path_string = str(exe_path.resolve())
             exe_name = exe_path.name
@@ -467,14 +488,16 @@ class WineprefixCoreControl:
                 exe_name,
                 run_async,
                 post_run_function=post_run_function,
-                working_directory=working_directory
+                working_directory=working_directory,
+                env=environment.as_environ()
             )
 
         else:
             return run_exe_in_daemon(
                 command,
                 post_run_function=post_run_function,
-                working_directory=working_directory
+                working_directory=working_directory,
+                env=environment.as_environ()
             )
 
     def run_linux_command(
@@ -483,7 +506,7 @@ class WineprefixCoreControl:
         arguments: Optional[List[str]] = None,
         working_directory: Optional[Path] = None
     ):
-        self.prepare_for_launch()
+        environment = self.prepare_for_launch()
 
         command_name = Path(command).name
         command = [command]
@@ -495,40 +518,18 @@ class WineprefixCoreControl:
             command,
             command_name,
             run_async=False,
-            working_directory=working_directory
+            working_directory=working_directory,
+            env=environment.as_environ()
         )
 
     def kill_wine_server(self):
-        self.prepare_for_launch()
+        environment = self.prepare_for_launch()
 
-        subprocess.check_call([str(self.wine_server()), "-k"])
+        subprocess.check_call([str(self.wine_server()), "-k"], env=environment.as_environ())
 
     @property
     def process_list(self) -> List[WineProcess]:
-        self.prepare_for_launch()
-
-        try:
-            output = subprocess.check_output([str(self.wine_dbg()), "--command", "info proc"])
-            output = output.decode("UTF-8")
-
-        except subprocess.CalledProcessError as e:
-            log.error(str(e))
-            log.info("Could not get the process list through winedbg --command 'info proc'. Assume nothing is running")
-
-            return []
-
-        the_list = []
-        for line in output.split("\n"):
-            match = WINE_PROCESS_PTN.search(line.strip())
-
-            if match:
-                the_list.append(WineProcess(
-                    match.group(1),
-                    int(match.group(2)),
-                    match.group(3)
-                ))
-
-        return the_list
+        return wine_processes(self._prefix_paths.base_directory)
 
 
 atexit.register(close_fds)
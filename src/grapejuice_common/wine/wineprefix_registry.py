@@ -0,0 +1,61 @@
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from grapejuice_common.models.wineprefix_configuration_model import WineprefixConfigurationModel
+from grapejuice_common.wine.wineprefix import Wineprefix
+
+RevisionLookup = Callable[[str], Optional[int]]
+
+
+def _settings_revision(prefix_id: str) -> Optional[int]:
+    from grapejuice_common.features.settings import current_settings
+
+    return current_settings.wineprefix_revision(prefix_id)
+
+
+class WineprefixRegistry:
+    """
+    Hands out one Wineprefix per configuration id, so state cached by a prefix and the objects it owns is reused
+    between lookups. A new Wineprefix is created when the configuration model was replaced, or when it was saved
+    again, which the Wineprefix index tracks with a revision number.
+    """
+    _prefixes: Dict[str, Tuple[Optional[int], Wineprefix]]
+    _revision_of: RevisionLookup
+    _lock: threading.Lock
+
+    def __init__(self, revision_of: Optional[RevisionLookup] = None):
+        self._prefixes = dict()
+        self._revision_of = revision_of or _settings_revision
+        self._lock = threading.Lock()
+
+    def get(self, configuration: WineprefixConfigurationModel) -> Wineprefix:
+        if configuration is None:
+            # Let Wineprefix raise the appropriate error
+            return Wineprefix(configuration)
+
+        revision = self._revision_of(configuration.id)
+
+        with self._lock:
+            cached = self._prefixes.get(configuration.id, None)
+
+            if cached is not None:
+                cached_revision, prefix = cached
+
+                if cached_revision == revision and prefix.configuration is configuration:
+                    return prefix
+
+            prefix = Wineprefix(configuration)
+            self._prefixes[configuration.id] = revision, prefix
+
+            return prefix
+
+    def forget(self, prefix_id: str):
+        with self._lock:
+            self._prefixes.pop(prefix_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._prefixes.clear()
+
+
+wineprefix_registry = WineprefixRegistry()
@@ -1,18 +1,23 @@
 import json
 import logging
 import os
-import shutil
-import time
+import signal
 from pathlib import Path
-from typing import Generator, List, Iterable
+from typing import Generator, List, Iterable, Optional
 
-from grapejuice_common import paths, variables
-from grapejuice_common.errors import RobloxExecutableNotFound
+from grapejuice_common import variables
+from grapejuice_common.errors import RobloxExecutableNotFound, FastFlagExtractionFailed
+from grapejuice_common.fast_flag_snapshots import FastFlagSnapshots, FastFlagSnapshot
+from grapejuice_common.models.fast_flag_types import coerce_flags
 from grapejuice_common.models.wineprefix_configuration_model import WineprefixConfigurationModel, ThirdPartyKeys
 from grapejuice_common.roblox_product import RobloxProduct
 from grapejuice_common.roblox_renderer import RobloxRenderer
-from grapejuice_common.util import download_file
-from grapejuice_common.wine.registry_file import RegistryFile
+from grapejuice_common.util.artifact_store import artifact_store
+from grapejuice_common.util.file_watcher import wait_for_file
+from grapejuice_common.wine.app_settings_writer import write_app_settings, AppSettingsWriteResult
+from grapejuice_common.wine.registry_file_cache import CachedRegistryFile
+from grapejuice_common.wine.roblox_installation_index import RobloxInstallationIndex, installation_index
+from grapejuice_common.wine.wine_process_scanner import wine_processes
 from grapejuice_common.wine.wineprefix_core_control import WineprefixCoreControl, ProcessWrapper
 from grapejuice_common.wine.wineprefix_paths import WineprefixPaths
 
@@ -20,6 +25,9 @@ LOG = logging.getLogger(__name__)
 
 ROBLOX_DOWNLOAD_URL = "https://www.roblox.com/download/client"
 
+FAST_FLAG_EXTRACTION_TIMEOUT = 120
+STUDIO_EXIT_TIMEOUT = 5
+
 
 def _app_settings_path(executable_path: Path) -> Path:
     client_app_settings = executable_path.parent / "ClientSettings" / "ClientAppSettings.json"
@@ -45,13 +53,8 @@ class WineprefixRoblox:
     def download_installer(self):
         path = self._prefix_paths.installer_download_location
 
-        if path.exists():
-            LOG.debug(f"Removing old installer at {path}")
-            os.remove(path)
-
-        download_file(ROBLOX_DOWNLOAD_URL, path)
-
-        return path
+        # The download URL always points to the latest installer, so check whether the stored copy is still current
+        return artifact_store().link(ROBLOX_DOWNLOAD_URL, path, revalidate=True)
 
     def install_roblox(self, post_install_function: callable = None):
         self._core_control.create_prefix()
@@ -62,40 +65,30 @@ class WineprefixRoblox:
         )
 
     def is_logged_into_studio(self) -> bool:
-        with RegistryFile(self._prefix_paths.user_reg) as registry_file:
+        with CachedRegistryFile(self._prefix_paths.user_reg) as registry_file:
             registry_file.load()
 
-            roblox_com = registry_file.find_key(r"Software\\Roblox\\RobloxStudioBrowser\\roblox.com")
-            return (roblox_com is not None) and (roblox_com.get_attribute(".ROBLOSECURITY") is not None)
-
-    def locate_all_roblox_executables_in_versions(self, executable_name: str) -> Generator[Path, None, None]:
-        search_locations = [
-            self._prefix_paths.roblox_appdata,
-            self._prefix_paths.roblox_program_files
-        ]
-
-        for location in search_locations:
-            versions_directory = location / "Versions"
-
-            if location.exists() and versions_directory.exists() and versions_directory.is_dir():
-                executable_path = versions_directory / executable_name
-
-                if executable_path.exists() and executable_path.is_file():
-                    yield executable_path
+            return registry_file.has_attribute(
+                r"Software\\Roblox\\RobloxStudioBrowser\\roblox.com",
+                ".ROBLOSECURITY"
+            )
 
-                for version in filter(Path.is_dir, versions_directory.glob("*")):
-                    executable_path = version / executable_name
+    @property
+    def installation_index(self) -> RobloxInstallationIndex:
+        return installation_index([
+            self._prefix_paths.roblox_appdata / "Versions",
+            self._prefix_paths.roblox_program_files / "Versions"
+        ])
 
-                    if executable_path.exists() and executable_path.is_file():
-                        yield executable_path
+    def locate_all_roblox_executables_in_versions(self, executable_name: str) -> Generator[Path, None, None]:
+        for executable in self.installation_index.executables(executable_name):
+            yield executable.path
 
     def locate_all_roblox_executables(self, executable_name: str) -> Generator[Path, None, None]:
-        for executable in self.locate_all_roblox_executables_in_versions(executable_name):
-            yield executable
-
-        executable_path = self._prefix_paths.roblox_program_files / "Versions" / executable_name
-        if executable_path.exists():
-            yield executable_path
+        """
+        :return: Every copy of the executable, the newest version comes first
+        """
+        return self.locate_all_roblox_executables_in_versions(executable_name)
 
     def locate_roblox_executable(self, executable_name: str) -> Path:
         executable = next(self.locate_all_roblox_executables(executable_name), None)
@@ -114,6 +107,39 @@ class WineprefixRoblox:
     def roblox_studio_executable_path(self) -> Path:
         return self.locate_roblox_executable("RobloxStudioBeta.exe")
 
+    @property
+    def roblox_studio_version(self) -> str:
+        """
+        :return: The name of the version directory Roblox Studio is installed in
+        """
+        executable_path = self.roblox_studio_executable_path
+
+        if executable_path.parent.name.lower() != "versions":
+            return executable_path.parent.name
+
+        # Studio is installed directly in the Versions directory, the executable itself identifies the build
+        stat = executable_path.stat()
+
+        return f"{executable_path.stem}-{stat.st_size}-{stat.st_mtime_ns}"
+
+    @property
+    def fast_flags_are_extracted(self) -> bool:
+        try:
+            return FastFlagSnapshots().has(self.roblox_studio_version)
+
+        except RobloxExecutableNotFound:
+            return False
+
+    def fast_flag_snapshot(self) -> Optional[FastFlagSnapshot]:
+        """
+        :return: The Fast Flags extracted from the installed version of Roblox Studio
+        """
+        try:
+            return FastFlagSnapshots().load(self.roblox_studio_version)
+
+        except RobloxExecutableNotFound:
+            return None
+
     @property
     def roblox_player_launcher_path(self) -> Path:
         return self.locate_roblox_executable("RobloxPlayerLauncher.exe")
@@ -147,6 +173,25 @@ class WineprefixRoblox:
     def all_player_app_settings_paths(self) -> List[Path]:
         return list(map(_app_settings_path, self.locate_all_roblox_executables("RobloxPlayerLauncher.exe")))
 
+    def _active_app_settings_paths(self, executable_name: str) -> List[Path]:
+        newest = self.installation_index.newest_per_versions_directory(executable_name)
+
+        return [_app_settings_path(executable.path) for executable in newest]
+
+    @property
+    def active_studio_app_settings_paths(self) -> List[Path]:
+        """
+        :return: The app settings paths of the newest Studio version in every Versions directory
+        """
+        return self._active_app_settings_paths("RobloxStudioBeta.exe")
+
+    @property
+    def active_player_app_settings_paths(self) -> List[Path]:
+        """
+        :return: The app settings paths of the newest player version in every Versions directory
+        """
+        return self._active_app_settings_paths("RobloxPlayerLauncher.exe")
+
     @property
     def is_installed(self) -> bool:
         try:
@@ -166,8 +211,12 @@ class WineprefixRoblox:
 
         return False
 
-    def _write_flags(self, product: RobloxProduct, settings_paths: Iterable[Path]):
-        flags = self._configuration.fast_flags.get(product.value, None) or dict()
+    def _write_flags(self, product: RobloxProduct, settings_paths: Iterable[Path]) -> AppSettingsWriteResult:
+        saved_flags = self._configuration.fast_flags.get(product.value, None) or dict()
+
+        # The editor saves values with their types, only values that were saved as strings need their type inferred
+        untyped_flags = {name: value for name, value in saved_flags.items() if isinstance(value, str)}
+        flags = {**saved_flags, **coerce_flags(untyped_flags)}
 
         # Apply rendering flag
         renderer = RobloxRenderer(self._configuration.roblox_renderer)
@@ -176,21 +225,17 @@ class WineprefixRoblox:
 
         # Don't do anything when we don't have any flags
         if len(flags) <= 0:
-            return
-
-        json_dump = json.dumps(flags, indent=2)
+            return AppSettingsWriteResult()
 
-        for p in settings_paths:
-            LOG.info(f"Writing flags for {product} to: {p}")
-            p.parent.mkdir(parents=True, exist_ok=True)
+        result = write_app_settings(flags, settings_paths)
+        LOG.info(f"Flags for {product}: {result}")
 
-            with p.open("w+", encoding=variables.text_encoding()) as fp:
-                fp.write(json_dump)
+        return result
 
     def run_roblox_studio(self, uri: str = None, ide: bool = False):
         launcher_path = self.roblox_studio_launcher_path
 
-        self._write_flags(RobloxProduct.studio, self.all_studio_app_settings_paths)
+        self._write_flags(RobloxProduct.studio, self.active_studio_app_settings_paths)
 
         run_args = [launcher_path]
         run_args.extend(list(
@@ -219,7 +264,7 @@ class WineprefixRoblox:
         player_launcher_path = self.roblox_player_launcher_path
 
         product = RobloxProduct.app if uri == variables.roblox_app_experience_url() else RobloxProduct.player
-        self._write_flags(product, self.all_player_app_settings_paths)
+        self._write_flags(product, self.active_player_app_settings_paths)
 
         self._run_fps_unlocker()
         self._core_control.run_exe(player_launcher_path, uri, accelerate_graphics=True)
@@ -228,7 +273,7 @@ class WineprefixRoblox:
         player_executable_path = self.locate_roblox_executable("RobloxPlayerBeta.exe")
 
         product = RobloxProduct.app
-        self._write_flags(product, self.all_player_app_settings_paths)
+        self._write_flags(product, self.active_player_app_settings_paths)
 
         self._run_fps_unlocker()
         self._core_control.run_exe(player_executable_path, "--app", accelerate_graphics=True)
@@ -244,29 +289,74 @@ class WineprefixRoblox:
 
         return self._core_control.run_exe(*run_args, run_async=run_async)
 
+    def _stop_roblox_studio(self, studio_process: Optional[ProcessWrapper]):
+        studio_image = self.roblox_studio_executable_path.name.lower()
+
+        pids = set(
+            process.pid
+            for process in wine_processes(self._prefix_paths.base_directory, max_age=0)
+            if process.image.lower() == studio_image
+        )
+
+        if studio_process is not None and not studio_process.exited:
+            pids.add(studio_process.pid)
+
+        for pid in pids:
+            LOG.info(f"Stopping Roblox Studio process {pid}")
+
+            try:
+                os.kill(pid, signal.SIGTERM)
+
+            except ProcessLookupError:
+                pass
+
+        if studio_process is not None and studio_process.wait(STUDIO_EXIT_TIMEOUT):
+            return
+
+        LOG.warning("Roblox Studio did not exit, killing the wineserver")
+        self._core_control.kill_wine_server()
+
     def extract_fast_flags(self):
         fast_flag_path = self.fast_flag_dump_path
 
         if fast_flag_path.exists():
             os.remove(fast_flag_path)
 
+        studio_version = self.roblox_studio_version
         studio_process = self.run_roblox_studio_with_events(startEvent="FFlagExtract", showEvent="NoSplashScreen")
+        dump = dict()
 
-        def fast_flags_present():
-            if fast_flag_path.exists():
-                stat = os.stat(fast_flag_path)
+        def dump_is_complete(path: Path) -> bool:
+            try:
+                with path.open("r", encoding=variables.text_encoding()) as fp:
+                    flags = json.load(fp)
 
-                if stat.st_size > 0:
-                    return True
+            except (OSError, ValueError):
+                # Studio is still writing the file
+                return False
 
-            return False
+            if not isinstance(flags, dict):
+                return False
+
+            dump["flags"] = flags
+
+            return True
+
+        try:
+            extracted = wait_for_file(
+                fast_flag_path,
+                dump_is_complete,
+                timeout=FAST_FLAG_EXTRACTION_TIMEOUT,
+                is_cancelled=lambda: studio_process is not None and studio_process.exited
+            )
+
+        finally:
+            self._stop_roblox_studio(studio_process)
 
-        while not fast_flags_present():
-            time.sleep(0.1)
+        if not extracted:
+            if studio_process is not None and studio_process.exited:
+                raise FastFlagExtractionFailed(f"Studio exited with code {studio_process.exit_code}")
 
-        shutil.copy(fast_flag_path, paths.fast_flag_cache_location())
+            raise FastFlagExtractionFailed(f"no complete dump after {FAST_FLAG_EXTRACTION_TIMEOUT} seconds")
 
-        if studio_process:
-            studio_process.kill()
-            time.sleep(1)  # Give Roblox a chance
-            self._core_control.kill_wine_server()
+        FastFlagSnapshots().store(studio_version, dump["flags"])
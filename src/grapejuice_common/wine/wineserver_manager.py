@@ -0,0 +1,141 @@
+import fcntl
+import logging
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from grapejuice_common.wine.wineprefix_core_control import WineprefixCoreControl, LaunchEnvironment
+
+LOG = logging.getLogger(__name__)
+
+
+def wineserver_root_directory() -> Path:
+    """
+    The directory Wine keeps the sockets and locks of all wineservers of the user in. Wine builds this path in
+    init_server_dir without looking at TMPDIR, so neither can Grapejuice, or it would miss running servers.
+    """
+    return Path(os.path.sep, "tmp", f".wine-{os.getuid()}")
+
+
+def wineserver_lock_path(prefix_directory: Path) -> Path:
+    """
+    A wineserver holds a lock on this file for as long as it is alive
+    """
+    stat = os.stat(prefix_directory)
+
+    return wineserver_root_directory() / f"server-{stat.st_dev:x}-{stat.st_ino:x}" / "lock"
+
+
+def wineserver_is_running(prefix_directory: Path) -> bool:
+    try:
+        lock_path = wineserver_lock_path(prefix_directory)
+
+        with lock_path.open("r+b") as fp:
+            try:
+                fcntl.lockf(fp, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+            except OSError:
+                return True
+
+            fcntl.lockf(fp, fcntl.LOCK_UN)
+
+    except FileNotFoundError:
+        pass
+
+    return False
+
+
+class WineserverManager:
+    """
+    Keeps persistent wineservers around, so launching Roblox does not have to wait for the server to boot. Liveness
+    is determined through the lock file of the server, so servers started by other processes are reused as well.
+    """
+    _lock: threading.Lock
+    _warmed_at: Dict[Path, float]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._warmed_at = dict()
+
+    def is_warm(self, core_control: WineprefixCoreControl) -> bool:
+        prefix_directory = core_control.prefix_paths.base_directory
+
+        return prefix_directory.exists() and wineserver_is_running(prefix_directory)
+
+    def warm(
+        self,
+        core_control: WineprefixCoreControl,
+        environment: Optional[LaunchEnvironment] = None
+    ) -> bool:
+        """
+        Start a persistent wineserver for the prefix when there is none. Checking for a running server only takes a
+        lock probe, so this is cheap to call before every launch.
+        :param environment: The environment prepared for the launch, prepared here when a server has to be started
+        :return: Whether a server was started
+        """
+        # Skip the manager lock while a server is running, which is almost always the case
+        if self.is_warm(core_control):
+            return False
+
+        with self._lock:
+            if self.is_warm(core_control):
+                LOG.debug(f"Wineserver for {core_control.prefix_paths.base_directory} is already running")
+                return False
+
+            environment = environment or core_control.prepare_for_launch()
+            prefix_directory = core_control.prefix_paths.base_directory
+
+            LOG.info(f"Starting a persistent wineserver for {prefix_directory}")
+            t0 = time.perf_counter()
+
+            # The server daemonizes itself once it accepts connections
+            subprocess.check_call([str(core_control.wine_server()), "-p"], env=environment.as_environ())
+
+            self._warmed_at[prefix_directory] = time.monotonic()
+            LOG.info(f"Wineserver for {prefix_directory} started in {time.perf_counter() - t0:.2f}s")
+
+            return True
+
+    def stop(self, core_control: WineprefixCoreControl):
+        with self._lock:
+            self._warmed_at.pop(core_control.prefix_paths.base_directory, None)
+            core_control.kill_wine_server()
+
+    @property
+    def warm_prefixes(self) -> Dict[Path, float]:
+        """
+        :return: The prefixes that had a server started by this manager which is still running, with the monotonic
+        time the server was started at
+        """
+        with self._lock:
+            return dict(
+                (prefix_directory, t)
+                for prefix_directory, t in self._warmed_at.items()
+                if prefix_directory.exists() and wineserver_is_running(prefix_directory)
+            )
+
+
+wineserver_manager = WineserverManager()
+
+
+def warm_configured_prefixes():
+    """
+    Start wineservers for all prefixes that have Roblox installed, used when the daemon starts
+    """
+    from grapejuice_common.features.settings import current_settings
+    from grapejuice_common.wine.wineprefix_registry import wineprefix_registry
+
+    for configuration in current_settings.parsed_wineprefixes_sorted:
+        prefix = wineprefix_registry.get(configuration)
+
+        if not prefix.roblox.is_installed:
+            continue
+
+        try:
+            wineserver_manager.warm(prefix.core_control)
+
+        except (subprocess.CalledProcessError, OSError, AssertionError) as e:
+            LOG.error(f"Could not warm prefix {configuration.display_name}: {e}")
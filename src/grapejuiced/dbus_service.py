@@ -68,6 +68,14 @@ class DBusService(dbus.service.Object):
     def ExtractFastFlags(self):
         self._dry_connection.extract_fast_flags()
 
+    @dbus.service.method(
+        dbus_interface=bus_name,
+        in_signature="s",
+        out_signature="b"
+    )
+    def WarmPrefix(self, prefix_id: str):
+        return self._dry_connection.warm_prefix(prefix_id)
+
     @dbus.service.method(
         dbus_interface=bus_name,
         in_signature="",
@@ -1,6 +1,7 @@
 import signal
 import subprocess
 import sys
+import threading
 
 import click
 
@@ -25,6 +26,14 @@ def _spawn(pid_file: PIDFile):
     print("> Spawning a new daemon")
     pid_file.write_pid()
     state.start_service()
+
+    from grapejuice_common.features import settings
+    from grapejuice_common.features.settings import current_settings
+
+    if current_settings.get(settings.k_persistent_wineservers):
+        from grapejuice_common.wine.wineserver_manager import warm_configured_prefixes
+        threading.Thread(target=warm_configured_prefixes, name="warm-prefixes", daemon=True).start()
+
     state.start()
 
 
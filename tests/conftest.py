@@ -0,0 +1,75 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+import pytest
+
+PAYLOAD = bytes(range(256)) * 1024
+PAYLOAD_SHA256 = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class PayloadServer(ThreadingHTTPServer):
+    payload: bytes = PAYLOAD
+    etag: str = '"1"'
+    requests: List[str]
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), PayloadHandler)
+        self.requests = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/payload.bin"
+
+
+class PayloadHandler(BaseHTTPRequestHandler):
+    def _send_headers(self) -> int:
+        payload = self.server.payload
+        offset = 0
+        range_header = self.headers.get("Range", None)
+        if_range = self.headers.get("If-Range", None)
+
+        if range_header and if_range in (None, self.server.etag):
+            offset = int(range_header[len("bytes="):].rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {offset}-{len(payload) - 1}/{len(payload)}")
+
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Length", str(len(payload) - offset))
+        self.send_header("ETag", self.server.etag)
+        self.end_headers()
+
+        return offset
+
+    def do_HEAD(self):
+        self.server.requests.append("HEAD")
+        self._send_headers()
+
+    def do_GET(self):
+        self.server.requests.append("GET")
+
+        if self.headers.get("If-None-Match", None) == self.server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        offset = self._send_headers()
+        self.wfile.write(self.server.payload[offset:])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def payload_server():
+    server = PayloadServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,17 @@
+from grapejuice_common.wine.app_settings_writer import write_app_settings
+
+
+def test_unchanged_app_settings_are_skipped(tmp_path):
+    paths = [tmp_path / "version-a" / "ClientSettings" / "ClientAppSettings.json"]
+
+    first = write_app_settings({"FFlagA": True}, paths)
+    assert first.files_written == 1 and first.bytes_written == paths[0].stat().st_size
+
+    second = write_app_settings({"FFlagA": True}, paths)
+    assert second.files_written == 0 and second.skipped == paths
+
+    paths[0].write_text("{}")
+    assert write_app_settings({"FFlagA": True}, paths).files_written == 1
+
+    assert write_app_settings({"FFlagA": False}, paths).files_written == 1
+    assert paths[0].read_text() == '{\n  "FFlagA": false\n}'
@@ -0,0 +1,69 @@
+from conftest import PAYLOAD, PAYLOAD_SHA256
+from grapejuice_common.util.artifact_store import ArtifactStore
+from grapejuice_common.util.downloads import DownloadManager, partial_path, validator_path
+
+
+def test_artifacts_are_downloaded_once(payload_server, tmp_path):
+    store = ArtifactStore(tmp_path / "artifacts", downloads=DownloadManager())
+
+    first = store.fetch(payload_server.url)
+    assert first.name == PAYLOAD_SHA256 and first.read_bytes() == PAYLOAD
+
+    links = [store.link(payload_server.url, tmp_path / f"prefix-{i}" / "payload.bin") for i in range(3)]
+    assert all(link.read_bytes() == PAYLOAD for link in links)
+    assert payload_server.requests == ["GET"]
+
+    # A fresh store reads the index from disk
+    assert ArtifactStore(tmp_path / "artifacts", downloads=DownloadManager()).fetch(payload_server.url) == first
+    assert payload_server.requests == ["GET"]
+
+
+def test_changed_etag_downloads_again(payload_server, tmp_path):
+    store = ArtifactStore(tmp_path / "artifacts", downloads=DownloadManager())
+    store.fetch(payload_server.url, revalidate=True)
+
+    store.fetch(payload_server.url, revalidate=True)
+    assert payload_server.requests == ["GET", "HEAD"]
+
+    payload_server.payload = b"new installer"
+    payload_server.etag = '"2"'
+
+    assert store.fetch(payload_server.url, revalidate=True).read_bytes() == b"new installer"
+
+
+def test_least_recently_used_artifacts_are_evicted(payload_server, tmp_path):
+    store = ArtifactStore(tmp_path / "artifacts", max_size=len(PAYLOAD) + 100, downloads=DownloadManager())
+
+    old = store.fetch(payload_server.url + "?old")
+
+    payload_server.payload = b"small"
+    small = store.fetch(payload_server.url + "?small")
+
+    payload_server.payload = PAYLOAD[:-1]
+    new = store.fetch(payload_server.url + "?new")
+
+    assert not old.exists()
+    assert small.exists() and new.exists()
+    assert store.size == len(PAYLOAD) - 1 + len(b"small")
+
+
+
+def test_stale_partial_download_is_not_stored(payload_server, tmp_path):
+    store = ArtifactStore(tmp_path / "artifacts", downloads=DownloadManager())
+    store.fetch(payload_server.url, revalidate=True)
+
+    # A download of the old installer was interrupted, then the server moved on to a new installer
+    incoming = store._incoming_path(payload_server.url)
+    partial_path(incoming).write_bytes(PAYLOAD[:1000])
+    validator_path(incoming).write_text('{"validator": "\\"1\\""}')
+    (tmp_path / "artifacts" / "index.json").unlink()
+
+    payload_server.payload = b"new installer"
+    payload_server.etag = '"2"'
+
+    store = ArtifactStore(tmp_path / "artifacts", downloads=DownloadManager())
+    assert store.fetch(payload_server.url, revalidate=True).read_bytes() == b"new installer"
+
+    payload_server.requests.clear()
+    assert store.fetch(payload_server.url, revalidate=True).read_bytes() == b"new installer"
+    assert payload_server.requests == ["HEAD"]
@@ -0,0 +1,30 @@
+import os
+import stat
+
+import pytest
+
+from grapejuice_common.util import atomic_write, atomic_writer
+
+
+def test_atomic_write_replaces_the_file(tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_bytes(b"old")
+
+    atomic_write(path, b"new", permissions=0o640)
+
+    assert path.read_bytes() == b"new"
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    assert os.listdir(tmp_path) == ["settings.json"]
+
+
+def test_failed_write_keeps_the_original_file(tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_bytes(b"old")
+
+    with pytest.raises(ValueError):
+        with atomic_writer(path, "w", encoding="UTF-8") as fp:
+            fp.write("partial")
+            raise ValueError()
+
+    assert path.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["settings.json"]
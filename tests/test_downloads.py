@@ -0,0 +1,60 @@
+import pytest
+
+from conftest import PAYLOAD, PAYLOAD_SHA256
+from grapejuice_common.errors import DownloadChecksumMismatch
+from grapejuice_common.util.downloads import DownloadManager, partial_path, validator_path
+
+
+def test_download_is_streamed_and_verified(payload_server, tmp_path):
+    manager = DownloadManager()
+    progress = []
+    manager.progress.add_listener(progress.append)
+
+    target = manager.download(payload_server.url, tmp_path / "payload.bin", sha256=PAYLOAD_SHA256)
+
+    assert target.read_bytes() == PAYLOAD
+    assert not partial_path(target).exists()
+    assert progress[-1].finished and progress[-1].fraction == 1.0
+
+
+def test_interrupted_download_is_resumed(payload_server, tmp_path):
+    target = tmp_path / "payload.bin"
+    partial_path(target).write_bytes(PAYLOAD[:1000])
+    validator_path(target).write_text('{"validator": "\\"1\\""}')
+
+    progress = []
+    DownloadManager().download(payload_server.url, target, sha256=PAYLOAD_SHA256, on_progress=progress.append)
+
+    assert target.read_bytes() == PAYLOAD
+    assert progress[0].downloaded > 1000 and progress[0].total == len(PAYLOAD)
+    assert not validator_path(target).exists()
+
+
+def test_changed_remote_file_is_not_resumed(payload_server, tmp_path):
+    target = tmp_path / "payload.bin"
+    partial_path(target).write_bytes(b"old installer")
+    validator_path(target).write_text('{"validator": "\\"1\\""}')
+
+    payload_server.etag = '"2"'
+    DownloadManager().download(payload_server.url, target)
+
+    assert target.read_bytes() == PAYLOAD
+
+
+def test_partial_download_without_validator_starts_over(payload_server, tmp_path):
+    target = tmp_path / "payload.bin"
+    partial_path(target).write_bytes(b"old installer")
+
+    DownloadManager().download(payload_server.url, target)
+
+    assert target.read_bytes() == PAYLOAD
+
+
+def test_checksum_mismatch_discards_the_download(payload_server, tmp_path):
+    target = tmp_path / "payload.bin"
+
+    with pytest.raises(DownloadChecksumMismatch):
+        DownloadManager().download(payload_server.url, target, sha256="0" * 64)
+
+    assert not target.exists()
+    assert not partial_path(target).exists()
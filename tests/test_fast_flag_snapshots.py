@@ -0,0 +1,39 @@
+import json
+
+from grapejuice_common.fast_flag_snapshots import FastFlagSnapshots, INDEX_VERSION
+
+
+def test_snapshots_round_trip(tmp_path):
+    snapshots = FastFlagSnapshots(tmp_path)
+    flags = {"FIntB": 2, "FFlagA": True, "FStringC": "c"}
+
+    first = snapshots.store("version-a", flags)
+    second = snapshots.store("version-b", dict(reversed(list(flags.items()))))
+
+    # Versions with the same flags share a snapshot
+    assert first == second and first.name.endswith(".json.gz")
+    assert snapshots.has("version-a") and snapshots.has("version-b")
+
+    snapshot = FastFlagSnapshots(tmp_path).load("version-a")
+    assert snapshot.flags == {"FFlagA": True, "FIntB": 2, "FStringC": "c"}
+    assert snapshot.types == "bis"
+
+
+def test_missing_version_has_no_snapshot(tmp_path):
+    snapshots = FastFlagSnapshots(tmp_path)
+    snapshots.store("version-a", {"FFlagA": True})
+
+    assert not snapshots.has("version-b")
+    assert snapshots.load("version-b") is None
+
+
+def test_index_with_a_stale_version_is_discarded(tmp_path):
+    snapshots = FastFlagSnapshots(tmp_path)
+    snapshot_path = snapshots.store("version-a", {"FFlagA": True})
+
+    index_path = tmp_path / "index.json"
+    index_path.write_text(json.dumps({"version": INDEX_VERSION - 1, "snapshots": {"version-a": snapshot_path.name.split(".")[0]}}))
+
+    stale = FastFlagSnapshots(tmp_path)
+    assert not stale.has("version-a")
+    assert stale.load("version-a") is None
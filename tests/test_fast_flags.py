@@ -0,0 +1,51 @@
+from grapejuice_common.models.fast_flag_types import FastFlagType, infer_types, coerce_flags
+from grapejuice_common.models.fast_flags import FastFlagList
+
+
+def test_fast_flag_list_tracks_changes():
+    flags = FastFlagList(source_dictionary={"FFlagB": "True", "DFIntA": "10", "FStringC": "x"})
+    flags.overlay_flags(FastFlagList(source_dictionary={"FStringC": "y", "FFlagUnknown": "True"}))
+
+    assert [flag.name for flag in flags] == ["FStringC", "DFIntA", "FFlagB"]
+    assert flags.get_changed_flags().as_dictionary == {"FStringC": "y"}
+
+    flags.find("DFIntA").value = "20"
+    assert flags.changed_count == 2
+    assert [flag.name for flag in flags] == ["FStringC", "DFIntA", "FFlagB"]
+
+    flags.sort()
+    assert [flag.name for flag in flags[0:2]] == ["DFIntA", "FStringC"]
+
+    flags.find("FStringC").reset()
+    assert flags.get_changed_flags().as_dictionary == {"DFIntA": 20}
+
+    flags.reset_all_flags()
+    assert flags.changed_count == 0
+    assert flags.as_dictionary == {"DFIntA": 10, "FFlagB": True, "FStringC": "x"}
+
+
+def test_fast_flag_search_ranks_matches():
+    flags = FastFlagList(source_dictionary=dict.fromkeys(
+        ["FFlagStudioRender", "RenderShadows", "DFIntRenderDistance", "FFlagSurrender", "FIntNetwork"],
+        "True"
+    ))
+
+    assert [flag.name for flag in flags.search("render")] == \
+        ["RenderShadows", "DFIntRenderDistance", "FFlagStudioRender", "FFlagSurrender"]
+
+    assert [flag.name for flag in flags.search("renders")] == ["RenderShadows"]
+    assert flags.search("nothing") == []
+
+
+def test_fast_flag_types_are_inferred_and_coerced():
+    dump = {"FFlagA": "false", "DFIntB": "-3 ; comment", "SFStringC": "10", "Unprefixed": "42", "FLogD": "oops"}
+
+    assert infer_types(dump) == "bisii"
+    assert coerce_flags(dump) == {"FFlagA": False, "DFIntB": -3, "SFStringC": "10", "Unprefixed": 42, "FLogD": "oops"}
+
+    flags = FastFlagList(source_dictionary=dump, types="bisii")
+    assert flags.find("SFStringC").type is FastFlagType.string
+    assert flags.find("FFlagA").is_a(bool)
+
+    flags.find("DFIntB").value = "-3"
+    assert flags.changed_count == 0
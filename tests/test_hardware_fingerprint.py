@@ -0,0 +1,46 @@
+import os
+
+from grapejuice_common.hardware_info.hardware_fingerprint import hardware_fingerprint
+
+
+def _card(root, card, address, device, driver):
+    path = root / "devices" / address
+    path.mkdir(parents=True)
+
+    for name, value in (("vendor", "0x1002"), ("device", device), ("revision", "0xc1"), ("class", "0x030000")):
+        (path / name).write_text(value + "\n")
+
+    os.symlink(root / "drivers" / driver, path / "driver")
+
+    card_path = root / "drm" / card
+    card_path.mkdir(parents=True)
+    os.symlink(path, card_path / "device")
+
+
+def test_fingerprint_identifies_cards_and_drivers(tmp_path):
+    _card(tmp_path, "card0", "0000:03:00.0", "0x73bf", "amdgpu")
+    (tmp_path / "drm" / "card0-DP-1").mkdir()
+
+    fingerprint = hardware_fingerprint(tmp_path / "drm")
+
+    assert fingerprint is not None
+    assert fingerprint == hardware_fingerprint(tmp_path / "drm")
+
+    os.remove(tmp_path / "devices" / "0000:03:00.0" / "driver")
+    os.symlink(tmp_path / "drivers" / "radeon", tmp_path / "devices" / "0000:03:00.0" / "driver")
+    assert hardware_fingerprint(tmp_path / "drm") != fingerprint
+
+
+def test_added_card_changes_the_fingerprint(tmp_path):
+    _card(tmp_path, "card0", "0000:03:00.0", "0x73bf", "amdgpu")
+    fingerprint = hardware_fingerprint(tmp_path / "drm")
+
+    _card(tmp_path, "card1", "0000:04:00.0", "0x1f91", "nvidia")
+    assert hardware_fingerprint(tmp_path / "drm") != fingerprint
+
+
+def test_fingerprint_is_none_without_cards(tmp_path):
+    assert hardware_fingerprint(tmp_path / "missing") is None
+
+    (tmp_path / "drm" / "renderD128").mkdir(parents=True)
+    assert hardware_fingerprint(tmp_path / "drm") is None
@@ -0,0 +1,12 @@
+import subprocess
+import threading
+
+from grapejuice_common.util.process_supervisor import ProcessSupervisor
+
+
+def test_exit_callback_runs_without_a_main_loop():
+    exited = threading.Event()
+    wrapper = ProcessSupervisor().supervise(subprocess.Popen(["sh", "-c", "exit 3"]), on_exit=exited.set)
+
+    assert wrapper.wait(10) and exited.wait(10)
+    assert wrapper.exit_code == 3
@@ -0,0 +1,49 @@
+from grapejuice_common.wine.registry_file import RegistryFile
+
+HIVE = """WINE REGISTRY Version 2
+;; All keys relative to \\\\User\\\\S-1-5-21-0-0-0-1000
+
+#arch=win64
+
+[Software\\\\Roblox\\\\RobloxStudioBrowser\\\\roblox.com] 1646400000
+#time=1d82c1f5f0d2e3a
+".ROBLOSECURITY"="_|WARNING:-DO-NOT-SHARE-THIS"
+
+[Software\\\\Wine\\\\DllOverrides] 1646400001
+#time=1d82c1f5f0d2e3b
+"d3d10core"="native"
+"d3d11"="native"
+"d3d9"="native"
+
+[Control Panel\\\\Desktop] 1646400002
+"Pattern"=hex:00,00,00,00,\\
+  00,00,00,00
+@="default"
+"""
+
+
+def _write_hive(tmp_path):
+    path = tmp_path / "user.reg"
+    path.write_text(HIVE)
+
+    return path
+
+
+def test_registry_file_finds_keys_and_attributes(tmp_path):
+    hive = RegistryFile(_write_hive(tmp_path))
+    hive.load()
+
+    roblox_com = hive.find_key(r"Software\\Roblox\\RobloxStudioBrowser\\roblox.com")
+    assert roblox_com.value == "1646400000"
+    assert roblox_com.get_attribute(".ROBLOSECURITY") is not None
+
+    dll_overrides = hive.find_key(r"Software\\Wine\\DllOverrides")
+    assert all(override in dll_overrides.attributes for override in ("d3d10core", "d3d11", "d3d9"))
+    assert hive.find_key(r"Software\\Wine\\DllOverrides") is dll_overrides
+
+    desktop = hive.find_key(r"Control Panel\\Desktop")
+    assert desktop.get_attribute("Pattern") == "hex:00,00,00,00,00,00,00,00"
+    assert desktop.get_attribute("@") == "\"default\""
+
+    assert hive.root_key.get_attribute("arch") == "win64"
+    assert hive.find_key(r"Software\\Nope") is None
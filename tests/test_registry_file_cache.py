@@ -0,0 +1,43 @@
+import os
+
+from grapejuice_common.wine.registry_file_cache import CachedRegistryFile
+
+HIVE = """WINE REGISTRY Version 2
+
+[Software\\\\Roblox\\\\RobloxStudioBrowser\\\\roblox.com] 1646400000
+".ROBLOSECURITY"="_|WARNING:-DO-NOT-SHARE-THIS"
+
+[Software\\\\Wine\\\\DllOverrides] 1646400001
+"d3d11"="native"
+"""
+
+ROBLOX_COM = r"Software\\Roblox\\RobloxStudioBrowser\\roblox.com"
+DLL_OVERRIDES = r"Software\\Wine\\DllOverrides"
+
+
+def test_cached_lookups_do_not_store_attribute_values(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    hive_path = tmp_path / "user.reg"
+    hive_path.write_text(HIVE)
+
+    hive = CachedRegistryFile(hive_path)
+    hive.load()
+
+    assert hive.has_attribute(ROBLOX_COM, ".ROBLOSECURITY")
+    assert hive.has_attribute(DLL_OVERRIDES, "d3d11")
+    assert not hive.has_attribute(DLL_OVERRIDES, "d3d9")
+    assert not hive.has_key(r"Software\\Missing")
+
+    cache_files = list((tmp_path / "cache" / "grapejuice" / "registry").iterdir())
+    assert len(cache_files) == 1
+    assert "DO-NOT-SHARE" not in cache_files[0].read_text()
+    assert cache_files[0].stat().st_mode & 0o077 == 0
+
+    # Answers come from the cache while the hive is unchanged
+    stat = hive_path.stat()
+    hive_path.write_text(HIVE.replace("ROBLOSECURITY", "ROBLOSECURITZ"))
+    os.utime(hive_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    cached = CachedRegistryFile(hive_path)
+    cached.load()
+    assert cached.has_attribute(ROBLOX_COM, ".ROBLOSECURITY")
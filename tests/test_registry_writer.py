@@ -0,0 +1,103 @@
+import subprocess
+import sys
+
+import pytest
+
+from grapejuice_common.wine import registry_writer
+from grapejuice_common.wine.registry_file import RegistryFile
+from grapejuice_common.wine.registry_writer import merge_registry_import, decode_registry_import, WineserverIsRunning
+from grapejuice_common.wine.wineprefix_paths import WineprefixPaths
+
+USER_HIVE = """WINE REGISTRY Version 2
+;; All keys relative to \\\\User\\\\S-1-5-21-0-0-0-1000
+
+#arch=win64
+
+[Software\\\\Wine\\\\FileOpenAssociations] 1646400000
+#time=1d82c1f5f0d2e3a
+"Enable"="Y"
+"Pattern"=hex:00,00,\\
+  00,00
+
+[Software\\\\Wine\\\\DllOverrides] 1646400001
+"d3d11"="native"
+"""
+
+REGISTRY_IMPORT = """Windows Registry Editor Version 5.00
+
+[HKEY_CURRENT_USER\\Software\\Wine\\FileOpenAssociations]
+"Enable"="N"
+"Pattern"=-
+
+[HKEY_CURRENT_USER\\Software\\Roblox\\RobloxStudio\\rbxRecentFiles_v02]
+"rbxRecentFilesCount"=dword:0
+"""
+
+
+HOLD_LOCK = """
+import fcntl, sys, time
+with open(sys.argv[1], "r+b") as fp:
+    fcntl.lockf(fp, fcntl.LOCK_EX)
+    print("locked", flush=True)
+    time.sleep(30)
+"""
+
+
+@pytest.fixture
+def lock_path(tmp_path, monkeypatch):
+    path = tmp_path / "server" / "lock"
+    monkeypatch.setattr(registry_writer, "wineserver_lock_path", lambda _: path)
+
+    return path
+
+
+def test_merge_registry_import_updates_hive(tmp_path, lock_path):
+    (tmp_path / "user.reg").write_text(USER_HIVE)
+    (tmp_path / "system.reg").write_text("WINE REGISTRY Version 2\n")
+    prefix_paths = WineprefixPaths(tmp_path)
+
+    assert merge_registry_import(prefix_paths, REGISTRY_IMPORT)
+    assert not merge_registry_import(prefix_paths, REGISTRY_IMPORT)
+
+    hive = RegistryFile(prefix_paths.user_registry_hive)
+    hive.load()
+
+    associations = hive.find_key(r"Software\\Wine\\FileOpenAssociations")
+    assert associations.get_attribute("Enable") == "\"N\""
+    assert associations.get_attribute("Pattern") is None
+
+    recent_files = hive.find_key(r"Software\\Roblox\\RobloxStudio\\rbxRecentFiles_v02")
+    assert recent_files.get_attribute("rbxRecentFilesCount") == "dword:00000000"
+
+    assert hive.find_key(r"Software\\Wine\\DllOverrides").get_attribute("d3d11") == "\"native\""
+
+
+def test_lock_file_is_created_for_a_prefix_without_wineserver(tmp_path, lock_path):
+    (tmp_path / "user.reg").write_text(USER_HIVE)
+
+    assert merge_registry_import(WineprefixPaths(tmp_path), REGISTRY_IMPORT)
+    assert lock_path.stat().st_mode & 0o777 == 0o600
+    assert lock_path.parent.stat().st_mode & 0o077 == 0
+
+
+def test_running_wineserver_blocks_the_merge(tmp_path, lock_path):
+    (tmp_path / "user.reg").write_text(USER_HIVE)
+    lock_path.parent.mkdir(mode=0o700)
+    lock_path.touch()
+
+    with subprocess.Popen([sys.executable, "-c", HOLD_LOCK, str(lock_path)], stdout=subprocess.PIPE) as holder:
+        try:
+            assert holder.stdout.readline().strip() == b"locked"
+
+            with pytest.raises(WineserverIsRunning):
+                merge_registry_import(WineprefixPaths(tmp_path), REGISTRY_IMPORT)
+
+        finally:
+            holder.kill()
+
+    assert (tmp_path / "user.reg").read_text() == USER_HIVE
+
+
+def test_regedit_exports_are_decoded():
+    assert decode_registry_import(REGISTRY_IMPORT.encode("UTF-16")) == REGISTRY_IMPORT
+    assert decode_registry_import(REGISTRY_IMPORT.encode("UTF-8-sig")) == REGISTRY_IMPORT
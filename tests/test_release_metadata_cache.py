@@ -0,0 +1,39 @@
+import pytest
+
+from grapejuice_common.errors import ReleaseMetadataUnavailable
+from grapejuice_common.util.downloads import DownloadManager
+from grapejuice_common.util.release_metadata_cache import ReleaseMetadataCache
+
+
+def test_fresh_responses_are_not_requested_again(payload_server, tmp_path):
+    payload_server.payload = b'{"tag_name": "v2.0"}'
+    cache = ReleaseMetadataCache(tmp_path, downloads=DownloadManager())
+
+    assert cache.get_json(payload_server.url) == {"tag_name": "v2.0"}
+    assert cache.get_json(payload_server.url)["tag_name"] == "v2.0"
+    assert payload_server.requests == ["GET"]
+
+    # Another process reads the response from disk
+    assert ReleaseMetadataCache(tmp_path, downloads=DownloadManager()).get_text(payload_server.url)
+    assert payload_server.requests == ["GET"]
+
+
+def test_stale_responses_are_revalidated(payload_server, tmp_path):
+    payload_server.payload = b'{"tag_name": "v2.0"}'
+    cache = ReleaseMetadataCache(tmp_path, ttl=0, downloads=DownloadManager())
+
+    cache.get_json(payload_server.url)
+    assert cache.get_json(payload_server.url)["tag_name"] == "v2.0"
+
+    payload_server.payload = b'{"tag_name": "v2.1"}'
+    payload_server.etag = '"2"'
+    assert cache.get_json(payload_server.url)["tag_name"] == "v2.1"
+
+    payload_server.shutdown()
+    payload_server.server_close()
+
+    # The last response is used while offline
+    assert cache.get_json(payload_server.url)["tag_name"] == "v2.1"
+
+    with pytest.raises(ReleaseMetadataUnavailable):
+        cache.get_text(payload_server.url + "?uncached")
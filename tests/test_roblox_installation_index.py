@@ -0,0 +1,27 @@
+import os
+
+from grapejuice_common.wine.roblox_installation_index import RobloxInstallationIndex
+
+
+def _install(versions, version, mtime_ns):
+    executable = versions / version / "RobloxPlayerLauncher.exe"
+    executable.parent.mkdir(parents=True)
+    executable.write_bytes(b"MZ")
+    os.utime(executable, ns=(mtime_ns, mtime_ns))
+
+    return executable
+
+
+def test_newest_version_is_selected(tmp_path):
+    versions = tmp_path / "Versions"
+    _install(versions, "version-b", 2_000_000_000)
+    _install(versions, "version-c", 1_000_000_000)
+    _install(versions, "version-a", 2_000_000_000)
+
+    index = RobloxInstallationIndex([versions, tmp_path / "Missing" / "Versions"])
+    assert [e.version for e in index.executables("robloxplayerlauncher.exe")] == \
+        ["version-b", "version-a", "version-c"]
+
+    newest = _install(versions, "version-d", 3_000_000_000)
+    assert index.newest("RobloxPlayerLauncher.exe").path == newest
+    assert index.newest("RobloxStudioBeta.exe") is None
@@ -0,0 +1,66 @@
+import json
+import subprocess
+import sys
+
+from grapejuice_common.features import settings
+from grapejuice_common.hardware_info import hardware_fingerprint, lspci
+from grapejuice_common.hardware_info.hardware_profile import HardwareProfile
+
+
+def test_importing_settings_is_lazy():
+    code = "\n".join([
+        "import sys",
+        "from grapejuice_common.features.settings import current_settings",
+        "assert 'grapejuice_common.hardware_info.hardware_profile' not in sys.modules",
+        "assert type(current_settings)._instance is None"
+    ])
+
+    subprocess.check_call([sys.executable, "-c", code])
+
+
+def test_settings_saves_are_coalesced(tmp_path, monkeypatch):
+    # Only the explicit flush below may write the pending changes
+    monkeypatch.setattr(settings, "SAVE_DELAY", 3600)
+
+    location = tmp_path / "user_settings.json"
+    location.write_text(json.dumps({**settings.default_settings(), settings.k_try_profiling_hardware: False}))
+
+    user_settings = settings.UserSettings(location)
+
+    for value in (False, True, False):
+        user_settings.set(settings.k_show_fast_flag_warning, value, save=True)
+
+    assert json.loads(location.read_text())[settings.k_show_fast_flag_warning] is True
+
+    user_settings.flush()
+    assert json.loads(location.read_text())[settings.k_show_fast_flag_warning] is False
+
+    written = location.stat().st_mtime_ns, location.stat().st_ino
+    user_settings.save(immediately=True)
+    assert (location.stat().st_mtime_ns, location.stat().st_ino) == written
+
+
+def test_missing_fingerprint_compares_graphics_cards_once(tmp_path, monkeypatch):
+    lspci_calls = []
+
+    class FakeLSPci:
+        graphics_id = "1002:73bf"
+
+        def __init__(self):
+            lspci_calls.append(self)
+
+    monkeypatch.setattr(hardware_fingerprint, "hardware_fingerprint", lambda: None)
+    monkeypatch.setattr(lspci, "LSPci", FakeLSPci)
+
+    location = tmp_path / "user_settings.json"
+    location.write_text(json.dumps({
+        **settings.default_settings(),
+        settings.k_hardware_profile: {"version": HardwareProfile.version, "graphics_id": FakeLSPci.graphics_id}
+    }))
+
+    user_settings = settings.UserSettings(location)
+    user_settings.flush()
+    user_settings.load()
+
+    assert len(lspci_calls) == 1
+    assert user_settings.get(settings.k_hardware_fingerprint) == settings.NO_HARDWARE_FINGERPRINT
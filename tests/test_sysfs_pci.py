@@ -0,0 +1,54 @@
+import os
+
+from grapejuice_common.hardware_info.lspci import LSPci
+from grapejuice_common.hardware_info.sysfs_pci import PciIds, sysfs_display_controllers
+
+PCI_IDS = """# pci.ids excerpt
+8086  Intel Corporation
+\t3e9b  UHD Graphics 630 (Mobile)
+\t\t1028 089d  UHD Graphics 630 Mobile
+\t8086  Not a vendor line
+10de  NVIDIA Corporation
+\t1f91  TU117M [GeForce GTX 1650 Mobile / Max-Q]
+C 03  Display controller
+\t00  VGA compatible controller
+\t\t00  VGA controller
+\t\t01  8514 controller
+\t02  3D controller
+C 04  Multimedia controller
+\t00  Multimedia video controller
+"""
+
+LSPCI_OUTPUT = """00:02.0 VGA compatible controller: Intel Corporation UHD Graphics 630 (Mobile) (rev 02) (prog-if 00 [VGA controller])
+\tKernel driver in use: i915
+
+01:00.0 3D controller: NVIDIA Corporation TU117M [GeForce GTX 1650 Mobile / Max-Q] (rev a1)
+\tKernel driver in use: nvidia
+"""
+
+
+def _device(devices, address, pci_class, vendor, device, revision, driver=None):
+    path = devices / address
+    path.mkdir(parents=True)
+
+    for name, value in (("class", pci_class), ("vendor", vendor), ("device", device), ("revision", revision)):
+        (path / name).write_text(value + "\n")
+
+    if driver:
+        os.symlink(f"../../../bus/pci/drivers/{driver}", path / "driver")
+
+
+def test_sysfs_entries_match_lspci(tmp_path):
+    devices = tmp_path / "devices"
+    _device(devices, "0000:00:00.0", "0x060000", "0x8086", "0x3ec4", "0x07")
+    _device(devices, "0000:00:02.0", "0x030000", "0x8086", "0x3e9b", "0x02", "i915")
+    _device(devices, "0000:01:00.0", "0x030200", "0x10de", "0x1f91", "0xa1", "nvidia")
+
+    entries = sysfs_display_controllers(devices, PciIds(PCI_IDS))
+
+    lspci = LSPci.__new__(LSPci)
+    lspci._entries = []
+    lspci._parse(LSPCI_OUTPUT)
+
+    assert [(e.pci_id, e.attributes) for e in entries] == [(e.pci_id, e.attributes) for e in lspci.graphics_cards]
+    assert sysfs_display_controllers(tmp_path / "missing", PciIds(PCI_IDS)) is None
@@ -0,0 +1,56 @@
+from grapejuice_common.features.wineprefix_index import WineprefixIndex
+
+
+def _prefix(prefix_id, priority, hints):
+    return {
+        "id": prefix_id,
+        "priority": priority,
+        "name_on_disk": f"prefix_{prefix_id}",
+        "display_name": prefix_id,
+        "wine_home": "",
+        "dll_overrides": "",
+        "hints": hints
+    }
+
+
+def test_wineprefix_index_lookups():
+    raw_prefixes = [_prefix("a", 1, ["player"]), _prefix("b", 0, ["player", "app"]), _prefix("c", 2, ["studio"])]
+    index = WineprefixIndex(raw_prefixes)
+
+    assert index.find("a").display_name == "a"
+    assert index.find("a") is index.find("a")
+    assert index.find_by_name_on_disk("prefix_c").id == "c"
+    assert index.find_by_hints(["player"]).id == "b"
+    assert index.find_by_hints(["player", "studio"]) is None
+    assert [model.id for model in index.models] == ["b", "a", "c"]
+
+    model = index.find("b")
+    model.priority = 5
+    model.hints = ["studio"]
+    index.put(model, raw_prefixes[1])
+
+    assert index.find_by_hints(["player"]).id == "a"
+    assert index.find_by_hints(["studio"]).id == "c"
+
+    index.remove("a")
+    assert index.find_by_hints(["player"]) is None
+    assert [model.id for model in index.models] == ["c", "b"]
+
+
+def test_wineprefix_index_forgets_fields_of_models_mutated_in_place():
+    raw_prefixes = [_prefix("a", 1, ["player"]), _prefix("b", 2, ["player", "app"])]
+    index = WineprefixIndex(raw_prefixes)
+
+    model = index.find("a")
+    model.hints[:] = ["studio"]
+    model.name_on_disk = "renamed"
+    index.put(model, raw_prefixes[0])
+
+    model.hints[:] = ["player"]
+    model.priority = 5
+    index.put(model, raw_prefixes[0])
+
+    assert index.find_by_hints(["player"]).id == "b"
+    assert index.find_by_hints(["studio"]) is None
+    assert index.find_by_name_on_disk("prefix_a") is None
+    assert index.find_by_name_on_disk("renamed") is model
@@ -0,0 +1,76 @@
+import gc
+import json
+import weakref
+
+from grapejuice_common.features import settings
+from grapejuice_common.features.wineprefix_index import WineprefixIndex
+from grapejuice_common.models.wineprefix_configuration_model import WineprefixConfigurationModel
+from grapejuice_common.wine import wineprefix_registry
+from grapejuice_common.wine.wineprefix_registry import WineprefixRegistry
+
+
+def _prefix(prefix_id):
+    return {
+        "id": prefix_id,
+        "priority": 0,
+        "name_on_disk": f"prefix_{prefix_id}",
+        "display_name": prefix_id,
+        "wine_home": "",
+        "dll_overrides": "",
+        "hints": ["player"]
+    }
+
+
+def test_prefix_is_reused_while_its_configuration_is_unchanged():
+    index = WineprefixIndex([_prefix("a"), _prefix("b")])
+    registry = WineprefixRegistry(index.revision_of)
+
+    prefix = registry.get(index.find("a"))
+
+    assert registry.get(index.find("a")) is prefix
+    assert registry.get(index.find("b")) is not prefix
+
+
+def test_saved_or_replaced_configuration_gets_a_new_prefix():
+    raw_prefix = _prefix("a")
+    index = WineprefixIndex([raw_prefix])
+    registry = WineprefixRegistry(index.revision_of)
+
+    model = index.find("a")
+    prefix = registry.get(model)
+
+    model.display_name = "Renamed"
+    index.put(model, raw_prefix)
+    mutated_prefix = registry.get(model)
+
+    assert mutated_prefix is not prefix
+    assert mutated_prefix.configuration.display_name == "Renamed"
+
+    replacement = WineprefixConfigurationModel.from_dict(raw_prefix)
+    index.put(replacement, raw_prefix)
+
+    assert registry.get(replacement) is not mutated_prefix
+    assert registry.get(replacement).configuration is replacement
+
+
+def test_removed_prefix_is_forgotten(tmp_path, monkeypatch):
+    location = tmp_path / "user_settings.json"
+    location.write_text(json.dumps({
+        **settings.default_settings(),
+        settings.k_try_profiling_hardware: False,
+        settings.k_wineprefixes: [_prefix("a")]
+    }))
+
+    user_settings = settings.UserSettings(location)
+    registry = WineprefixRegistry(user_settings.wineprefix_revision)
+    monkeypatch.setattr(wineprefix_registry, "wineprefix_registry", registry)
+
+    model = user_settings.find_wineprefix("a")
+    prefix = weakref.ref(registry.get(model))
+
+    user_settings.remove_prefix_model(model)
+    user_settings.flush()
+    gc.collect()
+
+    assert prefix() is None
+    assert user_settings.find_wineprefix("a") is None
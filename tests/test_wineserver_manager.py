@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+from grapejuice_common.wine import wineserver_manager as manager_module
+from grapejuice_common.wine.wineserver_manager import WineserverManager, wineserver_is_running, wineserver_lock_path
+
+HOLD_LOCK = """
+import fcntl, sys, time
+with open(sys.argv[1], "r+b") as fp:
+    fcntl.lockf(fp, fcntl.LOCK_EX)
+    print("locked", flush=True)
+    time.sleep(30)
+"""
+
+
+class FakeCoreControl:
+    def __init__(self, prefix_directory, wine_server):
+        self.prefix_paths = SimpleNamespace(base_directory=prefix_directory)
+        self._wine_server = wine_server
+        self.prepared = 0
+
+    def prepare_for_launch(self):
+        self.prepared += 1
+        return SimpleNamespace(as_environ=lambda: dict(os.environ))
+
+    def wine_server(self):
+        return self._wine_server
+
+
+def test_lock_path_matches_wine(tmp_path):
+    stat = os.stat(tmp_path)
+
+    assert wineserver_lock_path(tmp_path) == \
+        manager_module.wineserver_root_directory() / f"server-{stat.st_dev:x}-{stat.st_ino:x}" / "lock"
+    assert str(manager_module.wineserver_root_directory()) == f"/tmp/.wine-{os.getuid()}"
+
+
+def test_running_wineserver_is_detected_through_its_lock(tmp_path, monkeypatch):
+    monkeypatch.setattr(manager_module, "wineserver_root_directory", lambda: tmp_path / "root")
+    prefix_directory = tmp_path / "prefix"
+    prefix_directory.mkdir()
+
+    assert not wineserver_is_running(prefix_directory)
+
+    lock_path = wineserver_lock_path(prefix_directory)
+    lock_path.parent.mkdir(parents=True)
+    lock_path.touch()
+    assert not wineserver_is_running(prefix_directory)
+
+    with subprocess.Popen([sys.executable, "-c", HOLD_LOCK, str(lock_path)], stdout=subprocess.PIPE) as holder:
+        try:
+            assert holder.stdout.readline().strip() == b"locked"
+            assert wineserver_is_running(prefix_directory)
+
+        finally:
+            holder.kill()
+
+
+def test_warm_only_starts_a_missing_server(tmp_path, monkeypatch):
+    running = set()
+    monkeypatch.setattr(manager_module, "wineserver_is_running", lambda directory: directory in running)
+
+    marker = tmp_path / "started"
+    wine_server = tmp_path / "wineserver"
+    wine_server.write_text(f"#!/bin/sh\necho \"$@\" >> {marker}\n")
+    wine_server.chmod(0o755)
+
+    core_control = FakeCoreControl(tmp_path, wine_server)
+    manager = WineserverManager()
+
+    assert manager.warm(core_control)
+    assert marker.read_text() == "-p\n"
+
+    running.add(tmp_path)
+    assert not manager.warm(core_control)
+    assert marker.read_text() == "-p\n" and core_control.prepared == 1
+    assert tmp_path in manager.warm_prefixes